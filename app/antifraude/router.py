@@ -2,27 +2,49 @@
 FastAPI Router for Anti-Fraud endpoints.
 Real-time risk analysis API.
 """
+import asyncio
+import csv
+import io
 from typing import Annotated, Any, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Header
+from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from pydantic import TypeAdapter
 
-from app.antifraude.rules import antifraud_engine
+from app.antifraude.rules import HIGH_RISK_MIN_SCORE, MEDIUM_RISK_MIN_SCORE, antifraud_engine
+from app.auth.dependencies import require_admin
+from app.auth.models import User
 from app.antifraude.schemas import AntifraudResult, AntifraudTransaction
 from app.core.logger import audit_log, get_logger_with_correlation
 
 router = APIRouter(tags=["Antifraud"])
 
+# Upper bound on items per batch request — keeps worst-case latency and
+# payload size bounded for a single call.
+MAX_BATCH_SIZE = 1000
+
+# Columns accepted by the backtest CSV; the profile columns are optional.
+_BACKTEST_REQUIRED_COLUMNS = ("value", "time", "attempts_last_24h")
+_BACKTEST_PROFILE_COLUMNS = ("account_age_days", "total_transactions_30d")
+
+# Engine results are built with model_construct from trusted values; serializing
+# them straight to JSON skips FastAPI's response_model re-validation pass.
+# response_model stays declared for the OpenAPI schema.
+_RESULTS_ADAPTER = TypeAdapter(list[AntifraudResult])
+
 
 @router.post("/analyze", response_model=AntifraudResult)
-def analyze_transaction(
+@router.post("/analisar", response_model=AntifraudResult, include_in_schema=False)
+async def analyze_transaction(
     transaction: AntifraudTransaction,
     x_correlation_id: Annotated[Optional[str], Header()] = None
-) -> AntifraudResult:
+) -> Response:
     """
     **Challenge 3: Simplified Anti-Fraud Engine**
 
     Performs real-time risk scoring.
+    Declared async: the analysis is pure CPU with no blocking I/O, so it runs
+    directly on the event loop instead of paying a threadpool handoff.
 
     - **value**: Transaction value (R$)
     - **time**: Transaction time (HH:MM)
@@ -33,7 +55,7 @@ def analyze_transaction(
     - Risk Score (0-100)
     - Activated Rules
     """
-    correlation_id = x_correlation_id or str(uuid4())
+    correlation_id = x_correlation_id or uuid4().hex
     logger = get_logger_with_correlation(correlation_id)
 
     logger.info(
@@ -43,7 +65,7 @@ def analyze_transaction(
     )
 
     # Execute analysis
-    result = antifraud_engine.analyze(transaction)
+    result = await antifraud_engine.analyze_async(transaction)
 
     # Audit
     audit_log(
@@ -53,38 +75,162 @@ def analyze_transaction(
         details={
             "correlation_id": correlation_id,
             "value": transaction.value,
-            "score": result["score"],
-            "approved": result["approved"],
-            "risk_level": result["risk_level"]
+            "score": result.score,
+            "approved": result.approved,
+            "risk_level": result.risk_level
         }
     )
 
-    return AntifraudResult(
-        score=result["score"],
-        approved=result["approved"],
-        reason=result["reason"],
-        triggered_rules=result["triggered_rules"],
-        risk_level=result["risk_level"],
-        recommendation=result["recommendation"]
+    return Response(content=result.model_dump_json(), media_type="application/json")
+
+
+@router.post("/analyze/batch", response_model=list[AntifraudResult])
+async def analyze_transactions_batch(
+    transactions: Annotated[list[AntifraudTransaction], Body()],
+    x_correlation_id: Annotated[Optional[str], Header()] = None
+) -> Response:
+    """
+    Bulk risk scoring for up to MAX_BATCH_SIZE transactions in one request.
+
+    Amortizes framework overhead (request parsing, correlation ID, audit record)
+    across the whole batch. Results are returned in input order.
+    """
+    if len(transactions) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch size exceeds limit of {MAX_BATCH_SIZE} transactions"
+        )
+
+    correlation_id = x_correlation_id or uuid4().hex
+    logger = get_logger_with_correlation(correlation_id)
+    logger.info("Starting batch anti-fraud analysis: size=%s", len(transactions))
+
+    # Same scoring as /analyze: external rules are awaited for every transaction,
+    # concurrently across the batch. Without any, analyze_async is plain analyze,
+    # so the per-item coroutines are skipped.
+    if antifraud_engine.external_rules:
+        results = await asyncio.gather(
+            *(antifraud_engine.analyze_async(transaction) for transaction in transactions)
+        )
+    else:
+        results = [antifraud_engine.analyze(transaction) for transaction in transactions]
+
+    approved_count = sum(1 for result in results if result.approved)
+    audit_log(
+        action="antifraud_batch_analysis",
+        user="system",
+        resource="transaction_batch",
+        details={
+            "correlation_id": correlation_id,
+            "size": len(results),
+            "approved": approved_count,
+            "rejected": len(results) - approved_count
+        }
     )
 
+    return Response(content=_RESULTS_ADAPTER.dump_json(results), media_type="application/json")
+
 
 @router.get("/rules", response_model=dict[str, Any])
-def list_rules() -> dict[str, Any]:
+@router.get("/regras", response_model=dict[str, Any], include_in_schema=False)
+async def list_rules() -> dict[str, Any]:
     """
     Exposes the active rule configuration for transparency and auditability.
+    Served from the engine's snapshot, built once at startup.
     """
-    rules: list[dict[str, Any]] = [
-        {
-            "name": rule.name,
-            "points": rule.points,
-            "description": rule.description
-        }
-        for rule in antifraud_engine.rules
-    ]
+    return antifraud_engine.rules_snapshot
 
-    return {
-        "total_rules": len(rules),
-        "approval_limit": antifraud_engine.approval_limit,
-        "rules": rules
+
+@router.post("/cache/clear", response_model=dict[str, Any])
+async def clear_score_cache(current_user: User = Depends(require_admin)) -> dict[str, Any]:
+    """
+    Clears the memoized score cache. Admin only.
+    Returns the cache statistics observed just before clearing.
+    """
+    stats = antifraud_engine.cache_info()
+    antifraud_engine.clear_cache()
+    audit_log(
+        action="antifraud_cache_cleared",
+        user=current_user.id,
+        resource="antifraud_engine",
+        details=stats
+    )
+    return {"cleared": True, "previous": stats}
+
+
+def _backtest_cell(row: dict[str, Optional[str]], column: str) -> str:
+    """Returns a non-blank cell; short rows leave missing cells as None."""
+    cell = row.get(column)
+    if cell is None or not cell.strip():
+        raise ValueError(f"missing value for '{column}'")
+    return cell
+
+
+def _backtest_hour(cell: str) -> int:
+    """Hour of an HH:MM cell, with the same bounds as AntifraudTransaction.validate_time."""
+    try:
+        hour, minute = map(int, cell.split(":"))
+    except ValueError:
+        raise ValueError(f"invalid time '{cell}', use HH:MM") from None
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"invalid time '{cell}', use HH:MM")
+    return hour
+
+
+@router.post("/admin/backtest", response_model=dict[str, Any])
+def backtest_rules(
+    file: UploadFile = File(...),
+    approval_limit: int = Query(default=antifraud_engine.approval_limit, ge=0, le=101),
+    current_user: User = Depends(require_admin)
+) -> dict[str, Any]:
+    """
+    Replays a CSV of historical transactions through the vectorized scorer. Admin only.
+
+    Expected header: value,time,attempts_last_24h[,account_age_days,total_transactions_30d].
+    approval_limit lets threshold candidates be evaluated without touching the live engine.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig"))
+    missing = [column for column in _BACKTEST_REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing CSV columns: {', '.join(missing)}")
+    profile_columns = [column for column in _BACKTEST_PROFILE_COLUMNS if column in reader.fieldnames]
+
+    values: list[float] = []
+    hours: list[int] = []
+    attempts: list[int] = []
+    profile: dict[str, list[int]] = {column: [] for column in profile_columns}
+    try:
+        for row in reader:
+            values.append(float(_backtest_cell(row, "value")))
+            hours.append(_backtest_hour(_backtest_cell(row, "time")))
+            attempts.append(int(_backtest_cell(row, "attempts_last_24h")))
+            for column in profile_columns:
+                profile[column].append(int(_backtest_cell(row, column)))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV row {reader.line_num}: {exc}")
+
+    try:
+        scores = antifraud_engine.analyze_batch(values, hours, attempts, **profile)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    approved = int((scores < approval_limit).sum())
+    summary = {
+        "rows": int(scores.size),
+        "approval_limit": approval_limit,
+        "approved": approved,
+        "rejected": int(scores.size) - approved,
+        "mean_score": round(float(scores.mean()), 2) if scores.size else 0.0,
+        "risk_levels": {
+            "LOW": int((scores < MEDIUM_RISK_MIN_SCORE).sum()),
+            "MEDIUM": int(((scores >= MEDIUM_RISK_MIN_SCORE) & (scores < HIGH_RISK_MIN_SCORE)).sum()),
+            "HIGH": int((scores >= HIGH_RISK_MIN_SCORE).sum()),
+        },
     }
+    audit_log(
+        action="antifraud_backtest",
+        user=current_user.id,
+        resource="antifraud_engine",
+        details={"rows": summary["rows"], "approval_limit": approval_limit, "approved": approved}
+    )
+    return summary
@@ -2,38 +2,163 @@
 Anti-Fraud Rule Engine.
 Implements a configurable risk scoring system based on heuristic analysis.
 """
-from typing import List, Dict, Any
-from app.antifraude.schemas import AntifraudTransaction
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as _np
+except ImportError:  # pragma: no cover — numpy ships with scikit-learn in requirements.txt
+    _np = None  # type: ignore[assignment]
+
+from app.antifraude.schemas import AntifraudResult, AntifraudTransaction
 from app.core.logger import logger
 
 
+# ---------------------------------------------------------------------------
+# Rule parameters. Single source of truth for both the rule objects (used for
+# introspection via /rules) and the inlined scorer used on the hot path.
+# ---------------------------------------------------------------------------
+_NIGHT_START_HOUR = 22
+_NIGHT_END_HOUR = 6
+_NIGHT_TIME_POINTS = 40
+
+_HIGH_VALUE_POINTS = 30
+_HIGH_VALUE_BASE_LIMIT = 300.0
+_HIGH_VALUE_ESTABLISHED_LIMIT = 2_000.0   # accounts >= 90 days with >= 10 confirmed tx
+_HIGH_VALUE_MATURE_LIMIT = 10_000.0       # accounts >= 180 days with >= 30 confirmed tx
+_ESTABLISHED_MIN_AGE_DAYS = 90
+_ESTABLISHED_MIN_TX_30D = 10
+_MATURE_MIN_AGE_DAYS = 180
+_MATURE_MIN_TX_30D = 30
+
+_EXCESSIVE_ATTEMPTS_POINTS = 50
+_EXCESSIVE_ATTEMPTS_LIMIT = 3
+
+_EXTREME_VALUE_POINTS = 60
+_EXTREME_VALUE_LIMIT = 20000.0
+# Every value above the extreme limit also exceeds every HIGH_VALUE tier, so all
+# such values score identically and share one cache key.
+_SATURATED_VALUE_KEY = _EXTREME_VALUE_LIMIT + 1.0
+
+_SCORE_CAP = 100
+# Risk bands over the capped score; shared with the /admin/backtest bucketing.
+MEDIUM_RISK_MIN_SCORE = 30
+HIGH_RISK_MIN_SCORE = 60
+_NO_RULES_TRIGGERED = "No rules triggered"
+
+# Bit flags identifying triggered rules in the mask returned by _fast_analyze.
+_NIGHT_TIME_BIT = 1
+_HIGH_VALUE_BIT = 2
+_EXCESSIVE_ATTEMPTS_BIT = 4
+_EXTREME_VALUE_BIT = 8
+
+
+def _high_value_limit(account_age_days: int, total_transactions_30d: int) -> float:
+    """Profile-adjusted HIGH_VALUE threshold (see HighValueRule)."""
+    if account_age_days >= _MATURE_MIN_AGE_DAYS and total_transactions_30d >= _MATURE_MIN_TX_30D:
+        return _HIGH_VALUE_MATURE_LIMIT
+    if account_age_days >= _ESTABLISHED_MIN_AGE_DAYS and total_transactions_30d >= _ESTABLISHED_MIN_TX_30D:
+        return _HIGH_VALUE_ESTABLISHED_LIMIT
+    return _HIGH_VALUE_BASE_LIMIT
+
+
+def _high_value_description(limit: float) -> str:
+    return f"Transaction value exceeds R$ {limit:.0f} for this account profile"
+
+
+def _fast_analyze(value: float, hour: int, attempts: int, high_value_limit: float) -> Tuple[int, int]:
+    """
+    Inlined evaluation of the built-in rule set.
+    Returns (uncapped score, bitmask of triggered rules) using plain comparisons
+    and arithmetic — no rule-object dispatch or list iteration.
+    """
+    night = hour >= _NIGHT_START_HOUR or hour < _NIGHT_END_HOUR
+    high = value > high_value_limit
+    excessive = attempts > _EXCESSIVE_ATTEMPTS_LIMIT
+    extreme = value > _EXTREME_VALUE_LIMIT
+
+    score = (
+        _NIGHT_TIME_POINTS * night
+        + _HIGH_VALUE_POINTS * high
+        + _EXCESSIVE_ATTEMPTS_POINTS * excessive
+        + _EXTREME_VALUE_POINTS * extreme
+    )
+    mask = (
+        _NIGHT_TIME_BIT * night
+        | _HIGH_VALUE_BIT * high
+        | _EXCESSIVE_ATTEMPTS_BIT * excessive
+        | _EXTREME_VALUE_BIT * extreme
+    )
+    return score, mask
+
+
+@lru_cache(maxsize=4096)
+def _score_cached(value: float, hour: int, attempts: int, high_value_limit: float) -> Tuple[int, int]:
+    """Memoized _fast_analyze. Scoring is a pure function of its inputs."""
+    return _fast_analyze(value, hour, attempts, high_value_limit)
+
+
+def _build_decision_table(approval_limit: int) -> Tuple[Tuple[bool, str, str, str], ...]:
+    """
+    (approved, risk_level, recommendation, reason) for every capped score 0..100,
+    indexed by score. Built once per approval limit instead of branching per call.
+    """
+    table = []
+    for score in range(_SCORE_CAP + 1):
+        approved = score < approval_limit
+        if score < MEDIUM_RISK_MIN_SCORE:
+            risk_level, recommendation = "LOW", "Approve transaction"
+        elif score < HIGH_RISK_MIN_SCORE:
+            risk_level, recommendation = "MEDIUM", "Approve with monitoring"
+        else:
+            risk_level, recommendation = "HIGH", "Reject and notify user"
+        if approved:
+            reason = "Transaction approved - acceptable risk"
+        else:
+            reason = f"Transaction rejected - {risk_level.lower()} risk detected"
+        table.append((approved, risk_level, recommendation, reason))
+    return tuple(table)
+
+
 class AntifraudRule:
     """Abstract base class for fraud detection rules. Enforces the Strategy Pattern."""
 
+    __slots__ = ("name", "points", "description", "label")
+
     def __init__(self, name: str, points: int, description: str):
         self.name = name
         self.points = points
         self.description = description
+        # Preformatted "NAME: description" entry reported in triggered_rules.
+        self.label = f"{name}: {description}"
 
     def evaluate(self, transaction: AntifraudTransaction) -> bool:
         """Evaluates the rule against the transaction context. Returns True if triggered."""
         raise NotImplementedError
 
+    async def evaluate_async(self, transaction: AntifraudTransaction) -> bool:
+        """Async hook for I/O-bound rules; defaults to the synchronous evaluate()."""
+        return self.evaluate(transaction)
+
 
 class NightTimeRule(AntifraudRule):
     """Heuristic: High-risk time window (22:00 - 06:00)."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             name="NIGHT_TIME",
-            points=40,
+            points=_NIGHT_TIME_POINTS,
             description="Transaction performed during high-risk hours (22h-6h)"
         )
 
     def evaluate(self, transaction: AntifraudTransaction) -> bool:
-        hour = int(transaction.time.split(':')[0])
+        hour = transaction.hour
         # Night time: 22:00 inclusive to 06:00 exclusive
-        return hour >= 22 or hour < 6
+        return hour >= _NIGHT_START_HOUR or hour < _NIGHT_END_HOUR
 
 
 class HighValueRule(AntifraudRule):
@@ -43,39 +168,38 @@ class HighValueRule(AntifraudRule):
     false positives for established users with consistent high-volume behaviour.
     """
 
-    _BASE_LIMIT = 300.0
-    _ESTABLISHED_LIMIT = 2_000.0   # accounts >= 90 days with >= 10 confirmed tx
-    _MATURE_LIMIT = 10_000.0       # accounts >= 180 days with >= 30 confirmed tx
+    __slots__ = ()
+
+    _BASE_LIMIT = _HIGH_VALUE_BASE_LIMIT
+    _ESTABLISHED_LIMIT = _HIGH_VALUE_ESTABLISHED_LIMIT
+    _MATURE_LIMIT = _HIGH_VALUE_MATURE_LIMIT
 
     def __init__(self):
         super().__init__(
             name="HIGH_VALUE",
-            points=30,
+            points=_HIGH_VALUE_POINTS,
             description="Transaction value exceeds profile-adjusted threshold",
         )
 
     def _threshold(self, transaction: AntifraudTransaction) -> float:
-        age = transaction.account_age_days
-        tx30 = transaction.total_transactions_30d
-        if age >= 180 and tx30 >= 30:
-            return self._MATURE_LIMIT
-        if age >= 90 and tx30 >= 10:
-            return self._ESTABLISHED_LIMIT
-        return self._BASE_LIMIT
+        return _high_value_limit(transaction.account_age_days, transaction.total_transactions_30d)
 
     def evaluate(self, transaction: AntifraudTransaction) -> bool:
         limit = self._threshold(transaction)
-        self.description = f"Transaction value exceeds R$ {limit:.0f} for this account profile"
+        self.description = _high_value_description(limit)
+        self.label = f"{self.name}: {self.description}"
         return transaction.value > limit
 
 
 class ExcessiveAttemptsRule(AntifraudRule):
     """Heuristic: Velocity check (excessive attempts in 24h window)."""
 
-    def __init__(self, limit: int = 3):
+    __slots__ = ("limit",)
+
+    def __init__(self, limit: int = _EXCESSIVE_ATTEMPTS_LIMIT):
         super().__init__(
             name="EXCESSIVE_ATTEMPTS",
-            points=50,
+            points=_EXCESSIVE_ATTEMPTS_POINTS,
             description=f"More than {limit} attempts in the last 24h"
         )
         self.limit = limit
@@ -87,10 +211,12 @@ class ExcessiveAttemptsRule(AntifraudRule):
 class ExtremeValueRule(AntifraudRule):
     """Heuristic: Extreme value anomaly detection."""
 
-    def __init__(self, limit: float = 20000.0):
+    __slots__ = ("limit",)
+
+    def __init__(self, limit: float = _EXTREME_VALUE_LIMIT):
         super().__init__(
             name="EXTREME_VALUE",
-            points=60,
+            points=_EXTREME_VALUE_POINTS,
             description=f"Transaction value exceeds R$ {limit} (extreme)"
         )
         self.limit = limit
@@ -108,65 +234,209 @@ class AntifraudEngine:
     """
 
     def __init__(self):
-        self.rules: List[AntifraudRule] = [
+        # Rule objects are kept for introspection (/rules); scoring itself runs
+        # through the inlined _fast_analyze using the same parameters.
+        self.rules: Tuple[AntifraudRule, ...] = (
             NightTimeRule(),
             HighValueRule(),
-            ExcessiveAttemptsRule(limit=3),
-            ExtremeValueRule(limit=20000.0),
-        ]
+            ExcessiveAttemptsRule(limit=_EXCESSIVE_ATTEMPTS_LIMIT),
+            ExtremeValueRule(limit=_EXTREME_VALUE_LIMIT),
+        )
+        # Optional I/O-bound rules, evaluated only by analyze_async().
+        self.external_rules: List[AntifraudRule] = []
         self.approval_limit = 80
 
-    def analyze(self, transaction: AntifraudTransaction) -> Dict[str, Any]:
+        rules_by_name = {rule.name: rule for rule in self.rules}
+        night = rules_by_name["NIGHT_TIME"]
+        attempts = rules_by_name["EXCESSIVE_ATTEMPTS"]
+        extreme = rules_by_name["EXTREME_VALUE"]
+        # (bit, name, points, label) in rule-chain order; HIGH_VALUE's label
+        # depends on the profile threshold and is resolved per transaction.
+        self._rule_bits: Tuple[Tuple[int, str, int, str], ...] = (
+            (_NIGHT_TIME_BIT, night.name, night.points, night.label),
+            (_HIGH_VALUE_BIT, "HIGH_VALUE", _HIGH_VALUE_POINTS, ""),
+            (_EXCESSIVE_ATTEMPTS_BIT, attempts.name, attempts.points, attempts.label),
+            (_EXTREME_VALUE_BIT, extreme.name, extreme.points, extreme.label),
+        )
+        self._high_value_labels: Dict[float, str] = {
+            limit: f"HIGH_VALUE: {_high_value_description(limit)}"
+            for limit in (_HIGH_VALUE_BASE_LIMIT, _HIGH_VALUE_ESTABLISHED_LIMIT, _HIGH_VALUE_MATURE_LIMIT)
+        }
+
+    @property
+    def approval_limit(self) -> int:
+        return self._approval_limit
+
+    @approval_limit.setter
+    def approval_limit(self, value: int) -> None:
+        self._approval_limit = value
+        self._decisions = _build_decision_table(value)
+        self._rules_snapshot = {
+            "total_rules": len(self.rules),
+            "approval_limit": value,
+            "rules": [
+                {"name": rule.name, "points": rule.points, "description": rule.description}
+                for rule in self.rules
+            ],
+        }
+
+    @property
+    def rules_snapshot(self) -> Dict[str, Any]:
+        """Rule configuration as served by /rules; rebuilt only when approval_limit changes."""
+        return self._rules_snapshot
+
+    def analyze(self, transaction: AntifraudTransaction) -> AntifraudResult:
         """
         Executes the rule chain against the transaction context.
         Returns a comprehensive risk assessment including score, decision, and triggered rules.
+        The result is built with model_construct: every field is computed here, so
+        Pydantic validation would only re-check known-good values.
         """
-        score = 0
+        high_value_limit = _high_value_limit(
+            transaction.account_age_days, transaction.total_transactions_30d
+        )
+        value = transaction.value
+        if value > _EXTREME_VALUE_LIMIT:
+            value = _SATURATED_VALUE_KEY
+        score, mask = _score_cached(
+            value, transaction.hour, transaction.attempts_last_24h, high_value_limit
+        )
+
         triggered_rules: List[str] = []
+        if mask:
+            for bit, _, _, label in self._rule_bits:
+                if mask & bit:
+                    if bit == _HIGH_VALUE_BIT:
+                        label = self._high_value_labels[high_value_limit]
+                    triggered_rules.append(label)
+
+        return self._decide(score, triggered_rules, mask)
+
+    async def analyze_async(
+        self, transaction: AntifraudTransaction, exhaustive: bool = False
+    ) -> AntifraudResult:
+        """
+        Async variant of analyze() for the API layer.
+        Built-in rules are pure CPU and go through the synchronous scorer; rules in
+        external_rules (remote lookups, model scoring) are awaited concurrently with
+        asyncio.gather, so the added latency is the slowest call rather than the sum.
+
+        When the built-in score already reaches the cap, external rules cannot change
+        score or decision and are skipped; pass exhaustive=True when triggered_rules
+        must list every match (audit replay).
+        """
+        if not self.external_rules:
+            return self.analyze(transaction)
+
+        base = self.analyze(transaction)
+        if base.score >= _SCORE_CAP and not exhaustive:
+            return base
+        outcomes = await asyncio.gather(
+            *(rule.evaluate_async(transaction) for rule in self.external_rules)
+        )
+        hits = [rule for rule, hit in zip(self.external_rules, outcomes) if hit]
+        if not hits:
+            return base
 
-        # Evaluate each rule
-        for rule in self.rules:
-            if rule.evaluate(transaction):
-                score += rule.points
-                triggered_rules.append(f"{rule.name}: {rule.description}")
-                logger.info(f"Rule triggered: {rule.name} (+{rule.points} points)")
+        triggered_rules = [label for label in base.triggered_rules if label != _NO_RULES_TRIGGERED]
+        triggered_rules.extend(rule.label for rule in hits)
+        return self._decide(base.score + sum(rule.points for rule in hits), triggered_rules)
 
+    def _decide(
+        self, score: int, triggered_rules: List[str], mask: Optional[int] = None
+    ) -> AntifraudResult:
+        """
+        Caps the score and maps it to the approval decision and risk level.
+        mask is the built-in rule bitmask when known; without it the rule names for
+        the log line are taken from the triggered labels.
+        """
         # Cap score at 100
-        score = min(score, 100)
-
-        # Determine approval status
-        approved = score < self.approval_limit
-
-        # Determine risk level
-        if score < 30:
-            risk_level = "LOW"
-            recommendation = "Approve transaction"
-        elif score < 60:
-            risk_level = "MEDIUM"
-            recommendation = "Approve with monitoring"
-        else:
-            risk_level = "HIGH"
-            recommendation = "Reject and notify user"
+        score = min(score, _SCORE_CAP)
+        approved, risk_level, recommendation, reason = self._decisions[score]
+
+        result = AntifraudResult.model_construct(
+            score=score,
+            approved=approved,
+            reason=reason,
+            triggered_rules=triggered_rules if triggered_rules else [_NO_RULES_TRIGGERED],
+            risk_level=risk_level,
+            recommendation=recommendation
+        )
 
-        # Define reason
-        if approved:
-            reason = "Transaction approved - acceptable risk"
-        else:
-            reason = f"Transaction rejected - {risk_level.lower()} risk detected"
+        # Single summary line, lazily formatted: no string work when INFO is filtered out.
+        if logger.isEnabledFor(logging.INFO):
+            if mask is None:
+                rule_names = [label.split(":", 1)[0] for label in triggered_rules]
+            else:
+                rule_names = [name for bit, name, _, _ in self._rule_bits if mask & bit]
+            logger.info(
+                "Anti-fraud analysis completed: score=%s, approved=%s, level=%s, rules=%s",
+                score, approved, risk_level,
+                rule_names,
+            )
 
-        result: Dict[str, Any] = {
-            "score": score,
-            "approved": approved,
-            "reason": reason,
-            "triggered_rules": triggered_rules if triggered_rules else ["No rules triggered"],
-            "risk_level": risk_level,
-            "recommendation": recommendation
-        }
+        return result
 
-        logger.info(f"Anti-fraud analysis completed: score={score}, approved={approved}, level={risk_level}")
+    def analyze_batch(
+        self,
+        values: "_np.ndarray",
+        hours: "_np.ndarray",
+        attempts: "_np.ndarray",
+        account_age_days: Optional["_np.ndarray"] = None,
+        total_transactions_30d: Optional["_np.ndarray"] = None,
+    ) -> "_np.ndarray":
+        """
+        Vectorized scorer for offline replay and threshold backtesting.
+        Applies the same rule parameters as analyze() column-wise and returns the
+        capped scores as int8 (0..100). Missing profile columns default to a new
+        account, i.e. the base HIGH_VALUE threshold.
+        """
+        if _np is None:
+            raise RuntimeError("numpy is required for batch scoring")
 
-        return result
+        values = _np.asarray(values, dtype=_np.float64)
+        hours = _np.asarray(hours)
+        attempts = _np.asarray(attempts)
+
+        if account_age_days is None and total_transactions_30d is None:
+            high_value_limit = _HIGH_VALUE_BASE_LIMIT
+        else:
+            if account_age_days is None:
+                account_age_days = _np.zeros(values.shape, dtype=_np.int32)
+            if total_transactions_30d is None:
+                total_transactions_30d = _np.zeros(values.shape, dtype=_np.int32)
+            account_age_days = _np.asarray(account_age_days)
+            total_transactions_30d = _np.asarray(total_transactions_30d)
+            high_value_limit = _np.full(values.shape, _HIGH_VALUE_BASE_LIMIT)
+            high_value_limit[
+                (account_age_days >= _ESTABLISHED_MIN_AGE_DAYS)
+                & (total_transactions_30d >= _ESTABLISHED_MIN_TX_30D)
+            ] = _HIGH_VALUE_ESTABLISHED_LIMIT
+            high_value_limit[
+                (account_age_days >= _MATURE_MIN_AGE_DAYS)
+                & (total_transactions_30d >= _MATURE_MIN_TX_30D)
+            ] = _HIGH_VALUE_MATURE_LIMIT
+
+        # Bool masks times int16 points, accumulated in place into one buffer:
+        # avoids np.where's full-width int64 temporaries per rule.
+        score = ((hours >= _NIGHT_START_HOUR) | (hours < _NIGHT_END_HOUR)) * _np.int16(_NIGHT_TIME_POINTS)
+        score += (values > high_value_limit) * _np.int16(_HIGH_VALUE_POINTS)
+        score += (attempts > _EXCESSIVE_ATTEMPTS_LIMIT) * _np.int16(_EXCESSIVE_ATTEMPTS_POINTS)
+        score += (values > _EXTREME_VALUE_LIMIT) * _np.int16(_EXTREME_VALUE_POINTS)
+        _np.minimum(score, _SCORE_CAP, out=score)
+        return score.astype(_np.int8)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss statistics of the memoized scorer."""
+        info = _score_cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+    def clear_cache(self) -> None:
+        """Drops all memoized scores (e.g. after a rule parameter change)."""
+        _score_cached.cache_clear()
 
 
 # Singleton engine instance
 antifraud_engine = AntifraudEngine()
+# Portuguese alias — same instance, no second engine.
+motor_antifraude = antifraud_engine
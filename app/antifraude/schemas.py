@@ -3,19 +3,31 @@ Pydantic schemas for fraud analysis.
 Enforces strict input validation and format constraints.
 """
 from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import AliasChoices, BaseModel, Field, PrivateAttr, field_validator, model_validator
 
 
 class AntifraudTransaction(BaseModel):
-    """Fraud analysis request payload."""
-    value: float = Field(..., gt=0, description="Transaction value (R$)")
-    time: str = Field(..., description="Transaction time (HH:MM)")
-    attempts_last_24h: int = Field(..., ge=0, description="Attempts in last 24h")
+    """
+    Fraud analysis request payload.
+    Core fields also accept their Portuguese names (valor, horario,
+    tentativas_ultimas_24h) so the legacy /antifraude API shares this schema.
+    """
+    value: float = Field(..., gt=0, validation_alias=AliasChoices("value", "valor"), description="Transaction value (R$)")
+    time: str = Field(..., validation_alias=AliasChoices("time", "horario"), description="Transaction time (HH:MM)")
+    attempts_last_24h: int = Field(
+        ...,
+        ge=0,
+        validation_alias=AliasChoices("attempts_last_24h", "tentativas_ultimas_24h"),
+        description="Attempts in last 24h"
+    )
     transaction_type: str = Field(default="PIX", description="Transaction type")
     origin: Optional[str] = Field(None, description="Transaction origin")
     account_age_days: int = Field(default=0, ge=0, description="Account age in days at transaction time")
     total_transactions_30d: int = Field(default=0, ge=0, description="Confirmed transactions in last 30 days")
 
+    # Hour component of `time`, parsed once at validation so rules compare ints.
+    _hour: int = PrivateAttr(default=0)
+
     @field_validator('time')
     @classmethod
     def validate_time(cls, v: str) -> str:
@@ -28,6 +40,17 @@ class AntifraudTransaction(BaseModel):
         except Exception:
             raise ValueError('Invalid time format. Use HH:MM')
 
+    @model_validator(mode='after')
+    def store_hour(self) -> "AntifraudTransaction":
+        """Caches the parsed hour of `time` for the rule engine."""
+        self._hour = int(self.time.split(':', 1)[0])
+        return self
+
+    @property
+    def hour(self) -> int:
+        """Transaction hour (0-23) parsed from `time`."""
+        return self._hour
+
     @field_validator('attempts_last_24h')
     @classmethod
     def validate_attempts(cls, v: int) -> int:
@@ -45,3 +68,8 @@ class AntifraudResult(BaseModel):
     triggered_rules: List[str] = Field(..., description="Rules contributing to score")
     risk_level: str = Field(..., description="Risk Level: LOW, MEDIUM, HIGH")
     recommendation: str = Field(..., description="Action recommendation")
+
+
+# Portuguese names kept as aliases of the canonical schemas (single implementation).
+TransacaoAntifraude = AntifraudTransaction
+ResultadoAntifraude = AntifraudResult
@@ -1,18 +1,92 @@
+import hashlib
+import threading
+import time
+from typing import Optional
 from fastapi import Request, Response, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from app.core.config import settings
 from app.core.database import get_db
 from app.auth.models import User
 from app.pix.models import PixTransaction, PixStatus, TransactionType
-from datetime import timedelta
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Session cookie attributes are constants of settings; built once at import.
+_ACCESS_COOKIE_KWARGS = {
+    "key": "access_token",
+    "httponly": True, "secure": True, "samesite": "strict",
+    "max_age": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    "expires": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+}
+_REFRESH_COOKIE_KWARGS = {
+    "key": "refresh_token",
+    "httponly": True, "secure": True, "samesite": "strict",
+    "max_age": settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+    "expires": settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+}
+
+
+def set_session_cookies(
+    response: Response,
+    access_token: str,
+    refresh_token: str,
+    request: Optional[Request] = None,
+) -> None:
+    """
+    Sets the access_token (Bearer-prefixed) and refresh_token session cookies.
+    When the request is given, cookies the client already holds with the same
+    value (e.g. a re-issued login pair) are not sent again.
+    """
+    sent = request.cookies if request is not None else {}
+    access_value = f"Bearer {access_token}"
+    if sent.get("access_token") != access_value:
+        response.set_cookie(value=access_value, **_ACCESS_COOKIE_KWARGS)
+    if sent.get("refresh_token") != refresh_token:
+        response.set_cookie(value=refresh_token, **_REFRESH_COOKIE_KWARGS)
+
+
+# Built once: every request reuses the same statement object, so SQLAlchemy's
+# compiled-SQL cache is hit without rebuilding a Query per call.
+_USER_BY_DOCUMENT = select(User).where(User.cpf_cnpj == bindparam("cpf_cnpj"))
+
+
+def get_user_by_document(db: Session, cpf_cnpj: str) -> "User | None":
+    """Loads the user for a token subject (indexed unique cpf_cnpj lookup)."""
+    return db.execute(_USER_BY_DOCUMENT, {"cpf_cnpj": cpf_cnpj}).scalar_one_or_none()
+
+
+# Verified access-token payloads keyed on a digest of the raw cookie, so repeat
+# requests on a session skip signature verification. An entry is honoured only
+# until the token's own exp claim: caching never extends a token's lifetime.
+_TOKEN_CACHE_MAX = 50_000
+_token_cache: dict[bytes, tuple[dict, float]] = {}
+_token_cache_lock = threading.Lock()
+
+
+def _token_key(raw_cookie: str) -> bytes:
+    return hashlib.blake2b(raw_cookie.encode(), digest_size=16).digest()
+
+
+def forget_access_token(raw_cookie: str) -> None:
+    """Drops a cached token payload (logout)."""
+    _token_cache.pop(_token_key(raw_cookie), None)
+
 
 def _decode_access_token(raw_cookie: str) -> dict | None:
     """Returns payload dict if valid access token; None on any error."""
+    key = _token_key(raw_cookie)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        payload, exp = cached
+        if exp > time.time():
+            return payload
+        _token_cache.pop(key, None)
+        return None
+
     try:
         scheme, _, param = raw_cookie.partition(" ")
         token = param if param else scheme
@@ -20,17 +94,25 @@ def _decode_access_token(raw_cookie: str) -> dict | None:
         # Reject refresh tokens used as access tokens
         if payload.get("type") == "refresh":
             return None
-        return payload
     except JWTError:
         return None
 
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _token_cache_lock:
+            if len(_token_cache) >= _TOKEN_CACHE_MAX:
+                # Oldest insertion first — dicts preserve insertion order.
+                _token_cache.pop(next(iter(_token_cache)), None)
+            _token_cache[key] = (payload, float(exp))
+    return payload
+
 
 def _try_refresh(refresh_raw: str, response: Response, db: Session) -> "User | None":
     """
     Validates the refresh token, issues new access + refresh tokens via response cookies,
     and returns the user. Returns None if the refresh token is invalid or expired.
     """
-    from app.auth.service import create_access_token, create_refresh_token
+    from app.auth.service import ACCESS_TOKEN_EXPIRES, create_access_token, create_refresh_token
     try:
         payload = jwt.decode(refresh_raw, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         if payload.get("type") != "refresh":
@@ -41,30 +123,16 @@ def _try_refresh(refresh_raw: str, response: Response, db: Session) -> "User | N
     except JWTError:
         return None
 
-    user = db.query(User).filter(User.cpf_cnpj == cpf_cnpj).first()
+    user = get_user_by_document(db, cpf_cnpj)
     if not user or not user.email_verified or not user.is_active:
         return None
 
     new_access = create_access_token(
         data={"sub": user.cpf_cnpj, "name": user.name},
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        expires_delta=ACCESS_TOKEN_EXPIRES,
     )
     new_refresh = create_refresh_token(data={"sub": user.cpf_cnpj, "name": user.name})
-
-    response.set_cookie(
-        key="access_token",
-        value=f"Bearer {new_access}",
-        httponly=True, secure=True, samesite="strict",
-        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=new_refresh,
-        httponly=True, secure=True, samesite="strict",
-        max_age=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-    )
+    set_session_cookies(response, new_access, new_refresh)
     return user
 
 
@@ -90,7 +158,7 @@ def get_current_user(request: Request, response: Response, db: Session = Depends
         if payload:
             cpf_cnpj = payload.get("sub")
             if cpf_cnpj and isinstance(cpf_cnpj, str):
-                user = db.query(User).filter(User.cpf_cnpj == cpf_cnpj).first()
+                user = get_user_by_document(db, cpf_cnpj)
 
     # 2. Access token invalid/expired — try refresh
     if not user and refresh_token_raw:
@@ -113,6 +181,24 @@ def get_current_user(request: Request, response: Response, db: Session = Depends
     return user
 
 
+# Fallback for accounts not yet flagged active; prebuilt like _USER_BY_DOCUMENT.
+_FIRST_CONFIRMED_DEPOSIT = (
+    select(PixTransaction.id)
+    .where(
+        PixTransaction.user_id == bindparam("user_id"),
+        PixTransaction.type == TransactionType.RECEIVED,
+        PixTransaction.status == PixStatus.CONFIRMED,
+    )
+    .limit(1)
+)
+
+_ACTIVATE_ACCOUNT = (
+    update(User)
+    .where(User.id == bindparam("user_id"), User.is_active_account.is_(False))
+    .values(is_active_account=True)
+)
+
+
 def require_active_account(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -120,12 +206,13 @@ def require_active_account(
     """
     Verifies if the user has made at least one deposit (Incoming PIX).
     Blocks access to critical features if the account is not active.
+    Reads the cached users.is_active_account flag; only accounts not yet flagged
+    fall back to the transacoes_pix lookup, which backfills the flag on success.
     """
-    has_deposit = db.query(PixTransaction).filter(
-        PixTransaction.user_id == user.id,
-        PixTransaction.type == TransactionType.RECEIVED,
-        PixTransaction.status == PixStatus.CONFIRMED
-    ).first()
+    if user.is_active_account:
+        return user
+
+    has_deposit = db.execute(_FIRST_CONFIRMED_DEPOSIT, {"user_id": user.id}).first()
 
     if not has_deposit:
         raise HTTPException(
@@ -133,6 +220,13 @@ def require_active_account(
             detail="Inactive account. Make a first deposit (Received PIX) to unlock all features."
         )
 
+    # Backfill on its own connection so the request's unit of work is not committed
+    # early (and `user` not expired); the WHERE makes concurrent backfills a no-op.
+    with db.get_bind().begin() as conn:
+        conn.execute(_ACTIVATE_ACCOUNT, {"user_id": user.id})
+    # Already persisted: update the loaded instance without marking it dirty.
+    set_committed_value(user, "is_active_account", True)
+
     return user
 
 
@@ -40,6 +40,9 @@ class User(Base):
     document_verified: Mapped[bool] = mapped_column("document_verified", Boolean, default=False, nullable=False)
     is_active: Mapped[bool] = mapped_column("is_active", Boolean, default=True, nullable=False)
     is_admin: Mapped[bool] = mapped_column("is_admin", Boolean, default=False, nullable=False)
+    # Set once the first inbound PIX is credited; lets require_active_account skip
+    # the per-request deposit lookup on transacoes_pix.
+    is_active_account: Mapped[bool] = mapped_column("is_active_account", Boolean, default=False, nullable=False)
 
     # Password reset — stores argon2id hash of temp password (~97 chars), requires String(255)
     password_reset_token: Mapped[Optional[str]] = mapped_column("password_reset_token", String(255), nullable=True, index=True)
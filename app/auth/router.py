@@ -1,5 +1,7 @@
 ﻿from fastapi import APIRouter, Depends, HTTPException, Response, status, Header, Request
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from uuid import uuid4
 from typing import Optional
@@ -9,22 +11,30 @@ from app.core.database import get_db
 from app.auth.models import User
 from app.auth.schemas import UserCreate, UserLogin, DepositRequest, DepositResponse, BalanceResponse, PasswordResetRequest, PasswordResetConfirm, PasswordResetConfirmWithTemp, RecoveryCodeValidate
 from app.auth.service import (
+    ACCESS_TOKEN_EXPIRES,
     get_password_hash,
     verify_password,
+    verify_password_for_missing_user,
     create_access_token,
     create_refresh_token,
+    issue_login_tokens,
+    password_needs_rehash,
     deposit_funds,
     get_user_balance
 )
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import (
+    forget_access_token,
+    get_current_user,
+    get_user_by_document,
+    set_session_cookies,
+)
 from app.core.email_service import send_verification_email
 from app.core.document_validator import validate_document
 from app.adapters.gateway_factory import get_payment_gateway
-from datetime import timedelta, datetime, timezone
+from datetime import datetime, timezone
 from app.core.config import settings
 from app.core.logger import logger
 from app.core.security import mask_sensitive_data
-import traceback
 import secrets
 import re
 
@@ -41,6 +51,17 @@ _REG_WINDOW = 300     # per 5-minute sliding window
 _login_store: dict[str, _collections.deque] = {}
 _reg_store: dict[str, _collections.deque] = {}
 
+def _dialect_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's backend."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert
+    return sqlite_insert
+
+
+# Single shared deposit wallet — no individual subcontas.
+# All accounts route inbound PIX deposits through this wallet key.
+_SHARED_DEPOSIT_WALLET = "1a923d7b-3230-46d4-a670-87bf7ee54817"
+
 
 def _rate_limit(store: dict, client_ip: str, max_req: int, window: int) -> None:
     """Raises HTTP 429 if client_ip exceeds max_req within window seconds."""
@@ -77,24 +98,19 @@ def register(request: Request, response: Response, user: UserCreate, db: Session
                 detail=doc_result
             )
 
-        # Check if user already exists
-        db_user = db.query(User).filter(
-            (User.email == user.email) | (User.cpf_cnpj == user.cpf_cnpj)
-        ).first()
-
-        if db_user:
-            logger.warning(f"Duplicate registration attempt: doc={mask_sensitive_data(user.cpf_cnpj)}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email ou CPF/CNPJ ja cadastrado no sistema."
-            )
+        # Hash before the first statement: the session checks out a pooled
+        # connection on first use and holds it until commit, so hashing afterwards
+        # would pin a connection for the whole CPU-bound Argon2 run.
+        hashed_password = get_password_hash(user.password)
 
         # Generate email verification token (cryptographically secure)
         email_token = secrets.token_urlsafe(32)
 
-        # Create new user — email_verified starts False
-        hashed_password = get_password_hash(user.password)
-        new_user = User(
+        # Create new user — email_verified starts False.
+        # Single INSERT ... ON CONFLICT DO NOTHING RETURNING id: the unique
+        # email/cpf_cnpj indexes decide duplicates atomically, so there is no
+        # separate existence SELECT and no check-then-insert race.
+        stmt = _dialect_insert(db)(User).values(
             name=user.name,
             email=user.email,
             cpf_cnpj=user.cpf_cnpj,
@@ -113,27 +129,28 @@ def register(request: Request, response: Response, user: UserCreate, db: Session
             is_active=True,
             is_admin=False,
             pix_random_key=str(uuid4()),
-        )
+            asaas_wallet_id=_SHARED_DEPOSIT_WALLET,
+        ).on_conflict_do_nothing().returning(User.id)
 
-        db.add(new_user)
+        new_user_id = db.execute(stmt).scalar()
+        if new_user_id is None:
+            db.rollback()
+            logger.warning(f"Duplicate registration attempt: doc={mask_sensitive_data(user.cpf_cnpj)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email ou CPF/CNPJ ja cadastrado no sistema."
+            )
+        # User row and wallet assignment land in one transaction / one commit.
         db.commit()
-        db.refresh(new_user)
-
-        logger.info(f"User created: ID {new_user.id} | doc_type={doc_result}")
 
-        # Single shared deposit wallet — no individual subcontas.
-        # All accounts route inbound PIX deposits through this wallet key.
-        _SHARED_DEPOSIT_WALLET = "1a923d7b-3230-46d4-a670-87bf7ee54817"
-        new_user.asaas_wallet_id = _SHARED_DEPOSIT_WALLET
-        db.commit()
         logger.info(
-            f"Shared deposit wallet assigned: user={new_user.id} walletId={_SHARED_DEPOSIT_WALLET}"
+            f"User created: ID {new_user_id} | doc_type={doc_result} | walletId={_SHARED_DEPOSIT_WALLET}"
         )
 
         # Send verification email (non-blocking: failure does not abort registration)
-        sent = send_verification_email(new_user.email, new_user.name, email_token)
+        sent = send_verification_email(user.email, user.name, email_token)
         if not sent:
-            logger.warning(f"Verification email not sent for {new_user.id} (SMTP not configured)")
+            logger.warning(f"Verification email not sent for {new_user_id} (SMTP not configured)")
 
         # NO auto-login — session is only issued after email verification.
         # Returning 201 with instructions; the frontend must redirect to the
@@ -155,8 +172,7 @@ def register(request: Request, response: Response, user: UserCreate, db: Session
         )
     except Exception as e:
         db.rollback()
-        logger.error(f"Internal registration error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Internal registration error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro interno. Tente novamente mais tarde."
@@ -172,9 +188,13 @@ def login(request: Request, response: Response, user_in: UserLogin, db: Session
         _rate_limit(_login_store, request.client.host or "unknown", _LOGIN_MAX, _LOGIN_WINDOW)
         logger.info(f"Login attempt: doc={mask_sensitive_data(user_in.cpf_cnpj)}")
 
-        user = db.query(User).filter(User.cpf_cnpj == user_in.cpf_cnpj).first()
+        user = get_user_by_document(db, user_in.cpf_cnpj)
+        if user is not None:
+            password_ok = verify_password(user_in.password, user.hashed_password)
+        else:
+            password_ok = verify_password_for_missing_user(user_in.password)
 
-        if not user or not verify_password(user_in.password, user.hashed_password):
+        if not password_ok:
             logger.warning(f"Login failure: doc={mask_sensitive_data(user_in.cpf_cnpj)} - Invalid credentials")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -190,33 +210,14 @@ def login(request: Request, response: Response, user_in: UserLogin, db: Session
                 detail="E-mail nao verificado. Acesse seu e-mail e clique no link de confirmacao antes de entrar."
             )
 
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.cpf_cnpj, "name": user.name},
-            expires_delta=access_token_expires
-        )
-        refresh_token = create_refresh_token(
-            data={"sub": user.cpf_cnpj, "name": user.name}
-        )
+        # Transparent upgrade of hashes created with older Argon2 parameters.
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = get_password_hash(user_in.password)
+            db.commit()
 
-        response.set_cookie(
-            key="access_token",
-            value=f"Bearer {access_token}",
-            httponly=True,
-            secure=True,
-            samesite="strict",
-            max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            expires=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            secure=True,
-            samesite="strict",
-            max_age=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-            expires=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-        )
+        access_token, refresh_token = issue_login_tokens(user.cpf_cnpj, user.name)
+
+        set_session_cookies(response, access_token, refresh_token, request)
 
         logger.info(f"Login successful: user_id={user.id}")
 
@@ -229,8 +230,7 @@ def login(request: Request, response: Response, user_in: UserLogin, db: Session
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Internal login error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Internal login error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error performing login."
@@ -238,7 +238,10 @@ def login(request: Request, response: Response, user_in: UserLogin, db: Session
 
 
 @router.post("/logout")
-def logout(response: Response):
+def logout(request: Request, response: Response):
+    access_token = request.cookies.get("access_token")
+    if access_token:
+        forget_access_token(access_token)
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
     return {"message": "Logout successful"}
@@ -264,30 +267,16 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
     except _JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expirado ou invalido.")
 
-    user = db.query(User).filter(User.cpf_cnpj == cpf_cnpj).first()
+    user = get_user_by_document(db, cpf_cnpj)
     if not user or not user.email_verified or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Sessao invalida.")
 
     access_token = create_access_token(
         data={"sub": user.cpf_cnpj, "name": user.name},
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expires_delta=ACCESS_TOKEN_EXPIRES
     )
     new_refresh = create_refresh_token(data={"sub": user.cpf_cnpj, "name": user.name})
-
-    response.set_cookie(
-        key="access_token",
-        value=f"Bearer {access_token}",
-        httponly=True, secure=True, samesite="strict",
-        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=new_refresh,
-        httponly=True, secure=True, samesite="strict",
-        max_age=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-    )
+    set_session_cookies(response, access_token, new_refresh)
     logger.info(f"Token refreshed: user_id={user.id}")
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -328,32 +317,14 @@ def verify_email(token: str, db: Session = Depends(get_db)):
     # through the login page after clicking the verification link.
     # Both access_token (short-lived) and refresh_token (long-lived) are issued
     # to enable transparent auto-refresh in get_current_user.
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.cpf_cnpj, "name": user.name},
-        expires_delta=access_token_expires
+        expires_delta=ACCESS_TOKEN_EXPIRES
     )
     refresh_token_value = create_refresh_token(data={"sub": user.cpf_cnpj, "name": user.name})
     from fastapi.responses import RedirectResponse
     redirect = RedirectResponse(url="/?email_verificado=1", status_code=302)
-    redirect.set_cookie(
-        key="access_token",
-        value=f"Bearer {access_token}",
-        httponly=True,
-        secure=True,
-        samesite="strict",
-        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-    )
-    redirect.set_cookie(
-        key="refresh_token",
-        value=refresh_token_value,
-        httponly=True,
-        secure=True,
-        samesite="strict",
-        max_age=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-    )
+    set_session_cookies(redirect, access_token, refresh_token_value)
     return redirect
 
 
@@ -370,7 +341,7 @@ def resend_verification(payload: dict, db: Session = Depends(get_db)):
     if not cpf_cnpj:
         raise HTTPException(status_code=400, detail="CPF/CNPJ obrigatorio.")
 
-    user = db.query(User).filter(User.cpf_cnpj == cpf_cnpj).first()
+    user = get_user_by_document(db, cpf_cnpj)
     if not user or user.email_verified:
         # Anti-enumeration: do not reveal whether account exists or is already verified.
         return {"message": "Se o cadastro existir e o e-mail nao estiver verificado, um novo link sera enviado."}
@@ -572,8 +543,7 @@ def deposit(
             detail=str(ve)
         )
     except Exception as e:
-        logger.error(f"Error processing deposit for user {current_user.id}: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error processing deposit for user %s: %s", current_user.id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error processing deposit"
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
 from typing import Optional
-import re
+from app.core.utils import digits_only
 
 
 class UserCreate(BaseModel):
@@ -20,17 +20,17 @@ class UserCreate(BaseModel):
     @field_validator('cpf_cnpj')
     @classmethod
     def validate_cpf_cnpj(cls, v: str) -> str:
-        return re.sub(r'\D', '', v)
+        return digits_only(v)
 
     @field_validator('phone')
     @classmethod
     def strip_phone(cls, v: str) -> str:
-        return re.sub(r'\D', '', v)
+        return digits_only(v)
 
     @field_validator('address_zip')
     @classmethod
     def strip_zip(cls, v: str) -> str:
-        return re.sub(r'\D', '', v)
+        return digits_only(v)
 
     @field_validator('address_state')
     @classmethod
@@ -45,7 +45,7 @@ class UserLogin(BaseModel):
     @field_validator('cpf_cnpj')
     @classmethod
     def validate_cpf_cnpj(cls, v: str) -> str:
-        return re.sub(r'\D', '', v)
+        return digits_only(v)
 
 
 class UserResponse(BaseModel):
@@ -1,22 +1,136 @@
-﻿from passlib.context import CryptContext
+﻿from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from calendar import timegm
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from functools import lru_cache
 from jose import jwt
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.auth.models import User
 from app.core.logger import audit_log, logger
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Token lifetimes are constants of settings; built once at import.
+ACCESS_TOKEN_EXPIRES = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+REFRESH_TOKEN_EXPIRES = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+
+# Argon2id with the OWASP baseline (46 MiB, t=1, p=1), via argon2-cffi directly.
+# Hashes written by the previous passlib context ($argon2id$ m=64 MiB, t=3, p=4)
+# still verify; password_needs_rehash flags them for upgrade on next login.
+pwd_hasher = PasswordHasher(time_cost=1, memory_cost=47_104, parallelism=1)
+
+# Argon2 is memory-hard and releases the GIL while hashing, so threadpool
+# workers already run it in parallel across cores. Capping concurrent hashes at
+# the core count keeps throughput and bounds peak memory during signup/login
+# bursts (each in-flight hash allocates its full memory_cost).
+_HASH_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+# Opt-in (AUTH_VERIFY_CACHE_ENABLED) memo of successful verifications. Keys are
+# blake2b digests under a per-process random key, so the cache never holds
+# passwords and its entries are useless outside this process. Failures are
+# never cached, so guessing still pays the full Argon2 cost every time.
+_VERIFY_CACHE_TTL_SECONDS = 60
+_VERIFY_CACHE_MAX = 4096
+_VERIFY_CACHE_KEY = secrets.token_bytes(32)
+_verified: Dict[bytes, float] = {}
+_verified_lock = threading.Lock()
+
+
+def _verify_cache_key(plain_password: str, hashed_password: str) -> bytes:
+    return hashlib.blake2b(
+        plain_password.encode() + b"\x00" + hashed_password.encode(),
+        key=_VERIFY_CACHE_KEY,
+        digest_size=16,
+    ).digest()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    cache_key = None
+    if settings.AUTH_VERIFY_CACHE_ENABLED:
+        cache_key = _verify_cache_key(plain_password, hashed_password)
+        verified_at = _verified.get(cache_key)
+        if verified_at is not None and time.monotonic() - verified_at < _VERIFY_CACHE_TTL_SECONDS:
+            return True
+
+    with _HASH_SLOTS:
+        try:
+            ok = pwd_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    if ok and cache_key is not None:
+        now = time.monotonic()
+        with _verified_lock:
+            if len(_verified) >= _VERIFY_CACHE_MAX:
+                stale = [k for k, t in _verified.items() if now - t >= _VERIFY_CACHE_TTL_SECONDS]
+                for k in stale:
+                    del _verified[k]
+                if len(_verified) >= _VERIFY_CACHE_MAX:
+                    _verified.clear()
+            _verified[cache_key] = now
+    return ok
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with _HASH_SLOTS:
+        return pwd_hasher.hash(password)
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    return get_password_hash(secrets.token_urlsafe(16))
+
+
+def verify_password_for_missing_user(plain_password: str) -> bool:
+    """
+    Runs a full verification against a throwaway hash and returns False, so a
+    login for an unknown document costs the same as a wrong password and
+    response timing does not reveal which accounts exist.
+    """
+    verify_password(plain_password, _dummy_password_hash())
+    return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash was produced with parameters other than the current ones."""
+    try:
+        return pwd_hasher.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return True
+
+
+def _b64url(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+# HS256 tokens are signed here directly: the header is constant and the keyed
+# HMAC state is built once and copied per token, instead of jose re-serializing
+# the header and re-constructing the key on every encode. The output is
+# byte-identical to jwt.encode; other algorithms still go through jose.
+_HS256_HEADER = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":"), sort_keys=True).encode())
+_HS256_MAC = hmac.new(settings.SECRET_KEY.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def _encode_jwt(claims: Dict[str, Any]) -> str:
+    if settings.ALGORITHM != "HS256":
+        return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    for time_claim in ("exp", "iat", "nbf"):
+        if isinstance(claims.get(time_claim), datetime):
+            claims[time_claim] = timegm(claims[time_claim].utctimetuple())
+    signing_input = _HS256_HEADER + b"." + _b64url(json.dumps(claims, separators=(",", ":")).encode())
+    mac = _HS256_MAC.copy()
+    mac.update(signing_input)
+    return (signing_input + b"." + _b64url(mac.digest())).decode("ascii")
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -27,16 +141,50 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
 
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return _encode_jwt(to_encode)
 
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Issues a long-lived refresh token (type=refresh). Never grants resource access directly."""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + REFRESH_TOKEN_EXPIRES
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return _encode_jwt(to_encode)
+
+
+# Login retries and double submits for the same (subject, name) within this
+# window get the pair already issued instead of two fresh signatures. Reused
+# tokens lose at most this much of their lifetime.
+_TOKEN_REUSE_SECONDS = 30
+_ISSUED_PAIRS_MAX = 10_000
+_issued_pairs: Dict[Tuple[str, str], Tuple[float, str, str]] = {}
+_issued_pairs_lock = threading.Lock()
+
+
+def issue_login_tokens(cpf_cnpj: str, name: str) -> Tuple[str, str]:
+    """Returns (access_token, refresh_token) for a successful login."""
+    key = (cpf_cnpj, name)
+    now = time.monotonic()
+    cached = _issued_pairs.get(key)
+    if cached is not None and now - cached[0] < _TOKEN_REUSE_SECONDS:
+        return cached[1], cached[2]
+
+    claims = {"sub": cpf_cnpj, "name": name}
+    access_token = create_access_token(
+        data=claims,
+        expires_delta=ACCESS_TOKEN_EXPIRES
+    )
+    refresh_token = create_refresh_token(data=claims)
+
+    with _issued_pairs_lock:
+        if len(_issued_pairs) >= _ISSUED_PAIRS_MAX:
+            stale = [k for k, v in _issued_pairs.items() if now - v[0] >= _TOKEN_REUSE_SECONDS]
+            for k in stale:
+                del _issued_pairs[k]
+            if len(_issued_pairs) >= _ISSUED_PAIRS_MAX:
+                _issued_pairs.clear()
+        _issued_pairs[key] = (now, access_token, refresh_token)
+    return access_token, refresh_token
 
 
 # Canonical implementations live in app.pix.service (financial domain).
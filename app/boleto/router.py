@@ -1,6 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Header, Response
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from uuid import uuid4
 
@@ -11,9 +10,9 @@ from app.boleto.schemas import BoletoQuery, BoletoDetails, BoletoPaymentRequest,
 from app.boleto.service import query_boleto, process_payment
 from app.pix.service import get_balance
 from app.core.fees import is_pj, calculate_boleto_fee, fee_display
+from app.core.templates import conditional_template_response
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/ui/boleto", response_class=HTMLResponse)
@@ -25,14 +24,18 @@ async def view_boleto(
     balance = get_balance(db, current_user.id)
     user_pj = is_pj(current_user.cpf_cnpj)
     fee = calculate_boleto_fee(current_user.cpf_cnpj)
-    return templates.TemplateResponse(request, "boleto.html", {
+    context = {
         "user_name": current_user.name,
         "balance": balance,
         "page": "boleto",
         "user_is_pj": user_pj,
         "boleto_fee_display": fee_display(fee),
         "boleto_fee_value": float(fee),
-    })
+    }
+    return conditional_template_response(
+        request, "boleto.html", context,
+        etag_parts=(current_user.id, current_user.name, str(balance), str(fee), user_pj),
+    )
 
 
 @router.post("/api/boleto/query", response_model=BoletoDetails)
@@ -41,9 +44,12 @@ def api_query_boleto(
     current_user: User = Depends(get_current_user)
 ):
     try:
-        return query_boleto(data.barcode)
+        details = query_boleto(data.barcode)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    # response_model is kept for the OpenAPI schema; returning the serialized
+    # bytes skips FastAPI's second validation pass over the model.
+    return Response(content=details.model_dump_json(), media_type="application/json")
 
 
 @router.post("/api/boleto/pay", response_model=PaymentResponse)
@@ -129,8 +129,9 @@ def query_boleto(barcode: str) -> BoletoDetails:
     except Exception as e:
         logger.info(f"Asaas boleto query unavailable, using mock: {e}")
 
-    # Mock fallback — used when Asaas bill payment is not enabled or unavailable
-    return BoletoDetails(
+    # Mock fallback — used when Asaas bill payment is not enabled or unavailable.
+    # Every field is generated here with the declared type, so skip validation.
+    return BoletoDetails.model_construct(
         barcode=cleaned,
         beneficiary=f"Mock Company {secrets.randbelow(100) + 1} LTDA",
         value=float(f"{secrets.randbelow(491) + 10}.{secrets.randbelow(100)}"),
@@ -185,8 +186,12 @@ def process_payment(
     )
 
     db.add(boleto)
+    db.flush()
+    # Every column is populated client-side, so detach before commit: the
+    # returned object keeps its loaded state instead of being expired and
+    # re-SELECTed on first attribute access.
+    db.expunge(boleto)
     db.commit()
-    db.refresh(boleto)
 
     audit_log(
         action="boleto_paid",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Boolean, Enum, Numeric
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Boolean, Enum, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -24,7 +24,12 @@ class CreditCard(Base):
     is_blocked = Column(Boolean, default=False)
     limit = Column(Numeric(15, 2, asdecimal=True), default=0.0)  # Specific limit for this card
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    expires_at = Column(DateTime, nullable=True) # For temp cards
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime(timezone=True), nullable=True) # For temp cards
 
     user = relationship("User", back_populates="cards")
+
+    # list_cards/get_card filter on user_id plus the expires_at window.
+    __table_args__ = (
+        Index("ix_cards_user_active", "user_id", "expires_at"),
+    )
@@ -4,21 +4,18 @@ from app.cards.schemas import CardCreateRequest
 from app.auth.models import User
 from uuid import uuid4
 from datetime import datetime, timedelta, timezone
-import random
+import secrets
 
-def generate_card_number():
-    """Generates a valid-looking Visa card number (starts with 4)."""
-    # Prefix for Visa
-    prefix = "4"
-    # Generate 15 random digits
-    random_digits = "".join([str(random.randint(0, 9)) for _ in range(15)])
-    return prefix + random_digits
-
-def generate_cvv():
-    return "".join([str(random.randint(0, 9)) for _ in range(3)])
+def generate_card_credentials():
+    """
+    Returns (card_number, cvv) cut from a single 18-digit CSPRNG draw.
+    The number is a valid-looking Visa number: "4" followed by 15 digits.
+    """
+    digits = str(secrets.randbelow(10 ** 18)).zfill(18)
+    return "4" + digits[:15], digits[15:]
 
 def generate_expiration_date(years=4):
-    exp = datetime.now() + timedelta(days=365 * years)
+    exp = datetime.now(timezone.utc) + timedelta(days=365 * years)
     return exp.strftime("%m/%y")
 
 def create_card(db: Session, user: User, data: CardCreateRequest) -> CreditCard:
@@ -32,11 +29,12 @@ def create_card(db: Session, user: User, data: CardCreateRequest) -> CreditCard:
     # Let's set a default of 1000.0 for virtual cards if not specified (though schema doesn't allow specifying yet)
     default_limit = 1000.0
 
+    card_number, cvv = generate_card_credentials()
     card = CreditCard(
         id=str(uuid4()),
         user_id=user.id,
-        card_number=generate_card_number(),
-        cvv=generate_cvv(),
+        card_number=card_number,
+        cvv=cvv,
         expiration_date=generate_expiration_date(),
         card_holder_name=user.name.upper(),
         type=data.type,
@@ -62,12 +60,18 @@ def list_cards(db: Session, user_id: str):
     ).all()
 
 def get_card(db: Session, card_id: str, user_id: str) -> CreditCard:
-    now = datetime.now(timezone.utc)
-    return db.query(CreditCard).filter(
-        CreditCard.id == card_id,
-        CreditCard.user_id == user_id,
-        or_(CreditCard.expires_at == None, CreditCard.expires_at > now)
-    ).first()
+    # Primary-key lookup served from the identity map when already loaded;
+    # ownership and expiry are checked in Python instead of in the WHERE clause.
+    card = db.get(CreditCard, card_id)
+    if card is None or card.user_id != user_id:
+        return None
+    if card.expires_at is not None:
+        expires_at = card.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+    return card
 
 def delete_card(db: Session, card_id: str, user_id: str):
     card = get_card(db, card_id, user_id)
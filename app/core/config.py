@@ -36,6 +36,13 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     # Refresh token: long-lived (7 days). Rotated on every use. httpOnly cookie.
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080
+    # Remember successful password verifications for 60s so repeat logins with the
+    # same credentials skip Argon2. Off by default; failed attempts are never cached.
+    AUTH_VERIFY_CACHE_ENABLED: bool = False
+
+    # Open pool_size connections during startup warm-up so the first requests after
+    # a deploy or a Neon/Supabase cold start reuse sockets with the handshake done.
+    WARM_POOL_ON_STARTUP: bool = True
 
     LOG_LEVEL: str = "INFO"
 
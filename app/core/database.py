@@ -2,8 +2,9 @@
 Database connection management and ORM session factory.
 Supports dialect abstraction for SQLite and PostgreSQL.
 """
-from typing import Any, Dict
+from typing import Any, Dict, Union
 
+import orjson
 from sqlalchemy import create_engine, event, inspect as sa_inspect, text
 from sqlalchemy.engine.url import URL, make_url
 from sqlalchemy.orm import declarative_base
@@ -21,7 +22,7 @@ def _redact_sqlalchemy_url(url: URL) -> str:
         return "<unavailable>"
 
 
-def _build_engine_kwargs(database_url: str) -> Dict[str, Any]:
+def _build_engine_kwargs(database_url: Union[str, URL]) -> Dict[str, Any]:
     """
     Build SQLAlchemy engine kwargs with guardrails for common production issues.
 
@@ -77,30 +78,67 @@ def _build_engine_kwargs(database_url: str) -> Dict[str, Any]:
         # pool_size=5: keep 5 warm connections ready (covers webhook bursts).
         # max_overflow=10: allow up to 10 extra connections under load, then queue.
         # pool_timeout=10: raise OperationalError after 10s wait (vs default 30s).
-        # pool_recycle=300: recycle connections every 5min to avoid Neon idle timeout (5min).
+        # pool_recycle: Neon suspends idle computes after 5min, so recycle before that;
+        # other providers only need protection from server/firewall idle cuts.
+        # pool_use_lifo: reuse the most recently returned connection so bursts run on
+        # warm connections and surplus ones age out instead of being rotated through.
         "pool_size": 5,
         "max_overflow": 10,
         "pool_timeout": 10,
-        "pool_recycle": 300,
+        "pool_recycle": 300 if host.endswith(".neon.tech") else 1800,
+        "pool_use_lifo": True,
     }
     if connect_args:
         engine_kwargs["connect_args"] = connect_args
 
     return engine_kwargs
 
-engine = create_engine(settings.DATABASE_URL, **_build_engine_kwargs(settings.DATABASE_URL))
+def _json_serializer(value: Any) -> str:
+    """JSON/JSONB bind values rendered by orjson instead of the stdlib encoder."""
+    return orjson.dumps(value).decode()
+
+
+# The dialect is fixed per deploy: parse the URL once and branch on it only here.
+_DATABASE_URL = make_url(settings.DATABASE_URL)
+engine = create_engine(
+    _DATABASE_URL,
+    # Used for every JSON/JSONB column (the amortization schedule); on psycopg2 the
+    # deserializer is also registered with the driver for json/jsonb results.
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_build_engine_kwargs(_DATABASE_URL),
+)
+
+# Per-connection SQLite tuning, applied in one executescript call:
+# - WAL + synchronous=NORMAL: concurrent readers alongside a single writer
+# - mmap_size=256 MiB: warm pages are read through the mapping, not read() copies
+# - temp_store=MEMORY: sorts and temporary B-trees stay off disk
+# - cache_size=-65536: 64 MiB page cache (negative values are KiB)
+# - busy_timeout=5000: wait up to 5s on a locked database instead of failing
+_SQLITE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA mmap_size=268435456;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA busy_timeout=5000;
+"""
 
-# Enable Write-Ahead Logging (WAL) for SQLite to handle concurrency better
-if "sqlite" in settings.DATABASE_URL:
+# Keyed on the parsed dialect, not a substring of the URL (which may contain
+# "sqlite" in a password or database name on a PostgreSQL deploy).
+if engine.dialect.name == "sqlite":
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection: Any, connection_record: Any) -> None:
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.executescript(_SQLITE_PRAGMAS)
         cursor.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same pool as engine; single-statement probes run without a BEGIN/ROLLBACK pair
+# and without building an ORM Session.
+autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
 Base = declarative_base()
 
 
@@ -158,6 +196,145 @@ def _apply_column_migrations(engine) -> None:
                 conn.commit()
             logger.info("Migration applied: link_expires_at added to transacoes_pix")
 
+        indexes = {ix["name"] for ix in inspector.get_indexes("transacoes_pix")}
+        # transacoes_pix takes writes on every payment: on PostgreSQL indexes are built
+        # and dropped CONCURRENTLY (outside a transaction) so they never block them.
+        is_postgresql = engine.dialect.name == "postgresql"
+        concurrently = "CONCURRENTLY " if is_postgresql else ""
+        if is_postgresql:
+            # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind that
+            # the inspector still lists; it must be rebuilt, not trusted.
+            with engine.connect() as conn:
+                valid_indexes = set(conn.execute(text(
+                    "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE i.indrelid = 'transacoes_pix'::regclass AND i.indisvalid"
+                )).scalars())
+        else:
+            valid_indexes = set(indexes)
+        for name, index_columns in (
+            ("ix_pix_user_created", "user_id, criado_em"),
+            ("ix_pix_user_status_created", "user_id, status, criado_em"),
+            ("ix_pix_corr_tipo", "correlation_id, tipo"),
+        ):
+            if name in valid_indexes:
+                continue
+            try:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    if name in indexes:
+                        conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+                    conn.execute(text(
+                        f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON transacoes_pix ({index_columns})"
+                    ))
+                valid_indexes.add(name)
+                logger.info(f"Migration applied: {name} added to transacoes_pix")
+            except Exception as exc:
+                # The superseded index below stays in place; the next start retries.
+                logger.error(f"Migration failed: {name} on transacoes_pix: {exc}")
+        # Superseded by the composites above (leading user_id / correlation_id;
+        # status alone is too low-cardinality to be chosen over them). Each is only
+        # dropped once its replacement exists and is valid.
+        for name, replacement in (
+            ("ix_transacoes_pix_user_id", "ix_pix_user_created"),
+            ("ix_transacoes_pix_status", "ix_pix_user_status_created"),
+            ("ix_transacoes_pix_correlation_id", "ix_pix_corr_tipo"),
+        ):
+            if name in indexes and replacement in valid_indexes:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+                logger.info(f"Migration applied: {name} dropped from transacoes_pix")
+
+    if "users" in existing_tables:
+        columns = [c["name"] for c in inspector.get_columns("users")]
+        if "is_active_account" not in columns:
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "ALTER TABLE users ADD COLUMN is_active_account BOOLEAN NOT NULL DEFAULT FALSE"
+                ))
+                conn.commit()
+            logger.info("Migration applied: is_active_account added to users")
+
+        # Login/registration look users up by cpf_cnpj and email, and register()
+        # relies on ON CONFLICT against these keys. Databases created before the
+        # columns were declared unique get the unique B-tree indexes here.
+        unique_columns = {
+            tuple(ix["column_names"]) for ix in inspector.get_indexes("users") if ix.get("unique")
+        } | {
+            tuple(uc["column_names"]) for uc in inspector.get_unique_constraints("users")
+        }
+        for column in ("cpf_cnpj", "email"):
+            if (column,) in unique_columns:
+                continue
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS uq_users_{column} ON users ({column})"
+                    ))
+                    conn.commit()
+                logger.info(f"Migration applied: unique index on users.{column}")
+            except Exception as exc:
+                # Pre-existing duplicate rows must be resolved manually; do not block startup.
+                logger.error(f"Migration failed: unique index on users.{column}: {exc}")
+
+    if "credit_cards" in existing_tables:
+        # Card timestamps are timezone-aware UTC; convert legacy TIMESTAMP columns so
+        # "expires_at > now()" compares timestamptz to timestamptz without a cast.
+        if engine.dialect.name == "postgresql":
+            for column in inspector.get_columns("credit_cards"):
+                if column["name"] in ("created_at", "expires_at") and not getattr(column["type"], "timezone", False):
+                    with engine.connect() as conn:
+                        conn.execute(text(
+                            f"ALTER TABLE credit_cards ALTER COLUMN {column['name']} "
+                            f"TYPE TIMESTAMP WITH TIME ZONE USING {column['name']} AT TIME ZONE 'UTC'"
+                        ))
+                        conn.commit()
+                    logger.info(f"Migration applied: credit_cards.{column['name']} converted to TIMESTAMPTZ")
+
+        indexes = {ix["name"] for ix in inspector.get_indexes("credit_cards")}
+        if "ix_cards_user_active" not in indexes:
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_cards_user_active "
+                    "ON credit_cards (user_id, expires_at)"
+                ))
+                conn.commit()
+            logger.info("Migration applied: ix_cards_user_active added to credit_cards")
+
+    if "simulacoes_parcelamento" in existing_tables and engine.dialect.name == "postgresql":
+        # The amortization schedule moved from serialized-JSON TEXT to JSONB.
+        columns = {c["name"]: c["type"] for c in inspector.get_columns("simulacoes_parcelamento")}
+        column_type = columns.get("tabela_amortizacao")
+        if column_type is not None and type(column_type).__name__ != "JSONB":
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "ALTER TABLE simulacoes_parcelamento ALTER COLUMN tabela_amortizacao "
+                    "TYPE JSONB USING tabela_amortizacao::jsonb"
+                ))
+                conn.commit()
+            logger.info("Migration applied: simulacoes_parcelamento.tabela_amortizacao converted to JSONB")
+        # criado_em was written as naive UTC; timestamptz keeps that instant and is
+        # decoded by the driver straight into an aware datetime.
+        criado_em_type = columns.get("criado_em")
+        if criado_em_type is not None and not getattr(criado_em_type, "timezone", False):
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "ALTER TABLE simulacoes_parcelamento ALTER COLUMN criado_em "
+                    "TYPE TIMESTAMP WITH TIME ZONE USING criado_em AT TIME ZONE 'UTC'"
+                ))
+                conn.commit()
+            logger.info("Migration applied: simulacoes_parcelamento.criado_em converted to TIMESTAMPTZ")
+
+    if "simulacoes_parcelamento" in existing_tables:
+        indexes = {ix["name"] for ix in inspector.get_indexes("simulacoes_parcelamento")}
+        if "ix_simulacoes_criado_em" not in indexes:
+            using = "USING brin " if engine.dialect.name == "postgresql" else ""
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_simulacoes_criado_em "
+                    f"ON simulacoes_parcelamento {using}(criado_em)"
+                ))
+                conn.commit()
+            logger.info("Migration applied: ix_simulacoes_criado_em added to simulacoes_parcelamento")
+
     if "transacoes_boleto" in existing_tables:
         columns = [c["name"] for c in inspector.get_columns("transacoes_boleto")]
         if "taxa_valor" not in columns:
@@ -3,11 +3,7 @@ Document validation for CPF and CNPJ.
 Implements the official Brazilian government validation algorithms.
 Used as anti-fraud and KYC control at account registration.
 """
-import re
-
-
-def _digits_only(value: str) -> str:
-    return re.sub(r"\D", "", value)
+from app.core.utils import digits_only as _digits_only
 
 
 def validate_cpf(cpf: str) -> bool:
@@ -45,16 +45,21 @@ class CorrelationLoggerAdapter(logging.LoggerAdapter[logging.Logger]):
     """Context-aware logger adapter ensuring Correlation ID propagation across the execution context."""
 
     def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]:
-        if 'extra' not in kwargs:
-            kwargs['extra'] = {}
-        if 'correlation_id' not in kwargs['extra']:
-            kwargs['extra']['correlation_id'] = 'N/A'
+        extra = kwargs.get('extra')
+        if extra is None:
+            # Common case: reuse the bound mapping as-is (makeRecord only reads it).
+            kwargs['extra'] = self.extra
+        elif 'correlation_id' not in extra:
+            kwargs['extra'] = {**self.extra, **extra}
         return msg, kwargs
 
 
 def get_logger_with_correlation(correlation_id: str) -> CorrelationLoggerAdapter:
-    """Factory for instantiating a context-bound logger instance."""
-    return CorrelationLoggerAdapter(logger, {'correlation_id': correlation_id})
+    """
+    Factory for a request-scoped adapter over the shared "fintech" logger.
+    Only a small wrapper is allocated per call; no Logger or handler is created.
+    """
+    return CorrelationLoggerAdapter(logger, {'correlation_id': correlation_id or 'N/A'})
 
 
 def audit_log(action: str, user: str, resource: str, details: Dict[str, Any]) -> None:
@@ -6,8 +6,29 @@ Functions are stateless and side-effect-free.
 """
 import re
 import urllib.parse
+from functools import lru_cache
 from typing import Optional
 
+try:
+    import segno
+except ImportError:  # pragma: no cover — without segno the image is rendered by qrserver.com
+    segno = None
+
+
+def _crc16_table() -> tuple:
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+
+# One lookup per input byte instead of eight shift/xor steps.
+_CRC16_TABLE = _crc16_table()
+
 
 def crc16_ccitt(data: str) -> str:
     """
@@ -16,11 +37,9 @@ def crc16_ccitt(data: str) -> str:
     Mandatory for interoperability — any PSP app validates this before querying DICT.
     """
     crc = 0xFFFF
+    table = _CRC16_TABLE
     for byte in data.encode("utf-8"):
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
-            crc &= 0xFFFF
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
     return format(crc, "04X")
 
 
@@ -29,6 +48,13 @@ def _tlv(tag: str, value: str) -> str:
     return f"{tag}{len(value):02d}{value}"
 
 
+# Fields that never vary between charges, encoded once.
+_EMV_GUI = _tlv("00", "BR.GOV.BCB.PIX")
+_EMV_SINGLE_USE_HEAD = _tlv("00", "01") + _tlv("01", "11")  # Payload Format + Point of Initiation 11
+_EMV_CATEGORY_CURRENCY = _tlv("52", "0000") + _tlv("53", "986")  # MCC + BRL
+_EMV_MERCHANT = _tlv("58", "BR") + _tlv("59", "BioCodeTechPay") + _tlv("60", "BRASILIA")
+
+
 def build_pix_static_emv(charge_id: str, value: float) -> str:
     """
     Builds a valid BR Code PIX static EMV payload per BACEN specification.
@@ -40,30 +66,19 @@ def build_pix_static_emv(charge_id: str, value: float) -> str:
       - Asaas gateway is not configured (local/dev), OR
       - Asaas API fails for this specific request.
     """
-    gui = _tlv("00", "BR.GOV.BCB.PIX")
-    key = _tlv("01", charge_id)           # EVP key = charge UUID (unique per charge)
-    merchant_account = _tlv("26", gui + key)
-
     # Field 62: Additional Data — txid max 25 chars (hyphens stripped per spec)
     txid = charge_id.replace("-", "")[:25]
-    additional = _tlv("62", _tlv("05", txid))
 
-    # Field 54: Transaction Amount — must be "10.00" decimal form, NOT "1000"
-    amount_str = f"{value:.2f}"
-
-    payload = (
-        _tlv("00", "01") +               # Payload Format Indicator
-        _tlv("01", "11") +               # Point of Initiation = 11 (single-use static)
-        merchant_account +
-        _tlv("52", "0000") +             # Merchant Category Code
-        _tlv("53", "986") +              # Transaction Currency: BRL = 986
-        _tlv("54", amount_str) +         # Transaction Amount
-        _tlv("58", "BR") +               # Country Code
-        _tlv("59", "BioCodeTechPay") +   # Merchant Name (max 25 chars)
-        _tlv("60", "BRASILIA") +         # Merchant City (max 15 chars)
-        additional +
-        "6304"                           # CRC tag — checksum appended immediately below
-    )
+    payload = "".join((
+        _EMV_SINGLE_USE_HEAD,
+        _tlv("26", _EMV_GUI + _tlv("01", charge_id)),  # EVP key = charge UUID (unique per charge)
+        _EMV_CATEGORY_CURRENCY,
+        # Field 54: Transaction Amount — must be "10.00" decimal form, NOT "1000"
+        _tlv("54", f"{value:.2f}"),
+        _EMV_MERCHANT,
+        _tlv("62", _tlv("05", txid)),
+        "6304",                          # CRC tag — checksum appended immediately below
+    ))
 
     return payload + crc16_ccitt(payload)
 
@@ -104,15 +119,26 @@ def build_pix_static_emv_no_amount(pix_key: str, merchant_name: str = "Bio Tech
     return payload + crc16_ccitt(payload)
 
 
+@lru_cache(maxsize=1024)
 def build_qr_url(emv_payload: str, size: int = 400) -> str:
     """
-    Returns the qrserver.com URL for rendering the EMV QR code image.
+    Returns an image URL for the EMV QR code: a PNG data URI rendered in-process
+    with segno, or the qrserver.com URL when segno is not installed.
+
+    The payload is deterministic per charge, so repeat renders (link page reloads,
+    the startup deposit QR) come from the cache.
 
     Parameters chosen for BR Code / PIX interoperability with POS terminals:
     - size=400x400: sufficient pixel density for maquininha scanners at arm's length
     - ecc=H: error correction level H (30%), required by BACEN for PIX QR codes
     - margin=4: quiet zone of 4 modules minimum per ISO/IEC 18004 and BR Code spec
     """
+    if segno is not None:
+        qr = segno.make(emv_payload, error="h", micro=False, boost_error=False)
+        width, _ = qr.symbol_size(scale=1, border=4)
+        # Whole-module scale closest to the requested size without going under it.
+        scale = max(1, -(-size // width))
+        return qr.png_data_uri(scale=scale, border=4)
     return (
         "https://api.qrserver.com/v1/create-qr-code/"
         f"?size={size}x{size}&ecc=H&margin=4&data={urllib.parse.quote(emv_payload)}"
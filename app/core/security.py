@@ -5,13 +5,23 @@ This module exposes only mask_sensitive_data — used by adapters and services
 that must not import from the auth layer to avoid circular dependencies.
 """
 
+# Prebuilt runs of the default mask character; covers documents, phone numbers,
+# keys and tokens without allocating the "*" * n run on every call.
+_STAR_RUNS = tuple("*" * n for n in range(128))
+
 
 def mask_sensitive_data(value: str, mask_char: str = "*", visible_chars: int = 4) -> str:
     """
     Sanitizes sensitive information for audit logs, preserving only the trailing
     characters for identification. Constant-length output prevents length inference.
     """
-    if not value or len(value) <= visible_chars:
-        return mask_char * len(value) if value else ""
-
-    return mask_char * (len(value) - visible_chars) + value[-visible_chars:]
+    if not value:
+        return ""
+    length = len(value)
+    if length <= visible_chars:
+        hidden, visible = length, ""
+    else:
+        hidden, visible = length - visible_chars, value[-visible_chars:]
+    if mask_char == "*" and hidden < len(_STAR_RUNS):
+        return f"{_STAR_RUNS[hidden]}{visible}"
+    return f"{mask_char * hidden}{visible}"
@@ -0,0 +1,113 @@
+"""
+StaticFiles with an in-memory cache for the small, hot UI assets.
+
+Each cached file is served from memory with a content-hash ETag, and it is
+revalidated with a single os.stat only after the TTL. Starlette's own path
+resolution (and its traversal checks) still runs on every cache miss.
+"""
+import hashlib
+import mimetypes
+import os
+import stat
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# (checked_at, mtime_ns, size, body, media_type, headers)
+_Entry = Tuple[float, int, int, bytes, str, dict]
+
+
+class CachedStaticFiles(StaticFiles):
+    """Serves files up to max_file_bytes from an LRU of at most max_entries."""
+
+    def __init__(
+        self,
+        *args,
+        ttl_seconds: float = 10.0,
+        max_entries: int = 256,
+        max_file_bytes: int = 1024 * 1024,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_file_bytes = max_file_bytes
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._paths: dict = {}
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        entry = await self._cached_entry(path)
+        if entry is None:
+            return await super().get_response(path, scope)
+
+        _, _, _, body, media_type, headers = entry
+        if Headers(scope=scope).get("if-none-match") == headers["etag"]:
+            return Response(status_code=304, headers=headers)
+        # media_type (not a content-type header) so text assets keep "; charset=utf-8".
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def _cached_entry(self, path: str) -> Optional[_Entry]:
+        now = time.monotonic()
+        entry = self._cache.get(path)
+        if entry is not None and now - entry[0] < self.ttl_seconds:
+            self._cache.move_to_end(path)
+            return entry
+
+        if entry is not None:
+            # TTL expired: one stat decides whether the cached body is still current.
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self._paths[path])
+            except OSError:
+                self._forget(path)
+                return None
+            if (stat_result.st_mtime_ns, stat_result.st_size) == (entry[1], entry[2]):
+                entry = (now,) + entry[1:]
+                self._cache[path] = entry
+                self._cache.move_to_end(path)
+                return entry
+            self._forget(path)
+
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except OSError:
+            return None
+        if (
+            stat_result is None
+            or not stat.S_ISREG(stat_result.st_mode)
+            or stat_result.st_size > self.max_file_bytes
+        ):
+            return None
+
+        body = await anyio.to_thread.run_sync(_read_bytes, full_path)
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        headers = {
+            "etag": f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"',
+            # Revalidate on every use: assets are not fingerprinted, so a deploy
+            # must be picked up immediately; revalidation is a cheap 304 from memory.
+            "cache-control": "public, no-cache",
+        }
+        entry = (now, stat_result.st_mtime_ns, stat_result.st_size, body, media_type, headers)
+        self._cache[path] = entry
+        self._paths[path] = full_path
+        while len(self._cache) > self.max_entries:
+            evicted, _ = self._cache.popitem(last=False)
+            self._paths.pop(evicted, None)
+        return entry
+
+    def _forget(self, path: str) -> None:
+        self._cache.pop(path, None)
+        self._paths.pop(path, None)
+
+
+def _read_bytes(full_path: str) -> bytes:
+    with open(full_path, "rb") as fh:
+        return fh.read()
@@ -0,0 +1,56 @@
+"""
+Shared Jinja2 environment for the server-rendered UI routes.
+
+A single instance means one parsed-template cache for the whole process. The
+bytecode cache lets a restarted worker skip re-parsing. auto_reload is enabled
+only in DEBUG, so production renders never stat template files.
+"""
+import hashlib
+import os
+from typing import Any, Dict
+
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+from app.core.config import settings
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+# No directory argument: Jinja picks a per-user temp dir and checks its owner and mode.
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+templates.env.auto_reload = settings.DEBUG
+templates.env.cache_size = 1000
+
+
+# Templates are only re-read on restart (auto_reload is off outside DEBUG), so the
+# newest template mtime at import identifies the markup every cached ETag was built on.
+_TEMPLATES_EPOCH = max(
+    (
+        os.stat(os.path.join(root, filename)).st_mtime_ns
+        for root, _dirs, files in os.walk(TEMPLATES_DIR)
+        for filename in files
+    ),
+    default=0,
+)
+
+
+def conditional_template_response(
+    request: Request, name: str, context: Dict[str, Any], *, etag_parts: tuple
+) -> Response:
+    """
+    Renders a per-user HTML page with a validator ETag, answering 304 without
+    rendering when the browser already holds the same version.
+
+    etag_parts must cover every value the template output depends on.
+    """
+    digest = hashlib.blake2b(
+        repr((_TEMPLATES_EPOCH, name, etag_parts)).encode(), digest_size=8
+    ).hexdigest()
+    etag = f'"{digest}"'
+    # Pages carry balances: never store in shared caches, always revalidate.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return templates.TemplateResponse(request, name, context, headers=headers)
@@ -1,6 +1,24 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 import re
 
+_NON_DIGIT = re.compile(r'\D')
+_ASCII_NON_DIGITS = bytes(c for c in range(256) if not 0x30 <= c <= 0x39)
+# Brasilia is UTC-3 (ignoring DST as it's abolished)
+_BRASILIA_OFFSET = timedelta(hours=-3)
+
+
+def digits_only(value: str) -> str:
+    r"""
+    Equivalent to re.sub(r'\D', '', value), without the regex for the common inputs:
+    already-clean digit strings are returned as-is and ASCII input goes through
+    bytes.translate; anything else falls back to the regex.
+    """
+    if value.isdecimal():
+        return value
+    if value.isascii():
+        return value.encode('ascii').translate(None, _ASCII_NON_DIGITS).decode('ascii')
+    return _NON_DIGIT.sub('', value)
+
 
 def mask_cpf_cnpj(doc: str) -> str:
     """
@@ -8,16 +26,17 @@ def mask_cpf_cnpj(doc: str) -> str:
     CPF: ***.123.456-**
     CNPJ: **.***.123/0001-**
     """
-    clean_doc = re.sub(r'\D', '', doc)
+    clean_doc = digits_only(doc)
+    digits = len(clean_doc)
 
-    if len(clean_doc) == 11:  # CPF
+    if digits == 11:  # CPF
         return f"***.{clean_doc[3:6]}.{clean_doc[6:9]}-**"
-    elif len(clean_doc) == 14:  # CNPJ
+    elif digits == 14:  # CNPJ
         return f"**.***.{clean_doc[5:8]}/{clean_doc[8:12]}-**"
     else:
         # Fallback for other keys (email, phone) or invalid docs
-        if "@" in doc:  # Email
-            user, domain = doc.split("@")
+        user, at, domain = doc.partition("@")
+        if at:  # Email
             return f"{user[:2]}***@{domain}"
         return f"{doc[:3]}***{doc[-2:]}"
 
@@ -27,11 +46,12 @@ def format_brasilia_time(dt: datetime) -> str:
     Converts UTC datetime to Brasília time (UTC-3) and formats it.
     Format: DD/MM/YYYY at HH:mm:ss
     """
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-
-    # Brasilia is UTC-3 (ignoring DST as it's abolished)
-    brasilia_tz = timezone(timedelta(hours=-3))
-    dt_brasilia = dt.astimezone(brasilia_tz)
-
-    return dt_brasilia.strftime("%d/%m/%Y às %H:%M:%S")
+    # Fixed-offset arithmetic on a naive UTC value plus %-formatting: about a third
+    # of the cost of astimezone() + strftime() on every statement row.
+    offset = dt.utcoffset()
+    if offset is not None:
+        dt = dt.replace(tzinfo=None) - offset
+    local = dt + _BRASILIA_OFFSET
+    return "%02d/%02d/%04d às %02d:%02d:%02d" % (
+        local.day, local.month, local.year, local.hour, local.minute, local.second
+    )
@@ -5,34 +5,43 @@ Features strict input validation, audit logging, and distributed tracing.
 """
 import os
 import sys
+
+# STRICT STARTUP ENFORCEMENT
+# The application must be started via `python start.py`. Resolved once, before
+# any other import, so a rejected invocation exits without loading the app stack.
+_STARTUP_ALLOWED = bool(
+    os.environ.get("BIO_CODE_TECH_PAY_ALLOWED_START")
+    or os.environ.get("RENDER")
+    or os.environ.get("PYTHONANYWHERE_DOMAIN")
+    or "pytest" in sys.modules
+)
+if not _STARTUP_ALLOWED:
+    print("\n\033[91mCRITICAL ERROR: Forbidden Startup Method.\033[0m")
+    print("You must use the standardized entry point:")
+    print("   > python start.py")
+    print("\nDirect execution via uvicorn or other methods is prohibited to ensure environment consistency.\n")
+    sys.exit(1)
+
 import asyncio
+import hashlib
+import signal
+import threading
 from pathlib import Path
-from typing import Callable, Awaitable, Dict, Any
+from typing import Callable, Dict, Any, Union
 
-# STRICT STARTUP ENFORCEMENT
-# The application must be started via `python start.py`
-if not os.environ.get("BIO_CODE_TECH_PAY_ALLOWED_START") and "pytest" not in sys.modules:
-    if not os.environ.get("RENDER") and not os.environ.get("PYTHONANYWHERE_DOMAIN"):
-        print("\n\033[91mCRITICAL ERROR: Forbidden Startup Method.\033[0m")
-        print("You must use the standardized entry point:")
-        print("   > python start.py")
-        print("\nDirect execution via uvicorn or other methods is prohibited to ensure environment consistency.\n")
-        sys.exit(1)
-
-from fastapi import FastAPI, Request, Response, Depends
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, PlainTextResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse, RedirectResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
 import time
-from uuid import uuid4
 from sqlalchemy import text
-from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import init_db, get_db
+from app.core.database import init_db, engine, autocommit_engine
 from app.core.logger import logger
 from app.core.matrix import seed_matrix_account
+from app.core.static_files import CachedStaticFiles
 from app.core.audit_worker import balance_audit_loop
 from app.cards.router import router as cards_router
 from app.pix.router import router as pix_router
@@ -43,7 +52,6 @@ from app.boleto.router import router as boleto_router
 from app.minha_conta.router import router as minha_conta_router
 import app.minha_conta.models  # noqa: F401 — registers UserSubscription in Base.metadata
 import app.ia.ai_interactions  # noqa: F401 — registers AiInteraction in Base.metadata
-from fastapi.staticfiles import StaticFiles
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from opentelemetry import trace
@@ -68,25 +76,107 @@ trace.get_tracer_provider().add_span_processor(
 SQLAlchemyInstrumentor().instrument()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifecycle management (startup/shutdown hooks)."""
-    logger.info(f"Initializing {settings.APP_NAME} v{settings.VERSION}")
-    init_db()
-    logger.info("Database initialized")
-    seed_matrix_account()
-    logger.info("Matrix account ready")
+def _open_warm_connection():
+    conn = engine.connect()
+    try:
+        conn.execute(text("SELECT 1"))
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+async def _warm_pool() -> None:
+    """
+    Fills the connection pool with pool_size live connections, handshaking in
+    parallel. All of them are held open until every handshake is done, so the
+    pool ends up with distinct sockets rather than one connection reused N times.
+    """
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 0
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_open_warm_connection) for _ in range(size)),
+        return_exceptions=True,
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    await asyncio.to_thread(lambda: [conn.close() for conn in opened])
+    if len(opened) < size:
+        logger.warning("Connection pool warm-up opened %d of %d connections", len(opened), size)
+    else:
+        logger.info("Connection pool warmed with %d connections", size)
+
+
+# init_db already retries its connection; these attempts cover a failure anywhere in
+# schema setup or seeding. Once exhausted the worker stops so the orchestrator
+# restarts it, instead of serving requests against a schema that was never migrated.
+_WARM_UP_ATTEMPTS = 5
+_WARM_UP_MAX_BACKOFF_SECONDS = 30.0
+
+
+async def _prepare_database() -> None:
+    for attempt in range(1, _WARM_UP_ATTEMPTS + 1):
+        try:
+            await asyncio.to_thread(init_db)
+            logger.info("Database initialized")
+            await asyncio.to_thread(seed_matrix_account)
+            logger.info("Matrix account ready")
+            return
+        except Exception:
+            if attempt == _WARM_UP_ATTEMPTS:
+                raise
+            delay = min(2.0 ** attempt, _WARM_UP_MAX_BACKOFF_SECONDS)
+            logger.exception(
+                "Startup warm-up attempt %d/%d failed; retrying in %.0fs",
+                attempt, _WARM_UP_ATTEMPTS, delay,
+            )
+            await asyncio.sleep(delay)
+
+
+async def _warm_up(app: FastAPI) -> "asyncio.Task[None]":
+    """
+    Schema setup, matrix seeding and the audit worker, run after the listener is up.
+    The blocking DB work (including init_db's retry sleeps) runs in worker threads,
+    so /health answers while a cold Neon/Supabase database is still waking up.
+    Failures are logged as they happen; if every attempt fails the process is sent
+    SIGTERM so it shuts down cleanly and gets restarted.
+    """
+    try:
+        await _prepare_database()
+    except Exception:
+        logger.critical(
+            "Startup warm-up failed after %d attempts; stopping worker",
+            _WARM_UP_ATTEMPTS, exc_info=True,
+        )
+        os.kill(os.getpid(), signal.SIGTERM)
+        raise
+    app.state.db_ready = True
+    if settings.WARM_POOL_ON_STARTUP:
+        await _warm_pool()
 
     from app.core.database import SessionLocal
     from app.adapters.gateway_factory import get_payment_gateway
-    _audit_task = asyncio.create_task(
+    audit_task = asyncio.create_task(
         balance_audit_loop(SessionLocal, get_payment_gateway)
     )
     logger.info("Balance audit worker started")
+    return audit_task
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifecycle management (startup/shutdown hooks)."""
+    logger.info(f"Initializing {settings.APP_NAME} v{settings.VERSION}")
+    app.state.db_ready = False
+    warm_up_task = asyncio.create_task(_warm_up(app))
 
     yield
 
-    _audit_task.cancel()
+    # Let an in-flight warm-up finish rather than abandoning its DB thread.
+    try:
+        audit_task = await warm_up_task
+    except Exception:
+        pass  # already logged by _warm_up when it failed
+    else:
+        audit_task.cancel()
     logger.info("Shutting down application")
 
 
@@ -97,7 +187,10 @@ app = FastAPI(
         "Enterprise-grade financial system implementing DDD and Hexagonal Architecture. "
         "See README.md for full documentation."
     ),
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson renders the jsonable_encoder output in C; HTML routes keep their
+    # explicit response_class overrides.
+    default_response_class=ORJSONResponse,
 )
 
 # Must be called after app is created but before startup (middleware registration window).
@@ -126,66 +219,160 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-    """Adds HTTP security headers to every response."""
-    response = await call_next(request)
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://cdn.jsdelivr.net https://unpkg.com https://html2canvas.hertzen.com; "
-        "style-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://cdn.jsdelivr.net https://fonts.googleapis.com; "
-        "font-src 'self' https://fonts.gstatic.com https://cdn.jsdelivr.net; "
-        "img-src 'self' data: https:; "
-        "connect-src 'self' https://openrouter.ai; "
-        "frame-ancestors 'none'"
+# Security headers are constant: encoded once and appended to every response.
+_SECURITY_HEADERS = [
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in (
+        ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+        ("X-Frame-Options", "DENY"),
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-XSS-Protection", "1; mode=block"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        (
+            "Content-Security-Policy",
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://cdn.jsdelivr.net https://unpkg.com https://html2canvas.hertzen.com; "
+            "style-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://cdn.jsdelivr.net https://fonts.googleapis.com; "
+            "font-src 'self' https://fonts.gstatic.com https://cdn.jsdelivr.net; "
+            "img-src 'self' data: https:; "
+            "connect-src 'self' https://openrouter.ai; "
+            "frame-ancestors 'none'",
+        ),
     )
-    return response
+]
+_OWNED_HEADER_NAMES = frozenset(
+    [name for name, _ in _SECURITY_HEADERS] + [b"x-correlation-id", b"x-process-time"]
+)
 
+# Monotonic, so request timings are immune to wall-clock adjustments.
+_perf_counter_ns = time.perf_counter_ns
 
-@app.middleware("http")
-async def add_correlation_id(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-    """Injects a unique Correlation ID into every request and propagates it to the response."""
-    correlation_id = request.headers.get("X-Correlation-ID", str(uuid4()))
-    request.state.correlation_id = correlation_id
+# Correlation IDs are 64-bit random trace tokens, not UUIDs: one os.urandom call
+# fills 512 of them. Only the event-loop thread draws from the pool.
+_CORRELATION_ID_BYTES = 8
+_CORRELATION_POOL_SIZE = 4096
+_correlation_pool = b""
+_correlation_offset = 0
 
-    start_time = time.time()
-    logger.info(
-        f"Request: {request.method} {request.url.path}",
-        extra={"correlation_id": correlation_id}
-    )
 
-    response = await call_next(request)
+def _new_correlation_id() -> str:
+    global _correlation_pool, _correlation_offset
+    offset = _correlation_offset
+    if offset + _CORRELATION_ID_BYTES > len(_correlation_pool):
+        _correlation_pool = os.urandom(_CORRELATION_POOL_SIZE)
+        offset = 0
+    _correlation_offset = offset + _CORRELATION_ID_BYTES
+    return _correlation_pool[offset:offset + _CORRELATION_ID_BYTES].hex()
 
-    process_time = time.time() - start_time
-    response.headers["X-Correlation-ID"] = correlation_id
-    response.headers["X-Process-Time"] = str(process_time)
 
-    REQUEST_COUNT.labels(method=request.method, endpoint=request.url.path, status=response.status_code).inc()
-    REQUEST_LATENCY.labels(method=request.method, endpoint=request.url.path).observe(process_time)
+def _reset_correlation_pool() -> None:
+    # A forked worker must not replay the parent's remaining bytes.
+    global _correlation_pool, _correlation_offset
+    _correlation_pool, _correlation_offset = b"", 0
 
-    logger.info(
-        f"Response: {response.status_code} | {process_time:.3f}s",
-        extra={"correlation_id": correlation_id}
-    )
-    return response
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_correlation_pool)
 
 
-@app.get("/health", tags=["Health"])
-def health_check(db: Session = Depends(get_db)) -> Dict[str, str]:
+class ObservabilityMiddleware:
+    """
+    Correlation ID, request timing/metrics/logging and security headers in one
+    pure ASGI layer. Headers are written into the http.response.start message in
+    a single pass, with no per-request BaseHTTPMiddleware task or Response wrapper.
+    Values set here replace any same-named header from the handler.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = None
+        accept = ""
+        # One pass over the raw headers also captures Accept for the exception
+        # handlers, which would otherwise rebuild a Headers view to read it.
+        for key, value in scope["headers"]:
+            if key == b"x-correlation-id":
+                correlation_id = value.decode("latin-1")
+            elif key == b"accept":
+                accept = value.decode("latin-1")
+        correlation_id = correlation_id or _new_correlation_id()
+        # Same dict Request.state reads, so handlers see request.state.correlation_id.
+        state = scope.setdefault("state", {})
+        state["correlation_id"] = correlation_id
+        state["accept"] = accept
+
+        method, path = scope["method"], scope["path"]
+        start_ns = _perf_counter_ns()
+        logger.info("Request: %s %s", method, path, extra={"correlation_id": correlation_id})
+
+        async def send_with_headers(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ns = _perf_counter_ns() - start_ns
+                process_time = elapsed_ns / 1e9
+                status_code = message["status"]
+                headers = [h for h in message.get("headers", ()) if h[0].lower() not in _OWNED_HEADER_NAMES]
+                headers.extend(_SECURITY_HEADERS)
+                headers.append((b"x-correlation-id", correlation_id.encode("latin-1")))
+                headers.append((b"x-process-time", str(process_time).encode("latin-1")))
+                message["headers"] = headers
+
+                REQUEST_COUNT.labels(method=method, endpoint=path, status=status_code).inc()
+                REQUEST_LATENCY.labels(method=method, endpoint=path).observe(process_time)
+                logger.info(
+                    "Response: %d | %dms", status_code, elapsed_ns // 1_000_000,
+                    extra={"correlation_id": correlation_id}
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+app.add_middleware(ObservabilityMiddleware)
+
+
+# The UI pings /health on every page load. A successful SELECT 1 in the last 30s
+# already proves the database is awake, so those pings skip the round-trip.
+_HEALTH_DB_TTL_NS = 30 * 1_000_000_000
+_health_last_ok_ns = 0
+_health_probe_lock = threading.Lock()
+
+
+@app.get("/health", tags=["Health"], response_model=None)
+def health_check() -> Union[Dict[str, str], Response]:
     """
     Readiness probe and database warm-up endpoint.
     Executes a lightweight query to wake the Neon serverless compute
-    and keep the connection pool warm.
+    and keep the connection pool warm (at most every 30s per worker).
+    Answers 503 until startup warm-up (schema + matrix account) has completed.
     """
-    try:
-        db.execute(text("SELECT 1"))
-        db_status = "connected"
-    except Exception:
+    global _health_last_ok_ns
+    if not getattr(app.state, "db_ready", False):
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "starting", "app": settings.APP_NAME, "version": settings.VERSION},
+        )
+    db_status = "connected"
+    now = time.monotonic_ns()
+    # Only one thread probes when the window expires; concurrent callers reuse the
+    # last good result instead of piling onto a database that may be waking up.
+    if now - _health_last_ok_ns >= _HEALTH_DB_TTL_NS and _health_probe_lock.acquire(blocking=False):
+        try:
+            # Debounced pings never touch the pool; a probe borrows one
+            # autocommit connection instead of a request-scoped Session.
+            with autocommit_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            _health_last_ok_ns = now
+        except Exception:
+            db_status = "degraded"
+        finally:
+            _health_probe_lock.release()
+    elif _health_last_ok_ns == 0:
+        # Another thread is running the very first probe; nothing known-good to report yet.
         db_status = "degraded"
 
     return {
@@ -205,6 +392,8 @@ async def metrics():
 app.include_router(cards_router, prefix="/cards", tags=["Cards"])
 app.include_router(pix_router, prefix="/pix", tags=["PIX"])
 app.include_router(antifraude_router, prefix="/antifraud", tags=["Anti-Fraud"])
+# Legacy Portuguese prefix served by the same router (hidden from OpenAPI to avoid duplicate operations).
+app.include_router(antifraude_router, prefix="/antifraude", include_in_schema=False)
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(boleto_router, tags=["Boleto"])
 
@@ -216,18 +405,32 @@ from app.core.metrics import router as metrics_router
 app.include_router(metrics_router, tags=["Metrics"])
 
 static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
 
 app.include_router(web_router, tags=["Web UI"])
 
 
+# Browsers request the favicon on every page; read it once instead of stat+open per hit.
+_FAVICON_PATH = Path(__file__).resolve().parent / "static" / "img" / "logo.png"
+_FAVICON_BYTES = _FAVICON_PATH.read_bytes() if _FAVICON_PATH.exists() else None
+_FAVICON_HEADERS = (
+    {
+        "ETag": f'"{hashlib.blake2b(_FAVICON_BYTES, digest_size=8).hexdigest()}"',
+        "Cache-Control": "public, max-age=86400",
+    }
+    if _FAVICON_BYTES is not None
+    else {}
+)
+
+
 @app.get("/favicon.ico", include_in_schema=False)
-def favicon() -> Response:
+def favicon(request: Request) -> Response:
     """Serve favicon to avoid noisy 404s from browsers."""
-    candidate = Path(__file__).resolve().parent / "static" / "img" / "logo.png"
-    if candidate.exists():
-        return FileResponse(path=str(candidate), media_type="image/png")
-    return Response(status_code=204)
+    if _FAVICON_BYTES is None:
+        return Response(status_code=204)
+    if request.headers.get("if-none-match") == _FAVICON_HEADERS["ETag"]:
+        return Response(status_code=304, headers=_FAVICON_HEADERS)
+    return Response(content=_FAVICON_BYTES, media_type="image/png", headers=_FAVICON_HEADERS)
 
 
 @app.get("/sw.js", include_in_schema=False)
@@ -269,11 +472,14 @@ def api_info() -> Dict[str, Any]:
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handles HTTP exceptions including 401 browser redirects."""
-    correlation_id = getattr(request.state, "correlation_id", "N/A")
-    accept = request.headers.get("accept", "")
+    state = request.state
+    correlation_id = getattr(state, "correlation_id", "N/A")
+    accept = getattr(state, "accept", None)
+    if accept is None:
+        accept = request.headers.get("accept", "")
 
     logger.info(
-        f"HTTPException: {exc.status_code} | Accept: {accept}",
+        "HTTPException: %d | Accept: %s", exc.status_code, accept,
         extra={"correlation_id": correlation_id}
     )
 
@@ -287,7 +493,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         logger.info("404 browser request — redirecting to /login", extra={"correlation_id": correlation_id})
         return RedirectResponse(url="/login", status_code=302)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail, "correlation_id": correlation_id}
     )
@@ -306,7 +512,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         exc_info=True,
         extra={"correlation_id": correlation_id}
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal Server Error",
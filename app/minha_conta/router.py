@@ -1,11 +1,8 @@
 """
 User area routes — profile, financial health, subscription management.
 """
-import os
-
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -13,12 +10,10 @@ from app.auth.dependencies import get_current_user
 from app.auth.models import User
 from app.cards.models import CreditCard
 from app.core.database import get_db
+from app.core.templates import templates
 from app.minha_conta import service as sub_service
 from app.minha_conta.models import SubscriptionStatus
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
-
 router = APIRouter()
 
 
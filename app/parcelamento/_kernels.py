@@ -0,0 +1,61 @@
+"""
+Numeric kernels for the Price Table amortization schedule.
+
+Compiled with Numba when it is installed; otherwise the same NumPy code runs
+as-is. fastmath is deliberately off: reassociated float math could move a
+cent across a rounding boundary.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover — numba is an optional accelerator
+    njit = None
+
+
+@lru_cache(maxsize=256)
+def annuity_factors(installments: int, rate: float) -> np.ndarray:
+    """
+    1 - (1+i)^-k for k = n-1 .. 0, the part of every balance that depends only on
+    the (installments, rate) shape. Offers repeat a handful of shapes with varying
+    values, so this is computed once per shape; the array is read-only because it
+    is shared between callers.
+    """
+    remaining = np.arange(installments - 1, -1, -1).astype(np.float64)
+    # 1 - (1+i)^-k as -expm1(-k*log1p(i)): no cancellation for small i or k.
+    factors = -np.expm1(-remaining * np.log1p(rate))
+    factors.flags.writeable = False
+    return factors
+
+
+def _amortize(
+    value: float, rate: float, installment: float, factors: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (interest, principal, balance) per month, unrounded.
+
+    The balance after month k is the present value of the n-k payments still due,
+    PMT * (1 - (1+i)^-(n-k)) / i, which stays accurate on long high-rate schedules
+    where compounding the previous balance forward amplifies rounding error.
+    factors comes from annuity_factors(n, rate).
+    """
+    balances = installment * factors / rate
+    opening = np.empty(factors.shape[0])
+    opening[0] = value
+    opening[1:] = balances[:-1]
+    interests = opening * rate
+    principals = installment - interests
+    # Avoid negative balance due to floating point rounding
+    balances[balances < 0.01] = 0.0
+    return interests, principals, balances
+
+
+if njit is not None:
+    amortize = njit(cache=True)(_amortize)
+    # Compile (or load from the on-disk cache) at import, not on the first request.
+    amortize(1.0, 0.01, 1.01, annuity_factors(1, 0.01))
+else:
+    amortize = _amortize
@@ -2,10 +2,12 @@
 Data models for installment simulations.
 Persists historical data for audit and analytics.
 """
-from sqlalchemy import Integer, Float, String, DateTime, Text, Numeric
+from sqlalchemy import Integer, Float, String, DateTime, Numeric, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Any, Dict, List, Union
 from app.core.database import Base
 
 
@@ -13,6 +15,11 @@ class InstallmentSimulation(Base):
     """Entity representing a performed installment simulation."""
 
     __tablename__ = "simulacoes_parcelamento"
+    __table_args__ = (
+        # Rows are append-only in criado_em order, so on PostgreSQL a BRIN index
+        # serves time-range reports at a fraction of a btree's size and write cost.
+        Index("ix_simulacoes_criado_em", "criado_em", postgresql_using="brin"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     value: Mapped[Decimal] = mapped_column("valor", Numeric(15, 2, asdecimal=True), nullable=False)
@@ -21,8 +28,15 @@ class InstallmentSimulation(Base):
     installment_value: Mapped[Decimal] = mapped_column("valor_parcela", Numeric(15, 2, asdecimal=True), nullable=False)
     total_paid: Mapped[Decimal] = mapped_column("total_pago", Numeric(15, 2, asdecimal=True), nullable=False)
     annual_cet: Mapped[Decimal] = mapped_column("cet_anual", Numeric(15, 6, asdecimal=True), nullable=False)
-    amortization_table: Mapped[str] = mapped_column("tabela_amortizacao", Text, nullable=False)  # Serialized JSON
-    created_at: Mapped[datetime] = mapped_column("criado_em", DateTime, default=lambda: datetime.now(timezone.utc))
+    # Binary JSONB on PostgreSQL; JSON-as-text elsewhere (SQLite tests). Holds the
+    # columnar {"interest": [...], "principal": [...], "balance": [...]} form (see
+    # service.pack_schedule); older rows hold a list of row objects.
+    amortization_table: Mapped[Union[Dict[str, List[float]], List[Dict[str, Any]]]] = mapped_column(
+        "tabela_amortizacao", JSON().with_variant(JSONB(), "postgresql"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        "criado_em", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
     correlation_id: Mapped[str] = mapped_column(String(100), index=True, nullable=True)
 
     def __repr__(self):
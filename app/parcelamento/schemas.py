@@ -2,7 +2,7 @@
 Pydantic schemas for input/output validation.
 Enforces strict type checking and boundary constraints.
 """
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, field_validator, ConfigDict
 from typing import List
 from datetime import datetime
 
@@ -16,11 +16,33 @@ class AmortizationInstallment(BaseModel):
     balance: float = Field(..., ge=0, description="Remaining balance")
 
 
+class AmortizationColumns(BaseModel):
+    """Amortization schedule as parallel arrays, one entry per month."""
+    month: List[int] = Field(..., description="Month numbers")
+    installment: List[float] = Field(..., description="Installment values")
+    interest: List[float] = Field(..., description="Interest amounts")
+    principal: List[float] = Field(..., description="Principal amortizations")
+    balance: List[float] = Field(..., description="Remaining balances")
+
+
 class SimulationRequest(BaseModel):
-    """Installment simulation request payload."""
-    value: float = Field(..., gt=0, le=1000000, description="Principal amount")
-    installments: int = Field(..., ge=1, le=360, description="Number of installments")
-    monthly_rate: float = Field(..., gt=0, le=0.15, description="Monthly interest rate (decimal)")
+    """
+    Installment simulation request payload.
+    Also accepts the Portuguese keys (the stored column names), so clients using
+    either naming share this one schema.
+    """
+    value: float = Field(
+        ..., gt=0, le=1000000, description="Principal amount",
+        validation_alias=AliasChoices("value", "valor")
+    )
+    installments: int = Field(
+        ..., ge=1, le=360, description="Number of installments",
+        validation_alias=AliasChoices("installments", "parcelas")
+    )
+    monthly_rate: float = Field(
+        ..., gt=0, le=0.15, description="Monthly interest rate (decimal)",
+        validation_alias=AliasChoices("monthly_rate", "taxa_mensal")
+    )
 
     @field_validator('monthly_rate')
     @classmethod
@@ -40,3 +62,13 @@ class SimulationResponse(BaseModel):
     created_at: datetime = Field(..., description="Simulation timestamp")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SimulationColumnarResponse(BaseModel):
+    """Simulation result with the schedule in columnar form (format=columnar)."""
+    installment: float = Field(..., description="Monthly installment value")
+    total_paid: float = Field(..., description="Total payable amount")
+    annual_cet: float = Field(..., description="Annualized Total Effective Cost (%)")
+    columns: AmortizationColumns = Field(..., description="Full amortization schedule, columnar")
+    simulation_id: int = Field(..., description="Persisted simulation ID")
+    created_at: datetime = Field(..., description="Simulation timestamp")
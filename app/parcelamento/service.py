@@ -2,65 +2,124 @@
 Business logic for installment calculation.
 Implements Price Table (compound interest) and Total Effective Cost (CET) algorithms.
 """
-import json
-from typing import Dict, Any, List
+import math
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
 from sqlalchemy.orm import Session
+from app.parcelamento._kernels import amortize, annuity_factors
 from app.parcelamento.models import InstallmentSimulation
 from app.parcelamento.schemas import SimulationRequest
 from app.core.logger import logger, audit_log
 
 
-def calculate_installments(data: SimulationRequest) -> Dict[str, Any]:
+@lru_cache(maxsize=4096)
+def _calculate_schedule(
+    value: float, installments: int, rate: float
+) -> Tuple[float, float, float, Tuple[Tuple[Any, ...], ...]]:
     """
-    Calculates amortization schedule using the Price Table method.
-    Returns monthly installment, total payable amount, annualized CET, and detailed amortization breakdown.
-
-    Formula: PMT = PV * [(1+i)^n * i] / [(1+i)^n - 1]
+    Pure Price Table computation, memoized on its three scalar inputs.
+    Returns immutable (installment, total_paid, annual_cet, rows) so cache hits
+    can never be altered by a caller.
     """
-    value = data.value
-    installments = data.installments
-    rate = data.monthly_rate
-
-    # Installment calculation (Price Table)
-    factor = (1 + rate) ** installments
-    installment = value * (rate * factor) / (factor - 1)
-
-    # Amortization schedule generation
-    amortization: List[Dict[str, Any]] = []
-    balance = value
-
-    for i in range(installments):
-        interest = balance * rate
-        principal = installment - interest
-        balance -= principal
-
-        # Avoid negative balance due to floating point rounding
-        if balance < 0.01:
-            balance = 0
-
-        amortization.append({
-            "month": i + 1,
-            "installment": round(installment, 2),
-            "interest": round(interest, 2),
-            "principal": round(principal, 2),
-            "balance": round(balance, 2)
-        })
+    # Installment calculation (Price Table), as PV * i / (1 - (1+i)^-n): expm1/log1p
+    # keep the denominator accurate when i is small instead of cancelling 1 - ~1.
+    installment = value * rate / -math.expm1(-installments * math.log1p(rate))
+
+    # Amortization schedule generation (see _kernels for the balance formula)
+    interests, principals, balances = amortize(
+        value, rate, installment, annuity_factors(installments, rate)
+    )
+
+    rounded_installment = round(installment, 2)
+    # zip builds the row tuples in C; tolist() unboxes each array in one pass.
+    rows = tuple(zip(
+        range(1, installments + 1),
+        repeat(rounded_installment, installments),
+        np.round(interests, 2).tolist(),
+        np.round(principals, 2).tolist(),
+        np.round(balances, 2).tolist(),
+    ))
 
     # CET (Total Effective Cost) calculation - Annualized
     total_paid = installment * installments
     monthly_cet = (total_paid / value) ** (1 / installments) - 1
     annual_cet = ((1 + monthly_cet) ** 12 - 1) * 100
 
-    logger.info(f"Simulation calculated: value={value}, installments={installments}, installment={round(installment, 2)}")
+    return rounded_installment, round(total_paid, 2), round(annual_cet, 2), rows
+
+
+def calculate_installments(data: SimulationRequest) -> Dict[str, Any]:
+    """
+    Calculates amortization schedule using the Price Table method.
+    Returns monthly installment, total payable amount, annualized CET, and detailed amortization breakdown.
+
+    Formula: PMT = PV * [(1+i)^n * i] / [(1+i)^n - 1]
+    """
+    installment, total_paid, annual_cet, rows = _calculate_schedule(
+        data.value, data.installments, data.monthly_rate
+    )
+
+    logger.info(
+        "Simulation calculated: value=%s, installments=%s, installment=%s",
+        data.value, data.installments, installment
+    )
 
+    # Fresh dicts per call: the result is handed to the router and the ORM.
+    amortization: List[Dict[str, Any]] = [
+        {"month": month, "installment": amount, "interest": interest, "principal": principal, "balance": balance}
+        for month, amount, interest, principal, balance in rows
+    ]
     return {
-        "installment": round(installment, 2),
-        "total_paid": round(total_paid, 2),
-        "annual_cet": round(annual_cet, 2),
+        "installment": installment,
+        "total_paid": total_paid,
+        "annual_cet": annual_cet,
         "table": amortization
     }
 
 
+_COLUMN_NAMES = ("month", "installment", "interest", "principal", "balance")
+
+
+def schedule_columns(data: SimulationRequest) -> Dict[str, List[Any]]:
+    """
+    Returns the amortization schedule as parallel arrays keyed by field name,
+    one entry per month. Transposes the memoized rows, so calling this after
+    calculate_installments for the same request does not recompute anything.
+    """
+    *_, rows = _calculate_schedule(data.value, data.installments, data.monthly_rate)
+    return {name: list(column) for name, column in zip(_COLUMN_NAMES, zip(*rows))}
+
+
+# Per-month fields that vary; month is the list position and installment is the
+# simulation's installment_value, so neither is repeated in storage.
+_STORED_COLUMNS = ("interest", "principal", "balance")
+
+
+def pack_schedule(table: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """Columnar storage form of an amortization table (no per-row key strings)."""
+    return {name: [row[name] for row in table] for name in _STORED_COLUMNS}
+
+
+def unpack_schedule(simulation: InstallmentSimulation) -> List[Dict[str, Any]]:
+    """
+    Rebuilds the per-month rows of a persisted simulation. Rows saved before the
+    columnar layout (a list of row objects) are returned as stored.
+    """
+    stored = simulation.amortization_table
+    if isinstance(stored, list):
+        return stored
+    installment = float(simulation.installment_value)
+    return [
+        {"month": month, "installment": installment, "interest": interest, "principal": principal, "balance": balance}
+        for month, (interest, principal, balance) in enumerate(
+            zip(*(stored[name] for name in _STORED_COLUMNS)), start=1
+        )
+    ]
+
+
 def save_simulation(
     db: Session,
     data: SimulationRequest,
@@ -77,13 +136,17 @@ def save_simulation(
         installment_value=result["installment"],
         total_paid=result["total_paid"],
         annual_cet=result["annual_cet"],
-        amortization_table=json.dumps(result["table"]),
+        amortization_table=pack_schedule(result["table"]),
         correlation_id=correlation_id
     )
 
     db.add(simulation)
+    # The flush's INSERT already yields the id (lastrowid/RETURNING) and criado_em
+    # is set client-side, so detach before commit: the instance keeps its loaded
+    # state instead of being expired and re-SELECTed.
+    db.flush()
+    db.expunge(simulation)
     db.commit()
-    db.refresh(simulation)
 
     audit_log(
         action="installment_simulation",
@@ -92,6 +155,7 @@ def save_simulation(
         details={"correlation_id": correlation_id, "value": data.value, "installments": data.installments}
     )
 
-    logger.info(f"Simulation persisted: id={simulation.id}")
+    logger.info("Simulation persisted: id=%s", simulation.id)
 
     return simulation
+
@@ -0,0 +1,91 @@
+"""
+Per-process replay cache for idempotent PIX POSTs.
+A retried request with the same (user, X-Idempotency-Key) and the same payload is
+answered from memory instead of re-running the handler's queries; a key reused
+with a different payload is refused. The unique idempotency_key column remains
+the guarantee across workers and restarts; this only short-circuits replays that
+land on the same process.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException
+
+# Covers client retry/backoff windows. A replay after this re-runs the handler,
+# which finds the stored transaction through the idempotency_key column.
+_TTL_SECONDS = 600.0
+_MAX_SLOTS = 10_000
+
+# (user_id, idempotency_key) -> (expires_at, payload_digest, response); response None while in flight
+_slots: Dict[Tuple[str, str], Tuple[float, str, Any]] = {}
+_slots_lock = threading.Lock()
+
+
+class IdempotencySlot:
+    """Reservation for one idempotency key; holds the cached response on replay."""
+
+    __slots__ = ("cached_response", "response")
+
+    def __init__(self, cached_response: Optional[Any] = None) -> None:
+        self.cached_response = cached_response
+        self.response: Optional[Any] = None
+
+    def store(self, response: Any) -> None:
+        """Records the response to replay for later requests with the same key."""
+        self.response = response
+
+
+@contextmanager
+def idempotency_guard(
+    user_id: str, idempotency_key: str, payload_digest: str = ""
+) -> Iterator[IdempotencySlot]:
+    """
+    Reserves the key for the duration of the block.
+
+    payload_digest identifies the request body the key was first used with.
+
+    - Used with a different payload: raises HTTP 422 instead of replaying.
+    - Finished earlier: yields a slot whose cached_response is that response.
+    - Still running in another request: raises HTTP 429.
+    - Otherwise: yields an empty slot. A response passed to slot.store() is kept
+      for replays; if the block raises or stores nothing, the key is released so
+      a retry runs again.
+    """
+    key = (user_id, idempotency_key)
+    now = time.monotonic()
+    with _slots_lock:
+        entry = _slots.get(key)
+        if entry is not None and entry[0] > now:
+            if entry[1] != payload_digest:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency key was already used with a different request payload.",
+                )
+            if entry[2] is None:
+                raise HTTPException(
+                    status_code=429,
+                    detail="A request with this idempotency key is still being processed. Retry later.",
+                )
+            cached = entry[2]
+        else:
+            cached = None
+            if len(_slots) >= _MAX_SLOTS:
+                # Oldest insertion first — dicts preserve insertion order.
+                _slots.pop(next(iter(_slots)), None)
+            _slots[key] = (now + _TTL_SECONDS, payload_digest, None)
+
+    if cached is not None:
+        yield IdempotencySlot(cached)
+        return
+
+    slot = IdempotencySlot()
+    try:
+        yield slot
+    finally:
+        with _slots_lock:
+            if slot.response is not None:
+                _slots[key] = (time.monotonic() + _TTL_SECONDS, payload_digest, slot.response)
+            else:
+                _slots.pop(key, None)
@@ -2,7 +2,7 @@
 Data models for PIX transactions.
 Supports idempotency, state tracking, and audit trails.
 """
-from sqlalchemy import String, DateTime, Enum, UniqueConstraint, Numeric
+from sqlalchemy import String, DateTime, Enum, Index, UniqueConstraint, Numeric
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime, timezone
 from decimal import Decimal
@@ -97,10 +97,9 @@ class PixTransaction(Base):
         "status",
         Enum(PixStatus, values_callable=get_enum_values),
         nullable=False,
-        default=PixStatus.CREATED,
-        index=True
+        default=PixStatus.CREATED
     )
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)  # Foreign Key to User
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)  # Foreign Key to User
     idempotency_key: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
     description: Mapped[str] = mapped_column("descricao", String(500), nullable=True)
     created_at: Mapped[datetime] = mapped_column("criado_em", DateTime, default=lambda: datetime.now(timezone.utc), index=True)
@@ -110,7 +109,7 @@ class PixTransaction(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc)
     )
-    correlation_id: Mapped[str] = mapped_column(String(100), index=True, nullable=True)
+    correlation_id: Mapped[str] = mapped_column(String(100), nullable=True)
     scheduled_date: Mapped[datetime] = mapped_column("data_agendamento", DateTime, nullable=True)
     recipient_name: Mapped[str] = mapped_column("nome_destinatario", String(200), nullable=True)
     fee_amount: Mapped[Decimal] = mapped_column("taxa_valor", Numeric(15, 2, asdecimal=True), nullable=True)
@@ -123,6 +122,15 @@ class PixTransaction(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "payload_hash", name="uix_pix_user_payload_hash"),
+        # The statement reads one user's rows newest first, optionally for one status:
+        # both shapes become an index range scan that stops at the LIMIT, no sort.
+        # (user_id, criado_em) also serves every plain user_id lookup, which is why
+        # user_id and status carry no single-column indexes of their own.
+        Index("ix_pix_user_created", "user_id", "criado_em"),
+        Index("ix_pix_user_status_created", "user_id", "status", "criado_em"),
+        # Counterpart lookups match an internal transfer's two records by
+        # correlation_id and type; the prefix also serves correlation_id alone.
+        Index("ix_pix_corr_tipo", "correlation_id", "tipo"),
     )
 
     def __repr__(self):
@@ -2,13 +2,20 @@
 FastAPI Router for PIX endpoints.
 Exposes RESTful API with strict validation and automated documentation.
 """
+import asyncio
+import contextvars
+import functools
+import hashlib
 import hmac
 import re
 import httpx
-from typing import Any, Dict, Optional
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.pix.models import TransactionType, PixTransaction
@@ -27,6 +34,7 @@ from app.pix.schemas import (
 )
 from app.pix.service import create_pix, confirm_pix, get_pix, list_statement, cancel_pix, ensure_asaas_customer, credit_pix_receipt
 from app.pix.internal_transfer import find_recipient_user
+from app.pix.idempotency import idempotency_guard
 from app.adapters.gateway_factory import get_payment_gateway
 from decimal import Decimal
 from datetime import datetime as _dt, date as _date, timedelta as _td
@@ -41,7 +49,7 @@ from app.core.config import settings as _settings
 from app.antifraude.rules import antifraud_engine as _antifraud_engine
 from app.antifraude.schemas import AntifraudTransaction as _AntifraudTx
 
-router = APIRouter(tags=["PIX"])
+router = APIRouter(tags=["PIX"], default_response_class=ORJSONResponse)
 
 # ---------------------------------------------------------------------------
 # Platform PIX receiving key (Asaas account EVP key registered in BACEN DICT).
@@ -65,6 +73,20 @@ _UUID_RE = re.compile(
 )
 _ASAAS_ID_RE = re.compile(r'pay_[A-Za-z0-9]+')
 
+# Dedicated threads for the PIX send path. Plain `def` endpoints and the auth
+# dependencies share AnyIO's default threadpool; running the send transaction here
+# keeps a burst of slow transfers from holding every thread that login, session
+# checks and reads need.
+_PIX_WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=10, thread_name_prefix="pix-write")
+
+# Enum members bound once: on Python 3.11 each Enum.MEMBER access goes through a
+# descriptor, and these are compared on every PIX create and response build.
+_STATUS_CREATED = PixStatus.CREATED
+_STATUS_CONFIRMED = PixStatus.CONFIRMED
+_TYPE_SENT = TransactionType.SENT
+_TYPE_RECEIVED = TransactionType.RECEIVED
+_KEY_RANDOM = PixKeyType.RANDOM
+
 
 # ---------------------------------------------------------------------------
 # BR Code PIX EMV helpers (BACEN spec — ABECS ISO 18004)
@@ -168,32 +190,32 @@ def _screen_antifraud(
     )
     result = _antifraud_engine.analyze(fraud_tx)
 
-    if not result["approved"]:
+    if not result.approved:
         logger.warning(
             f"Antifraud REJECTED: user={user_id}, value={value}, "
-            f"score={result['score']}, rules={result['triggered_rules']}"
+            f"score={result.score}, rules={result.triggered_rules}"
         )
         audit_log(
             action="ANTIFRAUD_REJECTED",
             user=user_id,
             resource=f"value={value}",
             details={
-                "score": result["score"],
-                "risk_level": result["risk_level"],
-                "triggered_rules": result["triggered_rules"],
+                "score": result.score,
+                "risk_level": result.risk_level,
+                "triggered_rules": result.triggered_rules,
             },
         )
         raise HTTPException(
             status_code=403,
             detail=(
                 f"Transacao bloqueada pela analise de risco. "
-                f"Score: {result['score']}/100. {result['recommendation']}"
+                f"Score: {result.score}/100. {result.recommendation}"
             ),
         )
 
     logger.info(
         f"Antifraud APPROVED: user={user_id}, value={value}, "
-        f"score={result['score']}, level={result['risk_level']}"
+        f"score={result.score}, level={result.risk_level}"
     )
 
 
@@ -524,7 +546,7 @@ def _find_internal_qrcode_charge(payload: str, db, logger) -> tuple:
 
 
 @router.post("/transacoes", response_model=PixResponse, status_code=201)
-def create_pix_transaction(
+async def create_pix_transaction(
     data: PixCreateRequest,
     x_idempotency_key: str = Header(..., alias="X-Idempotency-Key"),
     db: Session = Depends(get_db),
@@ -545,63 +567,95 @@ def create_pix_transaction(
     """
     # Generate correlation_id for traceability
     correlation_id = x_correlation_id or str(uuid4())
+    # copy_context keeps the request's tracing and logging context in the worker thread.
+    work = functools.partial(
+        contextvars.copy_context().run,
+        _create_pix_transaction, data, x_idempotency_key, db, current_user, correlation_id,
+    )
+    return await asyncio.get_running_loop().run_in_executor(_PIX_WRITE_EXECUTOR, work)
+
+
+def _create_pix_transaction(
+    data: PixCreateRequest,
+    x_idempotency_key: str,
+    db: Session,
+    current_user: User,
+    correlation_id: str,
+) -> PixResponse:
+    """Blocking body of POST /transacoes; runs on _PIX_WRITE_EXECUTOR."""
     logger = get_logger_with_correlation(correlation_id)
 
-    # Enforce Active Account Policy manually, but allow Self-Deposit (Copia e Cola)
-    # This allows new users to fund their account via "Pix Copia e Cola" of their own charge.
-    has_deposit = db.query(PixTransaction).filter(
-        PixTransaction.user_id == current_user.id,
-        PixTransaction.type == TransactionType.RECEIVED,
-        PixTransaction.status == PixStatus.CONFIRMED
-    ).first()
+    # A replay of a finished request is answered from memory; one racing a request
+    # still in flight gets 429 instead of queueing more work on the same key.
+    # The digest ties the key to this exact body: a different amount or recipient
+    # under a reused key is rejected instead of replaying the earlier transaction.
+    payload_digest = hashlib.blake2b(data.model_dump_json().encode(), digest_size=16).hexdigest()
+    with idempotency_guard(current_user.id, x_idempotency_key, payload_digest) as slot:
+        if slot.cached_response is not None:
+            logger.info("Replaying PIX response for idempotency key: %s", x_idempotency_key)
+            return slot.cached_response
+
+        # Enforce Active Account Policy manually, but allow Self-Deposit (Copia e Cola)
+        # This allows new users to fund their account via "Pix Copia e Cola" of their own charge.
+        # Also consider users with positive balance as active accounts.
+        # Balance can be positive via admin credits or Asaas webhook confirmations that
+        # pre-date transaction-level tracking. The balance invariant is the source of
+        # truth for financial capacity; the CONFIRMED RECEIVED check is a secondary
+        # activation signal to prevent unactivated spam accounts from sending.
+        # The is_active_account flag (set on the first credited deposit) and the balance
+        # are already loaded, so the deposit lookup only runs when both are unset.
+        account_is_active = (
+            current_user.is_active_account
+            or current_user.balance > 0
+            or db.query(PixTransaction.id).filter(
+                PixTransaction.user_id == current_user.id,
+                PixTransaction.type == _TYPE_RECEIVED,
+                PixTransaction.status == _STATUS_CONFIRMED
+            ).first() is not None
+        )
 
-    # Also consider users with positive balance as active accounts.
-    # Balance can be positive via admin credits or Asaas webhook confirmations that
-    # pre-date transaction-level tracking. The balance invariant is the source of
-    # truth for financial capacity; the CONFIRMED RECEIVED check is a secondary
-    # activation signal to prevent unactivated spam accounts from sending.
-    account_is_active = has_deposit or current_user.balance > 0
-
-    if not account_is_active:
-        # If no deposit and no balance, only allow if it looks like a Copia e Cola (potential self-deposit)
-        # The service layer will validate if it is indeed a self-deposit and handle it.
-        # If it is NOT a self-deposit, the service will check balance (which is 0) and fail safely.
-        if not (data.key_type == PixKeyType.RANDOM and len(data.pix_key) > 36):
-             raise HTTPException(
-                status_code=403,
-                detail="Inactive account. Make a first deposit (Received PIX) to unlock all features."
-            )
+        if not account_is_active:
+            # If no deposit and no balance, only allow if it looks like a Copia e Cola (potential self-deposit)
+            # The service layer will validate if it is indeed a self-deposit and handle it.
+            # If it is NOT a self-deposit, the service will check balance (which is 0) and fail safely.
+            if not (data.key_type == _KEY_RANDOM and len(data.pix_key) > 36):
+                 raise HTTPException(
+                    status_code=403,
+                    detail="Inactive account. Make a first deposit (Received PIX) to unlock all features."
+                )
 
-    try:
-        logger.info(f"Starting PIX creation: value={data.value} key_type={data.key_type} user={current_user.id}")
+        try:
+            logger.info("Starting PIX creation: value=%s key_type=%s user=%s", data.value, data.key_type, current_user.id)
 
-        _screen_antifraud(data.value, current_user.id, db, logger, tx_type="PIX_SEND")
+            _screen_antifraud(data.value, current_user.id, db, logger, tx_type="PIX_SEND")
 
-        pix = create_pix(
-            db,
-            data,
-            x_idempotency_key,
-            correlation_id,
-            user_id=current_user.id,
-            type=TransactionType.SENT
-        )
+            pix = create_pix(
+                db,
+                data,
+                x_idempotency_key,
+                correlation_id,
+                user_id=current_user.id,
+                type=_TYPE_SENT
+            )
 
-        # Auto-confirm immediate transactions (Simulating instant payment)
-        if pix.status == PixStatus.CREATED and pix.type == TransactionType.SENT:
-            confirmed_pix = confirm_pix(db, pix.id, correlation_id)
-            if confirmed_pix:
-                pix = confirmed_pix
+            # Auto-confirm immediate transactions (Simulating instant payment)
+            if pix.status == _STATUS_CREATED and pix.type == _TYPE_SENT:
+                confirmed_pix = confirm_pix(db, pix.id, correlation_id)
+                if confirmed_pix:
+                    pix = confirmed_pix
 
-        return build_pix_response(pix, db)
+            response = build_pix_response(pix, db, current_user)
+            slot.store(response)
+            return response
 
-    except ValueError as e:
-        logger.warning(f"PIX validation error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating PIX: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Internal error processing PIX")
+        except ValueError as e:
+            logger.warning("PIX validation error: %s", e)
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error creating PIX: %s", e, exc_info=True)
+            raise HTTPException(status_code=500, detail="Internal error processing PIX")
 
 
 @router.post("/transacoes/confirmar", response_model=PixResponse)
@@ -619,19 +673,19 @@ def confirm_pix_transaction(
     logger = get_logger_with_correlation(correlation_id)
 
     try:
-        logger.info(f"Confirming PIX: {data.pix_id}")
+        logger.info("Confirming PIX: %s", data.pix_id)
 
         pix = confirm_pix(db, data.pix_id, correlation_id)
 
         if not pix:
             raise HTTPException(status_code=404, detail="Transaction not found")
 
-        return build_pix_response(pix, db)
+        return build_pix_response(pix, db, current_user)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error confirming PIX: {str(e)}", exc_info=True)
+        logger.error("Error confirming PIX: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error confirming transaction")
 
 
@@ -734,10 +788,10 @@ def get_pix_transaction(
                     db.commit()
                     db.refresh(pix)
             except Exception as e:
-                logger.warning(f"Lazy status refresh failed for {pix_id}: {e}")
+                logger.warning("Lazy status refresh failed for %s: %s", pix_id, e)
                 # Non-fatal: return current DB state
 
-    return build_pix_response(pix, db)
+    return build_pix_response(pix, db, current_user)
 
 
 @router.delete("/transacoes/{pix_id}", response_model=PixResponse)
@@ -754,19 +808,19 @@ def cancel_pix_scheduling(
     logger = get_logger_with_correlation(correlation_id)
 
     try:
-        logger.info(f"PIX cancellation request: {pix_id} user={current_user.id}")
+        logger.info("PIX cancellation request: %s user=%s", pix_id, current_user.id)
 
         pix = cancel_pix(db, pix_id, current_user.id, correlation_id)
 
         if not pix:
             raise HTTPException(status_code=404, detail="Transaction not found or does not belong to user")
 
-        return build_pix_response(pix, db)
+        return build_pix_response(pix, db, current_user)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error cancelling PIX: {str(e)}", exc_info=True)
+        logger.error("Error cancelling PIX: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error cancelling transaction")
 
 
@@ -776,123 +830,24 @@ def get_statement(
     limit: int = 50,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
-) -> PixStatementResponse:
+) -> Response:
     """
     Retrieves transaction ledger with optional status filtering.
     Optimized with batch loading to prevent N+1 query issues.
     """
     result: Dict[str, Any] = list_statement(db, current_user.id, limit, status.value if status else None)
 
-    transactions = result["transactions"]
-
-    # --- BATCH LOADING OPTIMIZATION ---
-    # 1. Collect all relevant IDs
-    user_ids = {t.user_id for t in transactions}
-    correlation_ids = {t.correlation_id for t in transactions if t.correlation_id}
-
-    # 2. Fetch all related Users in one query
-    # We need the current user (already have) and potentially others if we were admin,
-    # but here we mostly need the current user.
-    # However, for internal transfers, we need the OTHER user.
-    # The 'build_pix_response' logic looks for related transactions to find the other user.
-
-    # 3. Fetch all related Transactions (Counterparts) in one query
-    related_txs = []
-    if correlation_ids:
-        related_txs = db.query(PixTransaction).filter(
-            PixTransaction.correlation_id.in_(correlation_ids),
-            PixTransaction.id.notin_([t.id for t in transactions]) # Exclude self
-        ).all()
-
-    # Map correlation_id -> related_transaction
-    related_tx_map = {tx.correlation_id: tx for tx in related_txs}
-
-    # 4. Collect User IDs from related transactions
-    related_user_ids = {tx.user_id for tx in related_txs}
-    all_user_ids = user_ids.union(related_user_ids)
-
-    # 5. Fetch all Users in one query
-    users = db.query(User).filter(User.id.in_(all_user_ids)).all()
-    user_map = {u.id: u for u in users}
-
-    # 6. Build Responses in Memory
-    response_list = []
-
-    for pix in transactions:
-        # Default values
-        sender_name = "Unknown"
-        sender_doc = "***"
-        receiver_name = "Unknown"
-        receiver_doc = "***"
-
-        owner_user = user_map.get(pix.user_id)
-
-        if pix.type == TransactionType.SENT:
-            # Owner is Sender
-            if owner_user:
-                sender_name = owner_user.name
-                sender_doc = mask_cpf_cnpj(owner_user.cpf_cnpj)
-
-            # Find Receiver (Counterpart)
-            receiver_tx = related_tx_map.get(pix.correlation_id)
-            # Ensure it's the right type (RECEIVED)
-            if receiver_tx and receiver_tx.type == TransactionType.RECEIVED:
-                receiver_user = user_map.get(receiver_tx.user_id)
-                if receiver_user:
-                    receiver_name = receiver_user.name
-                    receiver_doc = mask_cpf_cnpj(receiver_user.cpf_cnpj)
-            else:
-                # External — use stored recipient name when available
-                receiver_name = pix.recipient_name or "Destinatario externo"
-                receiver_doc = mask_cpf_cnpj(pix.pix_key)
-
-        elif pix.type == TransactionType.RECEIVED:
-            # Owner is Receiver
-            if owner_user:
-                receiver_name = owner_user.name
-                receiver_doc = mask_cpf_cnpj(owner_user.cpf_cnpj)
-
-            # Find Sender (Counterpart)
-            sender_tx = related_tx_map.get(pix.correlation_id)
-            # Ensure it's the right type (SENT)
-            if sender_tx and sender_tx.type == TransactionType.SENT:
-                sender_user = user_map.get(sender_tx.user_id)
-                if sender_user:
-                    sender_name = sender_user.name
-                    sender_doc = mask_cpf_cnpj(sender_user.cpf_cnpj)
-            else:
-                # Deposito ou externo
-                if "SIMULACAO" in pix.pix_key or "Deposit" in (pix.description or ""):
-                    sender_name = "Deposito via QR Code"
-                    sender_doc = "Instituicao Financeira"
-                else:
-                    sender_name = pix.recipient_name or "Pagador externo"
-                    sender_doc = "***"
-
-        response_list.append(PixResponse(
-            id=pix.id,
-            value=pix.value,
-            pix_key=pix.pix_key,
-            key_type=pix.key_type,
-            type=pix.type,
-            status=pix.status,
-            description=pix.description,
-            scheduled_date=pix.scheduled_date,
-            created_at=pix.created_at,
-            updated_at=pix.updated_at,
-            formatted_time=format_brasilia_time(pix.created_at),
-            sender_name=sender_name,
-            sender_doc=sender_doc,
-            receiver_name=receiver_name,
-            receiver_doc=receiver_doc
-        ))
+    statement = {
+        "total_transactions": result["total_transactions"],
+        "total_value": float(result["total_value"]),
+        "balance": float(result["balance"]),
+        "transactions": build_pix_response_fields(result["transactions"], db, current_user),
+    }
+    # response_model is kept for the OpenAPI schema. The rows are already typed, so
+    # they are encoded straight from dicts: no per-row model, no FastAPI
+    # re-validation. OPT_UTC_Z matches pydantic's "Z" form for UTC timestamps.
+    return Response(content=orjson.dumps(statement, option=orjson.OPT_UTC_Z), media_type="application/json")
 
-    return PixStatementResponse(
-        total_transactions=result["total_transactions"],
-        total_value=result["total_value"],
-        balance=result["balance"],
-        transactions=response_list
-    )
 
 
 def _normalize_pix_key(chave: str, tipo: str) -> str:
@@ -1040,7 +995,7 @@ def generate_pix_charge(
     correlation_id = x_correlation_id or str(uuid4())
     logger = get_logger_with_correlation(correlation_id)
 
-    logger.info(f"Generating PIX charge: value={data.value} for user {current_user.id}")
+    logger.info("Generating PIX charge: value=%s for user %s", data.value, current_user.id)
 
     description = data.description or "BioCodeTechPay - Cobranca PIX"
 
@@ -1086,7 +1041,7 @@ def generate_pix_charge(
                 else:
                     qr_url = raw_image
 
-                logger.info(f"Real Asaas charge created: {pix.id}")
+                logger.info("Real Asaas charge created: %s", pix.id)
                 return PixChargeResponse(
                     charge_id=pix.id,
                     value=data.value,
@@ -1097,7 +1052,7 @@ def generate_pix_charge(
                     expires_at=pix.expires_at
                 )
         except Exception as e:
-            logger.warning(f"Asaas charge failed, falling back to simulation: {str(e)}")
+            logger.warning("Asaas charge failed, falling back to simulation: %s", e)
             db.rollback()  # reset session state before fallback insert
     elif gateway and Decimal(str(data.value)) < ASAAS_MIN_VALUE:
         logger.info(
@@ -1108,7 +1063,7 @@ def generate_pix_charge(
     # Generates a format-valid, CRC-valid PIX EMV payload so any bank app
     # can parse and display the charge (key lookup at DICT will not resolve in
     # sandbox — that is expected; in production all charges go through Asaas).
-    logger.info(f"Creating local simulation charge for user {current_user.id}")
+    logger.info("Creating local simulation charge for user %s", current_user.id)
     charge_id = str(uuid4())
 
     # Build EMV before insert so it can be persisted in copy_paste_code
@@ -1167,24 +1122,24 @@ def process_pix_receipt(
     correlation_id = x_correlation_id or str(uuid4())
     logger = get_logger_with_correlation(correlation_id)
 
-    logger.info(f"Processing PIX receipt for charge: {data.charge_id}")
+    logger.info("Processing PIX receipt for charge: %s", data.charge_id)
 
     # Find the charge transaction
     pix = db.query(PixTransaction).filter(PixTransaction.id == data.charge_id).first()
 
     if not pix:
-        logger.error(f"Charge not found: {data.charge_id}")
+        logger.error("Charge not found: %s", data.charge_id)
         raise HTTPException(status_code=404, detail="Cobrança não encontrada.")
 
-    logger.info(f"Charge found: {pix.id}, Status: {pix.status}, Value: {pix.value}")
+    logger.info("Charge found: %s, Status: %s, Value: %s", pix.id, pix.status, pix.value)
 
     # CRITICAL: One-Time Use Check
     if pix.status == PixStatus.CONFIRMED:
-        logger.warning(f"Attempt to reuse paid charge: {data.charge_id}")
+        logger.warning("Attempt to reuse paid charge: %s", data.charge_id)
         raise HTTPException(status_code=409, detail="Esta cobrança já foi paga e não pode ser utilizada novamente.")
 
     if pix.status != PixStatus.CREATED:
-        logger.error(f"Invalid charge status: {pix.status} for charge {data.charge_id}")
+        logger.error("Invalid charge status: %s for charge %s", pix.status, data.charge_id)
         raise HTTPException(status_code=400, detail=f"Status da cobrança inválido: {pix.status}")
 
     try:
@@ -1201,17 +1156,21 @@ def process_pix_receipt(
                 source=f"receber_confirmar:charge_id={pix.id}",
             )
         else:
-            logger.warning(f"Receiver user not found for charge {pix.id} (User ID: {pix.user_id})")
+            logger.warning("Receiver user not found for charge %s (User ID: %s)", pix.id, pix.user_id)
 
+        # Confirmation, balance credit and fee credit already share this one
+        # transaction. Build the response from the flushed state before the
+        # commit expires it, so the charge and its owner are not re-SELECTed.
+        db.flush()
+        response = build_pix_response(pix, db, current_user)
         db.commit()
-        db.refresh(pix)
 
-        logger.info(f"Charge {pix.id} successfully confirmed.")
-        return build_pix_response(pix, db)
+        logger.info("Charge %s successfully confirmed.", pix.id)
+        return response
 
     except Exception as e:
         db.rollback()
-        logger.error(f"Error processing receipt: {str(e)}", exc_info=True)
+        logger.error("Error processing receipt: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error processing deposit")
 
 
@@ -1238,7 +1197,7 @@ def verify_pix_charge_payment(
         raise HTTPException(status_code=404, detail="Cobrança não encontrada.")
 
     if pix.status == PixStatus.CONFIRMED:
-        return build_pix_response(pix, db)
+        return build_pix_response(pix, db, current_user)
 
     if pix.status != PixStatus.CREATED:
         raise HTTPException(status_code=400, detail=f"Status inválido: {pix.status}")
@@ -1262,9 +1221,12 @@ def verify_pix_charge_payment(
                     source=f"verificar_charge:charge_id={charge_id}",
                 )
 
+            # One transaction for confirmation and credit; the response is built from
+            # the flushed state so the commit is not followed by a re-SELECT.
+            db.flush()
+            response = build_pix_response(pix, db, current_user)
             db.commit()
-            db.refresh(pix)
-            return build_pix_response(pix, db)
+            return response
 
         # Not paid yet
         raise HTTPException(
@@ -1414,14 +1376,16 @@ def verify_static_deposit(
             },
         )
 
+    # The balance is assigned in Python by credit_pix_receipt, so it is read before
+    # the commit expires the instance instead of re-SELECTing the user afterwards.
+    balance = float(current_user.balance)
     if credited_count > 0:
         db.commit()
-        db.refresh(current_user)
 
     return {
         "credited_count": credited_count,
         "credited_total": float(credited_total),
-        "balance": float(current_user.balance),
+        "balance": balance,
     }
 
 
@@ -1637,7 +1601,7 @@ def pay_pix_qrcode(
         ).first()
         if existing:
             logger.info(f"Duplicate QR Code payment blocked: idempotency_key={x_idempotency_key}")
-            return build_pix_response(existing, db).model_dump()
+            return build_pix_response(existing, db, current_user).model_dump()
 
     # Payload-hash guard: server-side deduplication by EMV content.
     # Blocks retries regardless of what idempotency header the frontend sends.
@@ -1655,7 +1619,7 @@ def pay_pix_qrcode(
             f"Duplicate QR payment blocked by payload_hash: {_payload_hash[:16]}... "
             f"existing_tx={_existing_by_hash.id}"
         )
-        return build_pix_response(_existing_by_hash, db).model_dump()
+        return build_pix_response(_existing_by_hash, db, current_user).model_dump()
 
     sender = db.query(User).filter(User.id == current_user.id).first()
     if not sender:
@@ -1746,27 +1710,32 @@ def pay_pix_qrcode(
                 payload_hash=_payload_hash
             )
             db.add(sent_pix)
+            # Response and audit fields are read from the flushed state: after the
+            # commit every instance here would be expired and re-SELECTed one by one.
+            db.flush()
+            result_dict = build_pix_response(sent_pix, db, current_user).model_dump()
+            result_dict["receiver_name"] = receiver.name
+            audit_user = str(current_user.id)
+            audit_details = {
+                "charge_id": internal_charge.id,
+                "value": float(charge_value),
+                "maintenance_fee": float(_maint_dec),
+                "total_debit": float(_total_debit),
+                "receiver_id": str(receiver.id)
+            }
             db.commit()
-            db.refresh(sent_pix)
             audit_log(
                 action="PIX_QRCODE_INTERNAL_PAYMENT",
-                user=str(current_user.id),
-                resource=f"charge_id={internal_charge.id}",
-                details={
-                    "charge_id": internal_charge.id,
-                    "value": float(charge_value),
-                    "maintenance_fee": float(_maint_dec),
-                    "total_debit": float(_total_debit),
-                    "receiver_id": str(receiver.id)
-                }
+                user=audit_user,
+                resource=f"charge_id={audit_details['charge_id']}",
+                details=audit_details
             )
-            result_dict = build_pix_response(sent_pix, db).model_dump()
-            result_dict["receiver_name"] = receiver.name
             return result_dict
         else:
+            db.flush()
+            result_dict = build_pix_response(internal_charge, db, current_user).model_dump()
             db.commit()
-            db.refresh(internal_charge)
-            return build_pix_response(internal_charge, db).model_dump()
+            return result_dict
 
     # -------------------------------------------------------------------------
     # Routing 2: no internal charge found — dispatch to Asaas.
@@ -2115,7 +2084,7 @@ def pay_pix_qrcode(
             "TRANSFER_DONE webhook will confirm when SPI settles."
         )
 
-    result_dict = build_pix_response(pix, db).model_dump()
+    result_dict = build_pix_response(pix, db, current_user).model_dump()
     if result.get("receiver_name"):
         result_dict["receiver_name"] = result["receiver_name"]
     if _payment_warning:
@@ -3051,90 +3020,130 @@ def remove_email_pix_key(
     }
 
 
-def build_pix_response(pix: Any, db: Session) -> PixResponse:
+def build_pix_response(pix: Any, db: Session, current_user: Optional[User] = None) -> PixResponse:
     """
     Constructs a PixResponse with enriched data (names, masked docs, formatted time).
     """
-    # 2. Identify Sender and Receiver
-    # Default values
-    sender_name = "Unknown"
-    sender_doc = "***"
-    receiver_name = "Unknown"
-    receiver_doc = "***"
-
-    # Fetch the owner of this transaction record
-    owner_user = db.query(User).filter(User.id == pix.user_id).first()
-
-    if pix.type == TransactionType.SENT:
-        # The owner is the sender
-        if owner_user:
-            sender_name = owner_user.name
-            sender_doc = mask_cpf_cnpj(owner_user.cpf_cnpj)
-
-        # Try to find the receiver via correlation_id (Internal Transfer)
-        # Look for a RECEIVED transaction with same correlation_id
-        receiver_tx = db.query(PixTransaction).filter(
-            PixTransaction.correlation_id == pix.correlation_id,
-            PixTransaction.type == TransactionType.RECEIVED
-        ).first()
+    return build_pix_responses([pix], db, current_user)[0]
 
-        if receiver_tx:
-            receiver_user = db.query(User).filter(User.id == receiver_tx.user_id).first()
-            if receiver_user:
-                receiver_name = receiver_user.name
-                receiver_doc = mask_cpf_cnpj(receiver_user.cpf_cnpj)
-        else:
-            # External or not found — use stored recipient name when available
-            receiver_name = pix.recipient_name or "Destinatario externo"
-            receiver_doc = mask_cpf_cnpj(pix.pix_key)  # Best effort
-
-    elif pix.type == TransactionType.RECEIVED:
-        # The owner is the receiver
-        if owner_user:
-            receiver_name = owner_user.name
-            receiver_doc = mask_cpf_cnpj(owner_user.cpf_cnpj)
-
-        # Try to find the sender via correlation_id (Internal Transfer)
-        # Look for an SENT transaction with same correlation_id
-        sender_tx = db.query(PixTransaction).filter(
-            PixTransaction.correlation_id == pix.correlation_id,
-            PixTransaction.type == TransactionType.SENT
-        ).first()
 
-        if sender_tx:
-            sender_user = db.query(User).filter(User.id == sender_tx.user_id).first()
-            if sender_user:
-                sender_name = sender_user.name
-                sender_doc = mask_cpf_cnpj(sender_user.cpf_cnpj)
-        else:
-            # Deposito ou externo
-            if "SIMULACAO" in pix.pix_key or "Deposit" in (pix.description or ""):
-                sender_name = "Deposito via QR Code"
-                sender_doc = "Instituicao Financeira"
+def build_pix_responses(
+    pixes: List[Any], db: Session, current_user: Optional[User] = None
+) -> List[PixResponse]:
+    """
+    Bulk variant of build_pix_response: the counterpart transactions and every
+    user involved are fetched with one IN query each, however many records are
+    rendered. current_user, the already-loaded requester, is never re-fetched.
+    """
+    # Every field comes from a persisted ORM row and is coerced by
+    # build_pix_response_fields, so the models are built without validation.
+    return [
+        PixResponse.model_construct(**fields)
+        for fields in build_pix_response_fields(pixes, db, current_user)
+    ]
+
+
+def build_pix_response_fields(
+    pixes: List[Any], db: Session, current_user: Optional[User] = None
+) -> List[Dict[str, Any]]:
+    """
+    The PixResponse fields of each record as a plain dict, already JSON-ready
+    (float money, PixStatus status), for callers that encode them directly.
+    """
+    if not pixes:
+        return []
+
+    # 1. Counterpart of an internal transfer: the opposite-type record sharing the
+    # correlation_id. Records without one are never paired.
+    correlation_ids = {pix.correlation_id for pix in pixes if pix.correlation_id}
+    counterparts: Dict[Tuple[str, Any], Any] = {}
+    if correlation_ids:
+        for tx in db.query(PixTransaction).filter(
+            PixTransaction.correlation_id.in_(correlation_ids)
+        ).all():
+            counterparts.setdefault((tx.correlation_id, tx.type), tx)
+
+    # 2. Owners and counterpart owners in one query, each masked once per batch.
+    # The requester is usually the owner of every record and is already loaded.
+    user_ids = {pix.user_id for pix in pixes} | {tx.user_id for tx in counterparts.values()}
+    users = []
+    if current_user is not None and current_user.id in user_ids:
+        users.append(current_user)
+        user_ids.discard(current_user.id)
+    if user_ids:
+        users.extend(db.query(User).filter(User.id.in_(user_ids)).all())
+    parties = {user.id: (user.name, mask_cpf_cnpj(user.cpf_cnpj)) for user in users}
+
+    # 3. Build responses in memory
+    responses = []
+    for pix in pixes:
+        # Default values
+        sender_name = "Unknown"
+        sender_doc = "***"
+        receiver_name = "Unknown"
+        receiver_doc = "***"
+
+        owner = parties.get(pix.user_id)
+
+        if pix.type == _TYPE_SENT:
+            # The owner is the sender
+            if owner:
+                sender_name, sender_doc = owner
+
+            # The receiver is the RECEIVED record of an internal transfer
+            receiver_tx = counterparts.get((pix.correlation_id, _TYPE_RECEIVED))
+            if receiver_tx:
+                receiver = parties.get(receiver_tx.user_id)
+                if receiver:
+                    receiver_name, receiver_doc = receiver
             else:
-                sender_name = pix.recipient_name or "Pagador externo"
-                sender_doc = "***"
-
-    return PixResponse(
-        id=pix.id,
-        value=pix.value,
-        pix_key=pix.pix_key,
-        key_type=pix.key_type,
-        type=pix.type,
-        status=pix.status,
-        description=pix.description,
-        scheduled_date=pix.scheduled_date,
-        created_at=pix.created_at,
-        updated_at=pix.updated_at,
-        formatted_time=format_brasilia_time(pix.created_at),
-        sender_name=sender_name,
-        sender_doc=sender_doc,
-        receiver_name=receiver_name,
-        receiver_doc=receiver_doc,
-        correlation_id=pix.correlation_id,
-        fee_amount=pix.fee_amount if pix.fee_amount is not None else 0.0,
-        fee_description=fee_display(Decimal(str(pix.fee_amount or 0))),
-    )
+                # External or not found — use stored recipient name when available
+                receiver_name = pix.recipient_name or "Destinatario externo"
+                receiver_doc = mask_cpf_cnpj(pix.pix_key)  # Best effort
+
+        elif pix.type == _TYPE_RECEIVED:
+            # The owner is the receiver
+            if owner:
+                receiver_name, receiver_doc = owner
+
+            # The sender is the SENT record of an internal transfer
+            sender_tx = counterparts.get((pix.correlation_id, _TYPE_SENT))
+            if sender_tx:
+                sender = parties.get(sender_tx.user_id)
+                if sender:
+                    sender_name, sender_doc = sender
+            else:
+                # Deposito ou externo
+                if "SIMULACAO" in pix.pix_key or "Deposit" in (pix.description or ""):
+                    sender_name = "Deposito via QR Code"
+                    sender_doc = "Instituicao Financeira"
+                else:
+                    sender_name = pix.recipient_name or "Pagador externo"
+                    sender_doc = "***"
+
+        # In PixResponse field order. Decimal money and status stored as text are the
+        # only fields needing coercion.
+        responses.append(dict(
+            id=pix.id,
+            value=float(pix.value),
+            pix_key=pix.pix_key,
+            key_type=pix.key_type,
+            type=pix.type,
+            status=PixStatus(pix.status),
+            description=pix.description,
+            scheduled_date=pix.scheduled_date,
+            created_at=pix.created_at,
+            updated_at=pix.updated_at,
+            sender_name=sender_name,
+            sender_doc=sender_doc,
+            receiver_name=receiver_name,
+            receiver_doc=receiver_doc,
+            formatted_time=format_brasilia_time(pix.created_at),
+            correlation_id=pix.correlation_id,
+            fee_amount=float(pix.fee_amount) if pix.fee_amount is not None else 0.0,
+            fee_description=fee_display(Decimal(str(pix.fee_amount or 0))),
+        ))
+    return responses
 
 
 # ============================================================================
@@ -3307,7 +3316,7 @@ def sync_pix_charge_status_endpoint(
         if pix.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Unauthorized")
 
-        return build_pix_response(pix, db)
+        return build_pix_response(pix, db, current_user)
 
     except HTTPException:
         raise
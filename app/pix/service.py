@@ -142,10 +142,12 @@ def deposit_funds(
         raise ValueError(f"User {user_id} not found")
 
     previous_balance = Decimal(str(user.balance))
-    user.balance = previous_balance + Decimal(str(amount))
+    # Quantized here the way the NUMERIC(15, 2) column stores it, so the value
+    # reported below is the committed one without re-reading the row.
+    new_balance = (previous_balance + Decimal(str(amount))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    user.balance = new_balance
     db.add(user)
     db.commit()
-    db.refresh(user)
 
     audit_log(
         action="deposit_funds",
@@ -154,7 +156,7 @@ def deposit_funds(
         details={
             "amount": amount,
             "previous_balance": float(previous_balance),
-            "new_balance": float(user.balance),
+            "new_balance": float(new_balance),
             "description": description,
             "correlation_id": correlation_id,
         },
@@ -162,14 +164,14 @@ def deposit_funds(
 
     logger.info(
         f"Deposit: user={user_id} amount={amount:.2f} "
-        f"prev={float(previous_balance):.2f} new={float(user.balance):.2f}"
+        f"prev={float(previous_balance):.2f} new={float(new_balance):.2f}"
     )
 
     return {
         "user_id": user_id,
         "amount": amount,
         "previous_balance": float(previous_balance),
-        "new_balance": float(user.balance),
+        "new_balance": float(new_balance),
         "description": description,
         "timestamp": datetime.now(timezone.utc),
     }
@@ -311,6 +313,8 @@ def credit_pix_receipt(
     raw_increase = Decimal(str(gross_value)) * Decimal("0.50")
     capped_limit = min(current_limit + raw_increase, CREDIT_LIMIT_CAP)
     receiver.credit_limit = capped_limit.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    # First confirmed inbound PIX activates the account (see require_active_account).
+    receiver.is_active_account = True
 
     db.add(receiver)
 
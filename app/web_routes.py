@@ -1,5 +1,4 @@
 ﻿from fastapi import APIRouter, Request, Depends, HTTPException, Query
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -51,7 +50,7 @@ from app.core.pix_emv import build_pix_static_emv_no_amount as _build_deposit_em
 _FALLBACK_DEPOSIT_KEY = "1a923d7b-3230-46d4-a670-87bf7ee54817"
 _DEPOSIT_WALLET_KEY: str = settings.PLATFORM_PIX_KEY or _FALLBACK_DEPOSIT_KEY
 
-# Locally generated QR (fallback): EMV built per BACEN BR Code spec, rendered via qrserver.com.
+# Locally generated QR (fallback): EMV built per BACEN BR Code spec, rendered by build_qr_url.
 _DEPOSIT_QR_URL_LOCAL = _build_qr_url(_build_deposit_emv(_DEPOSIT_WALLET_KEY))
 
 
@@ -91,19 +90,14 @@ def _fetch_asaas_deposit_qr() -> Optional[str]:
 
 
 # At startup, prefer the official Asaas QR image (BACEN-registered, accepted by all PSPs).
-# Falls back to locally-generated qrserver.com URL when Asaas is unreachable.
+# Falls back to the locally-generated QR when Asaas is unreachable.
 _DEPOSIT_QR_URL: str = _fetch_asaas_deposit_qr() or _DEPOSIT_QR_URL_LOCAL
 from app.pix.schemas import PixKeyType
 from app.pix.models import PixTransaction, TransactionType
 from app.boleto.models import BoletoTransaction
 from app.cards.models import CreditCard
 from decimal import Decimal as _Decimal
-import os
-
-# Setup templates directory
-# Using absolute path to ensure it works regardless of where python is run
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+from app.core.templates import templates
 
 router = APIRouter()
 
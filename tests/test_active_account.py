@@ -0,0 +1,74 @@
+"""
+Tests for the require_active_account gate.
+
+Covers:
+- Cached is_active_account flag short-circuits the deposit lookup
+- First confirmed inbound PIX backfills the flag
+- Accounts without a deposit are rejected with 403
+"""
+import pytest
+from decimal import Decimal
+from uuid import uuid4
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+
+from app.auth.dependencies import require_active_account
+from app.auth.models import User
+from app.pix.models import PixTransaction, PixStatus, TransactionType
+
+
+def _make_user(db, **overrides) -> User:
+    user = User(
+        id=str(uuid4()),
+        name="Conta Ativa",
+        cpf_cnpj=str(uuid4().int)[:11],
+        email=f"{uuid4().hex[:8]}@example.com",
+        hashed_password="x",
+        **overrides,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_flagged_account_skips_deposit_lookup():
+    """A user already flagged active never touches the database."""
+    user = MagicMock(is_active_account=True)
+    db = MagicMock()
+
+    assert require_active_account(user=user, db=db) is user
+    db.query.assert_not_called()
+
+
+def test_confirmed_deposit_backfills_flag(db):
+    """Unflagged user with a confirmed inbound PIX is allowed and flagged."""
+    user = _make_user(db)
+    db.add(PixTransaction(
+        id=str(uuid4()),
+        value=Decimal("10.00"),
+        pix_key="chave",
+        key_type="ALEATORIA",
+        type=TransactionType.RECEIVED,
+        status=PixStatus.CONFIRMED,
+        user_id=user.id,
+        idempotency_key=str(uuid4()),
+    ))
+    db.commit()
+
+    assert require_active_account(user=user, db=db) is user
+    # Persisted on its own connection; the request session has nothing pending.
+    assert user.is_active_account is True
+    assert not db.dirty
+    db.refresh(user)
+    assert user.is_active_account is True
+
+
+def test_account_without_deposit_rejected(db):
+    """Unflagged user without any confirmed inbound PIX gets 403."""
+    user = _make_user(db)
+
+    with pytest.raises(HTTPException) as exc:
+        require_active_account(user=user, db=db)
+
+    assert exc.value.status_code == 403
+    assert user.is_active_account is False
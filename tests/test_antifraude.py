@@ -32,8 +32,8 @@ def test_risk_analysis_scenarios(value: float, time: str, attempts: int, expecte
 
     result = engine.analyze(transaction)
 
-    assert result["approved"] is expected_approved
-    assert result["risk_level"] == expected_risk
+    assert result.approved is expected_approved
+    assert result.risk_level == expected_risk
 
 
 @pytest.mark.parametrize("time, expected", [
@@ -114,8 +114,8 @@ def test_accumulated_score():
     result = engine.analyze(transaction)
 
     # Score should be 70 (30 + 40)
-    assert result["score"] == 70
-    assert len(result["triggered_rules"]) == 2
+    assert result.score == 70
+    assert len(result.triggered_rules) == 2
 
 
 def test_invalid_time_validation():
@@ -142,5 +142,252 @@ def test_multiple_rules_activated():
 
     result = engine.analyze(transaction)
 
-    assert len(result["triggered_rules"]) == 3
-    assert result["score"] == 100  # Capped at 100
+    assert len(result.triggered_rules) == 3
+    assert result.score == 100  # Capped at 100
+
+
+def test_batch_endpoint_preserves_order_and_caps_size():
+    """Batch scoring returns one result per input, in order, and rejects oversized batches."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.antifraude.router import router, MAX_BATCH_SIZE
+
+    app = FastAPI()
+    app.include_router(router, prefix="/antifraud")
+    client = TestClient(app)
+
+    payload = [
+        {"value": 50.0, "time": "14:30", "attempts_last_24h": 1},
+        {"value": 1500.0, "time": "23:00", "attempts_last_24h": 5},
+    ]
+    response = client.post("/antifraud/analyze/batch", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["risk_level"] for item in body] == ["LOW", "HIGH"]
+    assert [item["approved"] for item in body] == [True, False]
+
+    oversized = [payload[0]] * (MAX_BATCH_SIZE + 1)
+    response = client.post("/antifraud/analyze/batch", json=oversized)
+    assert response.status_code == 422
+
+
+def test_score_cache_reuses_repeated_inputs():
+    """Repeated (value, hour, attempts) inputs hit the memoized scorer with identical results."""
+    engine = AntifraudEngine()
+    engine.clear_cache()
+
+    transaction = AntifraudTransaction(value=25000.0, time="23:10", attempts_last_24h=1, origin=None)
+    first = engine.analyze(transaction)
+    # A different extreme value shares the saturated cache key.
+    second = engine.analyze(
+        AntifraudTransaction(value=90000.0, time="23:45", attempts_last_24h=1, origin=None)
+    )
+
+    assert first == second
+    assert engine.cache_info()["hits"] == 1
+
+    engine.clear_cache()
+    assert engine.cache_info()["size"] == 0
+
+
+def test_portuguese_payload_accepted_on_legacy_route():
+    """Legacy /antifraude/analisar accepts Portuguese field names and reuses the same engine."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.antifraude.router import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/antifraude")
+    client = TestClient(app)
+
+    response = client.post(
+        "/antifraude/analisar",
+        json={"valor": 500, "horario": "23:30", "tentativas_ultimas_24h": 5},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["score"] == 100
+    assert client.get("/antifraude/regras").json()["total_rules"] == 4
+
+
+def test_analyze_async_gathers_external_rules():
+    """External rules are awaited concurrently and add their points to the built-in score."""
+    import asyncio
+    from app.antifraude.rules import AntifraudRule
+
+    class SlowLookupRule(AntifraudRule):
+        def __init__(self, name: str, hit: bool):
+            super().__init__(name=name, points=25, description="Remote lookup flagged origin")
+            self.hit = hit
+
+        async def evaluate_async(self, transaction):
+            await asyncio.sleep(0.05)
+            return self.hit
+
+    engine = AntifraudEngine()
+    transaction = AntifraudTransaction(value=350.0, time="14:00", attempts_last_24h=1, origin=None)
+    assert asyncio.run(engine.analyze_async(transaction)) == engine.analyze(transaction)
+
+    engine.external_rules = [SlowLookupRule("BLOCKLIST", True), SlowLookupRule("DEVICE", False)]
+    result = asyncio.run(engine.analyze_async(transaction))
+
+    assert result.score == 55
+    assert result.risk_level == "MEDIUM"
+    assert result.triggered_rules[-1] == "BLOCKLIST: Remote lookup flagged origin"
+    assert len(result.triggered_rules) == 2
+
+
+def test_backtest_endpoint_matches_engine_scores():
+    """Admin CSV backtest scores rows with the vectorized scorer and honours approval_limit."""
+    pytest.importorskip("numpy")
+    from types import SimpleNamespace
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.antifraude.router import router
+    from app.auth.dependencies import require_admin
+
+    app = FastAPI()
+    app.include_router(router, prefix="/antifraud")
+    app.dependency_overrides[require_admin] = lambda: SimpleNamespace(id="admin-1")
+    client = TestClient(app)
+
+    csv_body = (
+        "value,time,attempts_last_24h,account_age_days,total_transactions_30d\n"
+        "50,14:30,1,0,0\n"          # 0
+        "350,14:00,1,0,0\n"         # 30
+        "1500,23:00,5,0,0\n"        # 120 -> 100
+        "1500,23:00,1,200,40\n"     # 40 (mature profile lifts HIGH_VALUE)
+    )
+    response = client.post(
+        "/antifraud/admin/backtest",
+        files={"file": ("history.csv", csv_body, "text/csv")},
+        params={"approval_limit": 35},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rows"] == 4
+    assert body["approved"] == 2
+    assert body["risk_levels"] == {"LOW": 1, "MEDIUM": 2, "HIGH": 1}
+
+    missing = client.post(
+        "/antifraud/admin/backtest",
+        files={"file": ("history.csv", "value,time\n10,10:00\n", "text/csv")},
+    )
+    assert missing.status_code == 422
+
+    for bad_rows in ("10,25:00,1\n", "10\n", "10,,1\n", "abc,10:00,1\n"):
+        invalid = client.post(
+            "/antifraud/admin/backtest",
+            files={"file": ("history.csv", "value,time,attempts_last_24h\n50,14:30,1\n" + bad_rows, "text/csv")},
+        )
+        assert invalid.status_code == 400
+        assert invalid.json()["detail"].startswith("Invalid CSV row 3:")
+
+
+def test_analyze_async_skips_external_rules_at_score_cap():
+    """A capped built-in score short-circuits external rules unless exhaustive=True."""
+    import asyncio
+    from app.antifraude.rules import AntifraudRule
+
+    calls = []
+
+    class RecordingRule(AntifraudRule):
+        def __init__(self):
+            super().__init__(name="REMOTE", points=10, description="Remote check")
+
+        async def evaluate_async(self, transaction):
+            calls.append(transaction)
+            return True
+
+    engine = AntifraudEngine()
+    engine.external_rules = [RecordingRule()]
+    transaction = AntifraudTransaction(value=1500.0, time="23:00", attempts_last_24h=5, origin=None)
+
+    result = asyncio.run(engine.analyze_async(transaction))
+    assert result.score == 100
+    assert calls == []
+
+    audited = asyncio.run(engine.analyze_async(transaction, exhaustive=True))
+    assert audited.score == 100
+    assert audited.triggered_rules[-1] == "REMOTE: Remote check"
+    assert len(calls) == 1
+
+
+def test_approval_limit_change_rebuilds_decision_table():
+    """Decisions come from a per-score table that follows approval_limit updates."""
+    engine = AntifraudEngine()
+    transaction = AntifraudTransaction(value=350.0, time="23:00", attempts_last_24h=1, origin=None)
+
+    assert engine.analyze(transaction).approved is True  # 70 < 80
+
+    engine.approval_limit = 60
+    result = engine.analyze(transaction)
+    assert result.approved is False
+    assert result.reason == "Transaction rejected - high risk detected"
+
+
+def test_rules_snapshot_is_reused_until_limit_changes():
+    """/rules metadata is built once and refreshed only by an approval_limit update."""
+    engine = AntifraudEngine()
+    snapshot = engine.rules_snapshot
+
+    assert isinstance(engine.rules, tuple)
+    assert engine.rules_snapshot is snapshot
+    assert snapshot["total_rules"] == 4
+    assert [rule["name"] for rule in snapshot["rules"]] == [rule.name for rule in engine.rules]
+
+    engine.approval_limit = 70
+    assert engine.rules_snapshot["approval_limit"] == 70
+
+
+def test_summary_log_names_triggered_rules_only_when_info_enabled(caplog):
+    import logging
+    from app.antifraude import rules as rules_module
+
+    engine = AntifraudEngine()
+    transaction = AntifraudTransaction(value=1500.0, time="23:00", attempts_last_24h=5, origin=None)
+
+    with caplog.at_level(logging.INFO, logger=rules_module.logger.name):
+        engine.analyze(transaction)
+    summary = [r.getMessage() for r in caplog.records if "Anti-fraud analysis completed" in r.getMessage()]
+    assert summary and "NIGHT_TIME" in summary[-1] and "EXCESSIVE_ATTEMPTS" in summary[-1]
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger=rules_module.logger.name):
+        engine.analyze(transaction)
+    assert not [r for r in caplog.records if "Anti-fraud analysis completed" in r.getMessage()]
+
+
+def test_batch_endpoint_applies_external_rules_like_single_analysis():
+    """/analyze/batch scores each transaction exactly as /analyze does, external rules included."""
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.antifraude.router import router
+    from app.antifraude.rules import AntifraudRule, antifraud_engine
+
+    class BlocklistRule(AntifraudRule):
+        async def evaluate_async(self, transaction):
+            await asyncio.sleep(0)
+            return transaction.value > 100
+
+    app = FastAPI()
+    app.include_router(router, prefix="/antifraud")
+    client = TestClient(app)
+    payload = [
+        {"value": 50.0, "time": "14:30", "attempts_last_24h": 1},
+        {"value": 350.0, "time": "14:00", "attempts_last_24h": 1},
+    ]
+
+    saved_rules = antifraud_engine.external_rules
+    antifraud_engine.external_rules = [BlocklistRule("BLOCKLIST", 25, "Remote lookup flagged origin")]
+    try:
+        batch = client.post("/antifraud/analyze/batch", json=payload).json()
+        single = [client.post("/antifraud/analyze", json=item).json() for item in payload]
+    finally:
+        antifraud_engine.external_rules = saved_rules
+
+    assert batch == single
+    assert [result["score"] for result in batch] == [0, 55]
@@ -160,6 +160,27 @@ class TestAccessTokenValidation:
         # Should fall through to 401 (refresh token type check blocks it)
         assert resp.status_code == 401
 
+    def test_repeat_access_token_skips_signature_verification(self, client, active_user):
+        from app.auth import dependencies
+        cookie = _make_access_cookie(active_user.cpf_cnpj, timedelta(minutes=15))
+        # Tokens minted in the same second are byte-identical; start from a cold cache.
+        dependencies.forget_access_token(cookie)
+        with patch.object(dependencies.jwt, "decode", wraps=dependencies.jwt.decode) as decode:
+            for _ in range(3):
+                resp = client.get("/protected", cookies={"access_token": cookie})
+                assert resp.status_code == 200
+        assert decode.call_count == 1
+
+    def test_cached_token_not_honoured_after_exp(self, active_user):
+        from app.auth import dependencies
+        cookie = _make_access_cookie(active_user.cpf_cnpj, timedelta(minutes=15))
+        payload = dependencies._decode_access_token(cookie)
+        assert payload["sub"] == active_user.cpf_cnpj
+
+        dependencies._token_cache[dependencies._token_key(cookie)] = (payload, 0.0)
+        assert dependencies._decode_access_token(cookie) is None
+        dependencies.forget_access_token(cookie)
+
 
 class TestSilentRefreshRotation:
     def test_expired_access_valid_refresh_grants_access(self, client, active_user):
@@ -260,3 +281,21 @@ class TestSilentRefreshRotation:
             },
         )
         assert resp.status_code == 401
+
+
+class TestSessionCookies:
+    def test_cookies_already_held_by_client_are_not_resent(self):
+        from starlette.responses import Response as _Response
+        from app.auth.dependencies import set_session_cookies
+
+        request = MagicMock()
+        request.cookies = {"access_token": "Bearer tok-a", "refresh_token": "tok-r"}
+
+        unchanged = _Response()
+        set_session_cookies(unchanged, "tok-a", "tok-r", request)
+        assert unchanged.headers.getlist("set-cookie") == []
+
+        rotated = _Response()
+        set_session_cookies(rotated, "tok-a2", "tok-r", request)
+        cookies = rotated.headers.getlist("set-cookie")
+        assert len(cookies) == 1 and cookies[0].startswith('access_token="Bearer tok-a2"')
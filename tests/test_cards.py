@@ -88,3 +88,12 @@ def test_list_cards(auth_token):
     assert response.status_code == 200
     data = response.json()
     assert len(data) >= 2
+
+
+def test_generated_card_number_and_cvv_format():
+    from app.cards.service import generate_card_credentials
+
+    for _ in range(200):
+        number, cvv = generate_card_credentials()
+        assert len(number) == 16 and number.isdigit() and number[0] == "4"
+        assert len(cvv) == 3 and cvv.isdigit()
@@ -96,3 +96,30 @@ def test_card_lifecycle(auth_token):
     response = client.get("/cards/", cookies=cookies)
     cards = response.json()
     assert len([c for c in cards if c["id"] == card_id]) == 0
+
+
+def test_get_card_filters_owner_and_expiry(auth_token):
+    from datetime import datetime, timedelta
+    from app.cards.models import CreditCard, CardType
+    from app.cards.service import get_card
+
+    db = TestingSessionLocal()
+    owner = db.query(User).filter(User.cpf_cnpj == "99988877766").first()
+
+    def _card(card_id, expires_at):
+        db.add(CreditCard(
+            id=card_id, user_id=owner.id, card_number="4" + "0" * 15, cvv="000",
+            expiration_date="01/30", card_holder_name="CARD USER",
+            type=CardType.VIRTUAL_TEMP, expires_at=expires_at,
+        ))
+
+    # Naive timestamps, as the DateTime column stores them.
+    _card("card-live", datetime.utcnow() + timedelta(hours=1))
+    _card("card-expired", datetime.utcnow() - timedelta(hours=1))
+    db.commit()
+
+    assert get_card(db, "card-live", owner.id).id == "card-live"
+    assert get_card(db, "card-live", "someone-else") is None
+    assert get_card(db, "card-expired", owner.id) is None
+    assert get_card(db, "missing", owner.id) is None
+    db.close()
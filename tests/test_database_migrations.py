@@ -0,0 +1,134 @@
+"""
+Tests for the engine configuration and idempotent startup migrations in app.core.database.
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import _apply_column_migrations
+
+
+def test_column_migrations_add_unique_user_indexes():
+    """Legacy users tables without unique cpf_cnpj/email indexes get them at startup."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id VARCHAR(36) PRIMARY KEY, cpf_cnpj VARCHAR(20), email VARCHAR(100))"
+        ))
+        conn.commit()
+
+    _apply_column_migrations(engine)
+    _apply_column_migrations(engine)  # idempotent
+
+    unique = {
+        tuple(ix["column_names"]) for ix in inspect(engine).get_indexes("users") if ix["unique"]
+    }
+    assert {("cpf_cnpj",), ("email",)} <= unique
+    engine.dispose()
+
+
+def test_column_migrations_add_card_listing_index():
+    """Existing credit_cards tables get the (user_id, expires_at) index once."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE credit_cards (id VARCHAR PRIMARY KEY, user_id VARCHAR, expires_at DATETIME)"
+        ))
+        conn.commit()
+
+    _apply_column_migrations(engine)
+    _apply_column_migrations(engine)  # idempotent
+
+    indexes = {ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("credit_cards")}
+    assert indexes["ix_cards_user_active"] == ["user_id", "expires_at"]
+    engine.dispose()
+
+
+def test_column_migrations_replace_pix_single_column_indexes():
+    """Existing transacoes_pix tables get the composite indexes and lose the single-column ones they supersede."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE transacoes_pix (id VARCHAR(36) PRIMARY KEY, user_id VARCHAR(36), "
+            "status VARCHAR(20), tipo VARCHAR(20), correlation_id VARCHAR(100), criado_em DATETIME, nome_destinatario VARCHAR(200), taxa_valor FLOAT, "
+            "copy_paste_code VARCHAR(2000), link_expires_at TIMESTAMP)"
+        ))
+        conn.execute(text("CREATE INDEX ix_transacoes_pix_user_id ON transacoes_pix (user_id)"))
+        conn.execute(text("CREATE INDEX ix_transacoes_pix_status ON transacoes_pix (status)"))
+        conn.execute(text("CREATE INDEX ix_transacoes_pix_correlation_id ON transacoes_pix (correlation_id)"))
+        conn.commit()
+
+    _apply_column_migrations(engine)
+    _apply_column_migrations(engine)  # idempotent
+
+    indexes = {ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("transacoes_pix")}
+    assert indexes == {
+        "ix_pix_user_created": ["user_id", "criado_em"],
+        "ix_pix_user_status_created": ["user_id", "status", "criado_em"],
+        "ix_pix_corr_tipo": ["correlation_id", "tipo"],
+    }
+    engine.dispose()
+
+
+def test_column_migrations_keep_single_column_index_when_replacement_fails():
+    """A superseded index is only dropped once the composite replacing it was built."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        # No tipo column: ix_pix_corr_tipo cannot be created.
+        conn.execute(text(
+            "CREATE TABLE transacoes_pix (id VARCHAR(36) PRIMARY KEY, user_id VARCHAR(36), "
+            "status VARCHAR(20), correlation_id VARCHAR(100), criado_em DATETIME, nome_destinatario VARCHAR(200), taxa_valor FLOAT, "
+            "copy_paste_code VARCHAR(2000), link_expires_at TIMESTAMP)"
+        ))
+        conn.execute(text("CREATE INDEX ix_transacoes_pix_user_id ON transacoes_pix (user_id)"))
+        conn.execute(text("CREATE INDEX ix_transacoes_pix_correlation_id ON transacoes_pix (correlation_id)"))
+        conn.commit()
+
+    _apply_column_migrations(engine)
+
+    indexes = {ix["name"] for ix in inspect(engine).get_indexes("transacoes_pix")}
+    assert indexes == {"ix_pix_user_created", "ix_pix_user_status_created", "ix_transacoes_pix_correlation_id"}
+    engine.dispose()
+
+
+def test_column_migrations_add_simulation_created_index():
+    """Existing simulacoes_parcelamento tables get the criado_em index once."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE simulacoes_parcelamento (id INTEGER PRIMARY KEY, criado_em DATETIME)"
+        ))
+        conn.commit()
+
+    _apply_column_migrations(engine)
+    _apply_column_migrations(engine)  # idempotent
+
+    indexes = {
+        ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("simulacoes_parcelamento")
+    }
+    assert indexes["ix_simulacoes_criado_em"] == ["criado_em"]
+    engine.dispose()
+
+
+def test_engine_kwargs_use_lifo_pool_with_provider_recycle():
+    from app.core.database import _build_engine_kwargs
+
+    neon = _build_engine_kwargs("postgresql://u:p@ep-x.us-east-2.aws.neon.tech/db")
+    plain = _build_engine_kwargs("postgresql://u:p@db.internal:5432/db")
+    sqlite = _build_engine_kwargs("sqlite:///./local.db")
+
+    assert neon["pool_use_lifo"] and plain["pool_use_lifo"]
+    assert neon["pool_recycle"] == 300
+    assert plain["pool_recycle"] == 1800
+    assert neon["connect_args"] == {"sslmode": "require"}
+    assert "pool_size" not in sqlite
+
+
+def test_sqlite_connections_get_tuning_pragmas():
+    import pytest
+    from app.core.database import engine
+
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite-only connection tuning")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
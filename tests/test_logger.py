@@ -0,0 +1,37 @@
+"""
+Unit tests for the correlation-aware logger adapter.
+"""
+import logging
+
+from app.core.logger import get_logger_with_correlation, logger
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_adapter_propagates_bound_correlation_id():
+    capture = _Capture()
+    logger.addHandler(capture)
+    try:
+        adapter = get_logger_with_correlation("abc123")
+        adapter.info("first")
+        adapter.info("second", extra={"step": "post"})
+        adapter.info("third", extra={"correlation_id": "override"})
+    finally:
+        logger.removeHandler(capture)
+
+    assert [r.correlation_id for r in capture.records] == ["abc123", "abc123", "override"]
+    assert capture.records[1].step == "post"
+
+
+def test_adapter_does_not_add_handlers():
+    before = list(logger.handlers)
+    for i in range(100):
+        get_logger_with_correlation(str(i))
+    assert logger.handlers == before
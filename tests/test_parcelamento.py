@@ -98,3 +98,200 @@ def test_decreasing_balance():
 
     for i in range(len(result["table"]) - 1):
         assert result["table"][i]["balance"] > result["table"][i + 1]["balance"]
+
+
+def test_long_high_rate_schedule_amortizes_fully():
+    """Principal is repaid even when (1+i)^n is far beyond float precision."""
+    data = SimulationRequest(value=1000.0, installments=360, monthly_rate=0.15)
+
+    result = calculate_installments(data)
+    table = result["table"]
+
+    assert table[-1]["balance"] == 0.0
+    assert abs(sum(row["principal"] for row in table) - 1000.0) < 0.5
+    assert all(row["principal"] >= 0 and row["interest"] >= 0 for row in table)
+
+
+def test_tiny_rate_converges_to_straight_division():
+    """As the rate approaches zero the installment approaches value / n without cancellation."""
+    data = SimulationRequest(value=1200.0, installments=12, monthly_rate=1e-15)
+
+    result = calculate_installments(data)
+
+    assert result["installment"] == 100.0
+    assert all(row["principal"] == 100.0 for row in result["table"])
+
+
+def test_amortization_table_persists_as_json():
+    """The schedule round-trips through columnar JSON, and legacy row-list TEXT still reads."""
+    import json
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.parcelamento.models import InstallmentSimulation
+    from app.parcelamento.service import save_simulation, unpack_schedule
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine, tables=[InstallmentSimulation.__table__])
+    db = sessionmaker(bind=engine)()
+
+    data = SimulationRequest(value=1200.0, installments=3, monthly_rate=0.02)
+    result = calculate_installments(data)
+    simulation = save_simulation(db, data, result, correlation_id="corr-1")
+    db.expire_all()
+
+    stored = db.get(InstallmentSimulation, simulation.id)
+    assert set(stored.amortization_table) == {"interest", "principal", "balance"}
+    assert unpack_schedule(stored) == result["table"]
+
+    # Rows written before the column change hold json.dumps output as text.
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE simulacoes_parcelamento SET tabela_amortizacao = :legacy WHERE id = :id"
+        ), {"legacy": json.dumps(result["table"]), "id": simulation.id})
+    db.expire_all()
+
+    legacy = db.get(InstallmentSimulation, simulation.id)
+    assert legacy.amortization_table == result["table"]
+    assert unpack_schedule(legacy) == result["table"]
+    db.close()
+    engine.dispose()
+
+
+def test_app_engine_round_trips_schedule_through_orjson():
+    """The application engine encodes and decodes JSON columns with orjson."""
+    import orjson
+    from app.core.database import engine, _json_serializer
+
+    table = calculate_installments(
+        SimulationRequest(value=1000.0, installments=12, monthly_rate=0.02)
+    )["table"]
+
+    assert engine.dialect._json_serializer is _json_serializer
+    assert engine.dialect._json_deserializer is orjson.loads
+    assert orjson.loads(_json_serializer(table)) == table
+
+
+def test_repeat_simulations_hit_cache_without_sharing_rows():
+    """Identical inputs reuse the memoized schedule, but each caller gets its own dicts."""
+    from app.parcelamento.service import _calculate_schedule
+
+    data = SimulationRequest(value=1000.0, installments=12, monthly_rate=0.035)
+    _calculate_schedule.cache_clear()
+
+    first = calculate_installments(data)
+    first["table"][0]["balance"] = -1
+    second = calculate_installments(data)
+
+    assert _calculate_schedule.cache_info().hits == 1
+    assert second["table"][0]["balance"] > 0
+    assert second["table"] is not first["table"]
+
+
+def test_simulate_and_history_endpoints_serialize_schedule():
+    """Both endpoints return the full schedule; the history matches what was simulated."""
+    import warnings
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.core.database import Base, get_db
+    from app.parcelamento.models import InstallmentSimulation
+    from app.auth.dependencies import require_active_account
+    from app.parcelamento.router import router
+
+    # StaticPool: the TestClient runs handlers in another thread, same in-memory DB.
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[InstallmentSimulation.__table__])
+    db = sessionmaker(bind=engine)()
+
+    api = FastAPI()
+    api.include_router(router)
+    api.dependency_overrides[get_db] = lambda: db
+    api.dependency_overrides[require_active_account] = lambda: None
+    client = TestClient(api)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        created = client.post("/simulate", json={"value": 1000.0, "installments": 12, "monthly_rate": 0.035})
+        assert created.status_code == 201
+        body = created.json()
+        history = client.get(f"/history/{body['simulation_id']}")
+
+        columnar = client.post(
+            "/simulate?format=columnar", json={"value": 1000.0, "installments": 12, "monthly_rate": 0.035}
+        )
+
+    assert columnar.status_code == 201
+    columns = columnar.json()["columns"]
+    assert columns["month"] == list(range(1, 13))
+    assert [dict(zip(columns, row)) for row in zip(*columns.values())] == body["table"]
+    assert len(body["table"]) == 12
+    assert body["table"][-1]["balance"] == 0.0
+    assert history.status_code == 200
+    assert history.json()["table"] == body["table"]
+    assert history.json()["installment"] == body["installment"]
+    # The directly encoded bytes are exactly what the response schemas would emit.
+    from app.parcelamento.schemas import SimulationColumnarResponse, SimulationResponse
+    assert SimulationResponse.model_validate_json(created.content).model_dump_json().encode() == created.content
+    assert (
+        SimulationColumnarResponse.model_validate_json(columnar.content).model_dump_json().encode()
+        == columnar.content
+    )
+    # The row is committed before the response, so the returned id resolves at once.
+    assert db.get(InstallmentSimulation, body["simulation_id"]) is not None
+    db.close()
+    engine.dispose()
+
+
+def test_save_simulation_issues_no_select_after_insert():
+    """The persisted simulation is returned from the INSERT alone, without a reload."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.parcelamento.models import InstallmentSimulation
+    from app.parcelamento.service import save_simulation
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine, tables=[InstallmentSimulation.__table__])
+    db = sessionmaker(bind=engine)()
+    data = SimulationRequest(value=1200.0, installments=3, monthly_rate=0.02)
+    result = calculate_installments(data)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        simulation = save_simulation(db, data, result, correlation_id="corr-1")
+        assert simulation.id is not None and simulation.created_at is not None
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert not [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    db.close()
+    engine.dispose()
+
+
+def test_schedule_shape_factors_are_shared_and_read_only():
+    """Different values on the same (installments, rate) shape reuse one factor array."""
+    from app.parcelamento._kernels import annuity_factors
+
+    annuity_factors.cache_clear()
+    first = calculate_installments(SimulationRequest(value=1000.0, installments=24, monthly_rate=0.0199))
+    second = calculate_installments(SimulationRequest(value=2000.0, installments=24, monthly_rate=0.0199))
+
+    assert annuity_factors.cache_info().hits == 1
+    assert not annuity_factors(24, 0.0199).flags.writeable
+    assert second["table"][0]["interest"] == round(2 * first["table"][0]["interest"], 2)
+
+
+def test_simulation_request_accepts_portuguese_keys():
+    """One schema validates both the English and the Portuguese request shapes."""
+    english = SimulationRequest.model_validate({"value": 1000.0, "installments": 12, "monthly_rate": 0.02})
+    portuguese = SimulationRequest.model_validate({"valor": 1000.0, "parcelas": 12, "taxa_mensal": 0.02})
+
+    assert portuguese == english
+    assert SimulationRequest(value=1000.0, installments=12, monthly_rate=0.02) == english
+    with pytest.raises(ValueError):
+        SimulationRequest.model_validate({"valor": 1000.0, "parcelas": 12, "taxa_mensal": 0.5})
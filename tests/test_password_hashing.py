@@ -0,0 +1,124 @@
+"""
+Unit tests for password hashing in app.auth.service.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.auth import service
+
+
+def test_hash_roundtrip():
+    hashed = service.get_password_hash("S3nha@Forte")
+    assert hashed.startswith("$argon2")
+    assert service.verify_password("S3nha@Forte", hashed)
+    assert not service.verify_password("wrong", hashed)
+
+
+def test_concurrent_hashing_is_bounded():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_hash(password):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return "hashed"
+
+    with patch.object(service, "_HASH_SLOTS", threading.BoundedSemaphore(2)), \
+            patch.object(service, "pwd_hasher") as hasher:
+        hasher.hash.side_effect = slow_hash
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(service.get_password_hash, ["x"] * 8))
+
+    assert results == ["hashed"] * 8
+    assert peak == 2
+
+
+def test_login_tokens_reused_within_window():
+    service._issued_pairs.clear()
+    with patch.object(service, "_encode_jwt", wraps=service._encode_jwt) as encode:
+        first = service.issue_login_tokens("52998224725", "Maria")
+        second = service.issue_login_tokens("52998224725", "Maria")
+        renamed = service.issue_login_tokens("52998224725", "Maria Silva")
+    assert first == second
+    assert renamed != first
+    assert encode.call_count == 4  # two pairs signed, one reused
+
+    # Once the window has passed, a fresh pair is signed.
+    key = ("52998224725", "Maria")
+    issued_at, access, refresh = service._issued_pairs[key]
+    service._issued_pairs[key] = (issued_at - service._TOKEN_REUSE_SECONDS, access, refresh)
+    with patch.object(service, "_encode_jwt", wraps=service._encode_jwt) as encode:
+        service.issue_login_tokens("52998224725", "Maria")
+    assert encode.call_count == 2
+    service._issued_pairs.clear()
+
+
+def test_legacy_passlib_hash_verifies_and_needs_rehash():
+    # Produced by the former passlib CryptContext(schemes=["argon2"]) defaults.
+    legacy = service.PasswordHasher(time_cost=3, memory_cost=65536, parallelism=4).hash("S3nha@Forte")
+    assert service.verify_password("S3nha@Forte", legacy)
+    assert service.password_needs_rehash(legacy)
+    assert not service.password_needs_rehash(service.get_password_hash("S3nha@Forte"))
+    assert service.verify_password("S3nha@Forte", "not-a-hash") is False
+
+
+def test_missing_user_check_runs_a_full_verification():
+    calls = []
+    real_verify = service.verify_password
+
+    def _spy(plain, hashed):
+        calls.append(hashed)
+        return real_verify(plain, hashed)
+
+    with patch.object(service, "verify_password", side_effect=_spy):
+        assert service.verify_password_for_missing_user("anything") is False
+        assert service.verify_password_for_missing_user("anything") is False
+
+    # Same throwaway Argon2 hash both times: computed once, verified every call.
+    assert len(calls) == 2 and calls[0] == calls[1]
+    assert calls[0].startswith("$argon2id$")
+
+
+def test_verify_cache_skips_argon2_for_repeat_success_only():
+    hashed = service.get_password_hash("S3nha@Forte")
+    service._verified.clear()
+    real_hasher = service.pwd_hasher
+    with patch.object(service.settings, "AUTH_VERIFY_CACHE_ENABLED", True), \
+            patch.object(service, "pwd_hasher", wraps=real_hasher) as hasher:
+        assert service.verify_password("S3nha@Forte", hashed)
+        assert service.verify_password("S3nha@Forte", hashed)
+        assert not service.verify_password("wrong", hashed)
+        assert not service.verify_password("wrong", hashed)
+    # One Argon2 run for the two successes; every failure is verified again.
+    assert hasher.verify.call_count == 3
+    assert all(len(key) == 16 for key in service._verified)
+    service._verified.clear()
+
+
+def test_verify_cache_disabled_by_default():
+    hashed = service.get_password_hash("S3nha@Forte")
+    service._verified.clear()
+    assert service.verify_password("S3nha@Forte", hashed)
+    assert service._verified == {}
+
+
+def test_hs256_fast_path_matches_jose():
+    from datetime import datetime, timedelta, timezone
+    from jose import jwt
+
+    claims = {
+        "sub": "52998224725",
+        "name": "José Ação",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+        "type": "refresh",
+    }
+    expected = jwt.encode(dict(claims), service.settings.SECRET_KEY, algorithm="HS256")
+    assert service._encode_jwt(dict(claims)) == expected
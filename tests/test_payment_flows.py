@@ -633,3 +633,46 @@ class TestComprehensiveFlow:
 
         db.refresh(pf_alice)
         assert pf_alice.balance == Decimal("50.00")  # unchanged after failure
+
+
+# ---------------------------------------------------------------------------
+# Boleto query and payment
+# ---------------------------------------------------------------------------
+
+class TestBoleto:
+    def test_mock_details_serialize_with_default_status(self):
+        from app.boleto.schemas import BoletoDetails
+        from app.boleto.service import query_boleto
+
+        barcode = "8" + "1" * 43
+        details = query_boleto(barcode)
+
+        assert details.status == "PENDING"
+        # The mock skips validation, so its output must still round-trip cleanly.
+        restored = BoletoDetails.model_validate_json(details.model_dump_json())
+        assert restored == details
+        assert restored.barcode == barcode
+
+    def test_payment_returns_loaded_transaction_without_reload(self, db, pf_alice):
+        from sqlalchemy import event
+        from app.boleto.schemas import BoletoPaymentRequest
+        from app.boleto.service import process_payment
+
+        deposit_funds(db, pf_alice.id, 100.00)
+        request = BoletoPaymentRequest(barcode="8" + "1" * 43, value=50.00)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            boleto = process_payment(db, request, pf_alice.id, correlation_id="corr-1")
+            assert boleto.id and boleto.barcode == request.barcode
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        assert not [
+            sql for sql in statements
+            if sql.lstrip().upper().startswith("SELECT") and "transacoes_boleto" in sql
+        ]
+
+        db.refresh(pf_alice)
+        assert pf_alice.balance == Decimal("46.00")  # 100 - 50 - R$4 fee
@@ -151,3 +151,145 @@ def test_phone_validation():
             key_type=PixKeyType.PHONE,
             description="Teste telefone inválido"
         )
+
+
+def test_build_pix_responses_resolves_counterparts_in_two_queries():
+    """Statement rendering loads counterparts and users once, however many rows there are."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.auth.models import User
+    from app.pix.models import PixTransaction, TransactionType
+    from app.pix.router import build_pix_responses
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine, tables=[User.__table__, PixTransaction.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        User(id="u-alice", name="Alice", email="a@test.com", cpf_cnpj="11111111111", hashed_password="x"),
+        User(id="u-bob", name="Bob", email="b@test.com", cpf_cnpj="22222222222", hashed_password="x"),
+    ])
+
+    def tx(tx_id, user_id, tx_type, correlation_id):
+        return PixTransaction(
+            id=tx_id, value=10, pix_key="bob@test.com", key_type="EMAIL", type=tx_type,
+            status=PixStatus.CONFIRMED, user_id=user_id, idempotency_key=tx_id,
+            correlation_id=correlation_id, recipient_name="Loja Externa",
+        )
+
+    sent = tx("tx-sent", "u-alice", TransactionType.SENT, "corr-1")
+    external = tx("tx-external", "u-alice", TransactionType.SENT, None)
+    db.add_all([sent, external, tx("tx-received", "u-bob", TransactionType.RECEIVED, "corr-1")])
+    db.commit()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    pixes = db.query(PixTransaction).filter(PixTransaction.user_id == "u-alice").order_by(PixTransaction.id).all()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        responses = build_pix_responses(pixes, db)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    by_id = {r.id: r for r in responses}
+    assert by_id["tx-sent"].sender_name == "Alice"
+    assert by_id["tx-sent"].receiver_name == "Bob"
+    assert by_id["tx-external"].receiver_name == "Loja Externa"
+    assert len(statements) == 2
+    # Built without validation, so the builder itself must hand over JSON-ready types.
+    assert type(by_id["tx-sent"].value) is float and type(by_id["tx-sent"].fee_amount) is float
+    assert by_id["tx-sent"].model_dump(mode="json")["status"] == "CONFIRMADO"
+
+    # The requester passed in is used as-is: an external record needs no query at all.
+    from app.pix.router import build_pix_response
+    alice = db.get(User, "u-alice")
+    statements.clear()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert build_pix_response(external, db, alice).sender_name == "Alice"
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements == []
+
+    # /extrato encodes the same fields with orjson; the bytes match the schema's own dump.
+    import orjson
+    from app.pix.router import build_pix_response_fields
+    from app.pix.schemas import PixResponse
+    for fields in build_pix_response_fields(pixes, db):
+        expected = PixResponse.model_validate(fields).model_dump_json().encode()
+        assert orjson.dumps(fields, option=orjson.OPT_UTC_Z) == expected
+    db.close()
+    engine.dispose()
+
+
+def test_idempotency_guard_replays_stored_response_and_rejects_in_flight():
+    """A finished key replays its response; a key still in flight is refused with 429."""
+    from fastapi import HTTPException
+    from app.pix.idempotency import idempotency_guard
+
+    with idempotency_guard("user-1", "key-replay") as slot:
+        assert slot.cached_response is None
+        with pytest.raises(HTTPException) as in_flight:
+            with idempotency_guard("user-1", "key-replay"):
+                pass
+        assert in_flight.value.status_code == 429
+        slot.store({"id": "pix-1"})
+
+    with idempotency_guard("user-1", "key-replay") as replay:
+        assert replay.cached_response == {"id": "pix-1"}
+    # Keys are per user.
+    with idempotency_guard("user-2", "key-replay") as other:
+        assert other.cached_response is None
+
+
+def test_idempotency_guard_rejects_key_reused_with_different_payload():
+    """A key replays only for the payload it was first used with; another payload gets 422."""
+    from fastapi import HTTPException
+    from app.pix.idempotency import idempotency_guard
+
+    with idempotency_guard("user-1", "key-digest", "digest-a") as slot:
+        slot.store({"id": "pix-1"})
+
+    with pytest.raises(HTTPException) as mismatch:
+        with idempotency_guard("user-1", "key-digest", "digest-b"):
+            pass
+    assert mismatch.value.status_code == 422
+
+    with idempotency_guard("user-1", "key-digest", "digest-a") as replay:
+        assert replay.cached_response == {"id": "pix-1"}
+
+
+def test_idempotency_guard_releases_key_when_request_fails():
+    """A failed request leaves nothing cached, so the client's retry runs again."""
+    from app.pix.idempotency import idempotency_guard
+
+    with pytest.raises(ValueError):
+        with idempotency_guard("user-1", "key-failed"):
+            raise ValueError("gateway down")
+
+    with idempotency_guard("user-1", "key-failed") as retry:
+        assert retry.cached_response is None
+
+
+def test_create_pix_transaction_runs_on_dedicated_executor():
+    """POST /transacoes does its blocking work on the PIX executor, not AnyIO's pool."""
+    import asyncio
+    import threading
+    from app.pix import router as pix_router
+
+    seen = {}
+
+    def fake_body(data, idempotency_key, db, current_user, correlation_id):
+        seen["thread"] = threading.current_thread().name
+        seen["args"] = (idempotency_key, correlation_id)
+        return "response"
+
+    with patch.object(pix_router, "_create_pix_transaction", fake_body):
+        result = asyncio.run(pix_router.create_pix_transaction(
+            data=Mock(), x_idempotency_key="idem-1", db=Mock(),
+            current_user=Mock(), x_correlation_id="corr-1",
+        ))
+
+    assert result == "response"
+    assert seen["thread"].startswith("pix-write")
+    assert seen["args"] == ("idem-1", "corr-1")
@@ -851,3 +851,34 @@ class TestValueFallback:
         assert "reconciliacao manual" in body["detail"], (
             f"Response must instruct manual reconciliation, got: {body['detail']}"
         )
+
+
+class TestEmvEncoding:
+    """BR Code encoding helpers in app.core.pix_emv."""
+
+    def test_crc16_matches_ccitt_false_check_value(self) -> None:
+        from app.core.pix_emv import crc16_ccitt
+
+        assert crc16_ccitt("123456789") == "29B1"
+        assert crc16_ccitt("") == "FFFF"
+
+    def test_static_emv_is_self_consistent(self) -> None:
+        from app.core.pix_emv import build_pix_static_emv, crc16_ccitt, parse_emv_amount
+
+        charge_id = str(uuid4())
+        emv = build_pix_static_emv(charge_id, 1234.5)
+
+        assert emv.startswith("000201010211")
+        assert charge_id in emv
+        assert emv[-4:] == crc16_ccitt(emv[:-4])
+        assert parse_emv_amount(emv) == 1234.5
+
+    def test_qr_image_is_rendered_locally_and_cached(self) -> None:
+        pytest.importorskip("segno")
+        from app.core.pix_emv import build_pix_static_emv, build_qr_url
+
+        emv = build_pix_static_emv(str(uuid4()), 10.0)
+        qr_url = build_qr_url(emv)
+
+        assert qr_url.startswith("data:image/png;base64,")
+        assert build_qr_url(emv) is qr_url
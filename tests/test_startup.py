@@ -0,0 +1,179 @@
+"""
+Tests for app.main: startup warm-up, the /health readiness gate, static shortcuts and the
+observability middleware.
+"""
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+async def _idle_audit_loop(*_args):
+    await asyncio.sleep(3600)
+
+
+def test_health_is_503_until_warm_up_completes():
+    release = []
+
+    def _slow_init_db():
+        while not release:
+            time.sleep(0.01)
+
+    with patch("app.main.init_db", side_effect=_slow_init_db), \
+            patch("app.main.seed_matrix_account"), \
+            patch("app.main.balance_audit_loop", _idle_audit_loop), \
+            patch("app.main.logger") as main_logger:
+        with TestClient(app) as client:
+            # The listener answers while init_db is still blocked in its thread.
+            starting = client.get("/health")
+            assert starting.status_code == 503
+            assert starting.json()["status"] == "starting"
+
+            release.append(True)
+            deadline = time.monotonic() + 5
+            while not app.state.db_ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            ready = client.get("/health")
+            assert ready.status_code == 200
+            assert ready.json()["status"] == "healthy"
+    main_logger.exception.assert_not_called()
+
+
+def test_warm_up_retries_then_stops_the_worker():
+    import pytest
+    import signal
+    import app.main as main_module
+    from types import SimpleNamespace
+
+    state = SimpleNamespace(state=SimpleNamespace(db_ready=False))
+    with patch.object(main_module, "init_db", side_effect=RuntimeError("db down")) as init_db, \
+            patch.object(main_module.asyncio, "sleep") as sleep, \
+            patch.object(main_module.os, "kill") as kill, \
+            patch.object(main_module, "logger") as main_logger:
+        with pytest.raises(RuntimeError):
+            asyncio.run(main_module._warm_up(state))
+
+    assert init_db.call_count == main_module._WARM_UP_ATTEMPTS
+    assert sleep.call_count == main_module._WARM_UP_ATTEMPTS - 1
+    # Each failed attempt is logged right away, not at shutdown.
+    assert main_logger.exception.call_count == main_module._WARM_UP_ATTEMPTS - 1
+    main_logger.critical.assert_called_once()
+    kill.assert_called_once_with(main_module.os.getpid(), signal.SIGTERM)
+    assert state.state.db_ready is False
+
+
+def test_warm_pool_opens_distinct_connections_up_to_pool_size():
+    from unittest.mock import MagicMock
+    import app.main as main_module
+
+    pool_engine = MagicMock()
+    pool_engine.pool.size.return_value = 3
+    connections = [MagicMock(), MagicMock(), MagicMock()]
+    pool_engine.connect.side_effect = connections
+
+    with patch.object(main_module, "engine", pool_engine):
+        asyncio.run(main_module._warm_pool())
+
+    assert pool_engine.connect.call_count == 3
+    for conn in connections:
+        conn.execute.assert_called_once()
+        conn.close.assert_called_once()
+
+
+def test_warm_pool_tolerates_failed_connections():
+    from unittest.mock import MagicMock
+    import app.main as main_module
+
+    pool_engine = MagicMock()
+    pool_engine.pool.size.return_value = 2
+    good = MagicMock()
+    pool_engine.connect.side_effect = [good, OSError("connection refused")]
+
+    with patch.object(main_module, "engine", pool_engine), \
+            patch.object(main_module, "logger") as main_logger:
+        asyncio.run(main_module._warm_pool())
+
+    good.close.assert_called_once()
+    main_logger.warning.assert_called_once()
+
+
+def test_favicon_served_from_memory_with_etag():
+    client = TestClient(app)
+    first = client.get("/favicon.ico")
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/png"
+    assert first.content == (Path(__file__).resolve().parent.parent / "app/static/img/logo.png").read_bytes()
+
+    repeat = client.get("/favicon.ico", headers={"If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+
+
+def test_observability_middleware_sets_headers_once_and_propagates_correlation_id():
+    client = TestClient(app)
+    response = client.get("/no-such-route", headers={"X-Correlation-ID": "corr-abc", "Accept": "application/json"})
+
+    assert response.status_code == 404
+    assert response.headers["x-correlation-id"] == "corr-abc"
+    # The exception handler reads the same id from request.state.
+    assert response.json()["correlation_id"] == "corr-abc"
+    assert float(response.headers["x-process-time"]) >= 0
+    assert response.headers["x-frame-options"] == "DENY"
+    assert "frame-ancestors 'none'" in response.headers["content-security-policy"]
+    for name in ("x-correlation-id", "x-frame-options", "strict-transport-security"):
+        assert len(response.headers.get_list(name)) == 1
+
+
+def test_http_exception_handler_uses_accept_captured_by_middleware():
+    client = TestClient(app)
+    browser = client.get("/no-such-route", headers={"Accept": "text/html"}, follow_redirects=False)
+    api = client.get("/no-such-route", headers={"Accept": "application/json"}, follow_redirects=False)
+
+    assert browser.status_code == 302
+    assert browser.headers["location"] == "/login"
+    assert api.status_code == 404
+
+
+def test_observability_middleware_generates_correlation_id():
+    client = TestClient(app)
+    first = client.get("/favicon.ico").headers["x-correlation-id"]
+    second = client.get("/favicon.ico").headers["x-correlation-id"]
+
+    assert len(first) == 16 and int(first, 16) >= 0
+    assert first != second
+
+
+def test_correlation_ids_are_unique_across_pool_refills():
+    from app.main import _CORRELATION_POOL_SIZE, _CORRELATION_ID_BYTES, _new_correlation_id
+
+    ids = {_new_correlation_id() for _ in range(3 * _CORRELATION_POOL_SIZE // _CORRELATION_ID_BYTES)}
+    assert len(ids) == 3 * _CORRELATION_POOL_SIZE // _CORRELATION_ID_BYTES
+
+
+def test_health_debounces_database_probe():
+    import app.main as main_module
+    from unittest.mock import MagicMock
+
+    engine = MagicMock()
+    session = engine.connect.return_value.__enter__.return_value
+    saved_ready = getattr(app.state, "db_ready", False)
+    app.state.db_ready = True
+    try:
+        with patch.object(main_module, "_health_last_ok_ns", 0), \
+                patch.object(main_module, "autocommit_engine", engine):
+            client = TestClient(app)
+            assert client.get("/health").json()["db"] == "connected"
+            assert client.get("/health").json()["db"] == "connected"
+            assert session.execute.call_count == 1
+
+            # Past the window the next ping probes the database again.
+            main_module._health_last_ok_ns -= main_module._HEALTH_DB_TTL_NS
+            session.execute.side_effect = RuntimeError("db asleep")
+            assert client.get("/health").json()["db"] == "degraded"
+            assert session.execute.call_count == 2
+    finally:
+        app.state.db_ready = saved_ready
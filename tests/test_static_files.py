@@ -0,0 +1,56 @@
+"""
+Tests for the in-memory cached StaticFiles mount.
+"""
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core.static_files import CachedStaticFiles
+
+
+@pytest.fixture()
+def static_app(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body{color:red}")
+    (tmp_path / "big.bin").write_bytes(b"x" * 64)
+    files = CachedStaticFiles(directory=str(tmp_path), ttl_seconds=0, max_file_bytes=32)
+    app = Starlette(routes=[Mount("/static", app=files, name="static")])
+    return TestClient(app), files, tmp_path
+
+
+def test_serves_from_memory_with_etag_and_304(static_app):
+    client, files, _ = static_app
+    first = client.get("/static/css/site.css")
+    assert first.status_code == 200
+    assert first.text == "body{color:red}"
+    assert first.headers["content-type"] == "text/css; charset=utf-8"
+    assert "css/site.css" in files._cache
+
+    repeat = client.get("/static/css/site.css", headers={"If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+
+
+def test_changed_file_is_reloaded_after_ttl(static_app):
+    client, _, root = static_app
+    etag = client.get("/static/css/site.css").headers["etag"]
+
+    path = root / "css" / "site.css"
+    path.write_text("body{color:blue;margin:0}")
+    stat_result = path.stat()
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+    changed = client.get("/static/css/site.css", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.text == "body{color:blue;margin:0}"
+
+
+def test_large_missing_and_escaping_paths_fall_back_to_starlette(static_app):
+    client, files, _ = static_app
+    assert client.get("/static/big.bin").content == b"x" * 64
+    assert "big.bin" not in files._cache
+    assert client.get("/static/missing.css").status_code == 404
+    assert client.get("/static/../conftest.py").status_code == 404
@@ -0,0 +1,42 @@
+"""
+Tests for the conditional (ETag / 304) rendering helper in app.core.templates.
+"""
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.templates import conditional_template_response
+
+_test_app = FastAPI()
+_state = {"balance": "10.00"}
+
+
+@_test_app.get("/page")
+def _page(request: Request):
+    return conditional_template_response(
+        request, "login.html", {}, etag_parts=("user-1", _state["balance"])
+    )
+
+
+def test_matching_if_none_match_returns_304_without_body():
+    client = TestClient(_test_app)
+    first = client.get("/page")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "private" in first.headers["cache-control"]
+
+    repeat = client.get("/page", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == etag
+
+
+def test_etag_changes_with_rendered_state():
+    client = TestClient(_test_app)
+    etag = client.get("/page").headers["etag"]
+    _state["balance"] = "5.00"
+    try:
+        changed = client.get("/page", headers={"If-None-Match": etag})
+    finally:
+        _state["balance"] = "10.00"
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
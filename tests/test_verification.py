@@ -91,6 +91,62 @@ class TestValidateCnpj:
         assert validate_cnpj("") is False
 
 
+class TestDigitsOnly:
+    @pytest.mark.parametrize("raw", [
+        "52998224725", "529.982.247-25", "61.425.124/0001-03", "", "abc",
+        " (11) 99999-9999 ", "cpf: 529é982²247", "٣٤٥-12",
+    ])
+    def test_matches_regex_normalization(self, raw):
+        import re
+        from app.core.utils import digits_only
+        assert digits_only(raw) == re.sub(r"\D", "", raw)
+
+
+class TestMaskCpfCnpj:
+    @pytest.mark.parametrize("raw, masked", [
+        ("529.982.247-25", "***.982.247-**"),
+        ("61425124000103", "**.***.124/0001-**"),
+        ("joao@example.com", "jo***@example.com"),
+        ("odd@name@example.com", "od***@name@example.com"),
+        ("+5511999", "+55***99"),
+    ])
+    def test_masks(self, raw, masked):
+        from app.core.utils import mask_cpf_cnpj
+        assert mask_cpf_cnpj(raw) == masked
+
+
+class TestMaskSensitiveData:
+    @pytest.mark.parametrize("raw, kwargs, masked", [
+        ("52998224725", {}, "*******4725"),
+        ("abcd", {}, "****"),
+        ("", {}, ""),
+        ("ana@example.com", {"visible_chars": 3}, "************com"),
+        ("x" * 200 + "tail", {}, "*" * 200 + "tail"),
+        ("secret-value", {"mask_char": "#"}, "########alue"),
+    ])
+    def test_masks(self, raw, kwargs, masked):
+        from app.core.security import mask_sensitive_data
+        assert mask_sensitive_data(raw, **kwargs) == masked
+
+
+class TestFormatBrasiliaTime:
+    def test_naive_values_are_utc_and_shifted_three_hours(self):
+        from datetime import datetime, timezone
+        from app.core.utils import format_brasilia_time
+        assert format_brasilia_time(datetime(2024, 1, 1, 2, 30)) == "31/12/2023 às 23:30:00"
+        aware = datetime(2024, 1, 1, 2, 30, tzinfo=timezone.utc)
+        assert format_brasilia_time(aware) == "31/12/2023 às 23:30:00"
+
+    def test_matches_astimezone_for_other_offsets(self):
+        from datetime import datetime, timedelta, timezone
+        from app.core.utils import format_brasilia_time
+        brasilia = timezone(timedelta(hours=-3))
+        for offset in (-5, 0, 2, 9):
+            value = datetime(2024, 2, 29, 23, 59, 59, 999999, tzinfo=timezone(timedelta(hours=offset)))
+            expected = value.astimezone(brasilia).strftime("%d/%m/%Y às %H:%M:%S")
+            assert format_brasilia_time(value) == expected
+
+
 class TestValidateDocument:
     def test_valid_cpf_dispatch(self):
         ok, result = validate_document("52998224725")
@@ -234,6 +290,55 @@ class TestRegisterDocumentGate:
             assert call_args[0] == "emailcheck@example.com"
             assert len(call_args[2]) > 20  # token must be non-trivial
 
+    @patch("app.auth.router.send_verification_email", return_value=True)
+    def test_register_assigns_wallet_in_single_commit(self, mock_email, client, valid_user_payload):
+        from sqlalchemy import event
+        from app.auth.models import User
+
+        valid_user_payload["email"] = "single_commit@example.com"
+        commits = []
+
+        def _count_commit(conn):
+            commits.append(conn)
+
+        event.listen(_engine, "commit", _count_commit)
+        try:
+            response = client.post("/auth/register", json=valid_user_payload)
+        finally:
+            event.remove(_engine, "commit", _count_commit)
+        assert response.status_code == 201
+        assert len(commits) == 1
+
+        db = _TestingSession()
+        try:
+            user = db.query(User).filter(User.email == "single_commit@example.com").first()
+            assert user.asaas_wallet_id == "1a923d7b-3230-46d4-a670-87bf7ee54817"
+        finally:
+            db.close()
+
+    @patch("app.auth.router.send_verification_email", return_value=True)
+    def test_register_duplicate_detected_by_single_insert(self, mock_email, client, valid_user_payload):
+        from sqlalchemy import event
+
+        valid_user_payload["email"] = "dup_insert@example.com"
+        assert client.post("/auth/register", json=valid_user_payload).status_code == 201
+
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(_engine, "before_cursor_execute", _record)
+        try:
+            response = client.post("/auth/register", json=valid_user_payload)
+        finally:
+            event.remove(_engine, "before_cursor_execute", _record)
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email ou CPF/CNPJ ja cadastrado no sistema."
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("INSERT INTO USERS")
+
 
 # ---------------------------------------------------------------------------
 # Integration tests: /auth/verificar-email endpoint